@@ -0,0 +1,41 @@
+"""
+MIT License
+
+Copyright (c) 2023 Kazuki Yamamoto
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+Code emitter selection of the hot paths (lexer, keyword matching and status response formatting).
+
+This is the default bytecode variant, which also runs under CPython: ``native`` leaves functions as they are.
+The native build variant freezes ``native/Accel.py`` under the same name and copies of the modules using ``@native``
+rewritten by ``native/make_native.py``, see ``manifest_native.py`` of each firmware.
+"""
+
+VARIANT = "bytecode"
+
+
+def native(func):
+    """ Decorator marking a hot path function; bytecode variant keeps `func` as is
+
+    :param func: function to be compiled
+    :return: `func`
+    """
+    return func
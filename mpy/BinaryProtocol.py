@@ -0,0 +1,88 @@
+"""
+MIT License
+
+Copyright (c) 2023 Kazuki Yamamoto
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+Binary command frames for the USBTMC vendor specific messages.
+
+A VENDOR_SPECIFIC_OUT transfer carries one or more frames back to back. Every frame is a ``FRAME_FORMAT`` header
+followed by ``payload length`` bytes of payload, all little endian:
+
+|Offset |Field          |Size   |Description
+|-------|---------------|-------|-----------------------------------------------------------------------------------
+|0      |opcode         |1      |See table below
+|1      |bus            |1      |I2C/SPI bus number, pin number or ADC channel
+|2      |address        |2      |I2C target address as in I2C[01]:ADDRess:BIT, SPI chip select levels or pin value
+|4      |read length    |2      |Number of bytes to read
+|6      |payload length |2      |Number of payload bytes following the header
+
+|Opcode |Name           |Payload            |Reply data
+|-------|---------------|-------------------|-----------------------------------------------------------------------
+|0x00   |NOP            |                   |
+|0x10   |I2C_WRITE      |data               |
+|0x11   |I2C_READ       |                   |``read length`` bytes
+|0x12   |I2C_READ_MEM   |memory address, 1 or 2 bytes big endian |``read length`` bytes
+|0x20   |SPI_TRANSFER   |data; address bit 0 is CS level before, bit 1 after |as many bytes as written
+|0x30   |PIN_READ       |                   |1 byte
+|0x31   |PIN_WRITE      |                   |
+|0x40   |ADC_READ       |                   |uint16
+|-------|---------------|-------------------|-----------------------------------------------------------------------
+
+Each frame is answered by a ``REPLY_FORMAT`` header (opcode, status, data length) followed by the data; replies
+of one transfer are returned together by the next REQUEST_VENDOR_SPECIFIC_IN. Processing stops at a frame which
+cannot be decoded.
+"""
+import struct
+from micropython import const
+
+FRAME_FORMAT = "<BBHHH"  # opcode, bus, address, read length, payload length
+FRAME_HEADER_SIZE = const(8)
+REPLY_FORMAT = "<BBH"  # opcode, status, data length
+REPLY_HEADER_SIZE = const(4)
+
+OP_NOP = const(0x00)
+OP_I2C_WRITE = const(0x10)
+OP_I2C_READ = const(0x11)
+OP_I2C_READ_MEM = const(0x12)
+OP_SPI_TRANSFER = const(0x20)
+OP_PIN_READ = const(0x30)
+OP_PIN_WRITE = const(0x31)
+OP_ADC_READ = const(0x40)
+
+STATUS_OK = const(0)
+STATUS_BUS_FAIL = const(1)  # I2C/SPI transfer failed
+STATUS_INVALID = const(2)  # unknown opcode or bus, or bad lengths
+STATUS_TRUNCATED = const(3)  # frame is longer than the transfer
+STATUS_BUSY = const(4)  # pin is taken by PWM, UART, pattern generator or edge capture
+
+
+def reply(opcode, status, data=b""):
+    """ Packs a reply
+
+    :param int opcode: opcode of the frame
+    :param int status: STATUS_*
+    :param data: reply data
+    :return bytes:
+    """
+    header = bytearray(REPLY_HEADER_SIZE)
+    struct.pack_into(REPLY_FORMAT, header, 0, opcode, status, len(data))
+    return bytes(header) + data
@@ -0,0 +1,49 @@
+"""
+MIT License
+
+Copyright (c) 2023 Kazuki Yamamoto
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+Boot milestones. ``mark()`` records ``time.ticks_us()`` of a named milestone, which counts from reset on rp2, so each
+milestone is the time spent since power-on or reset. Only the first record of a name is kept.
+"""
+import time
+
+BOOT_MILESTONES = []  # list of (name, ticks_us)
+
+
+def mark(name):
+    """ Records milestone ``name`` at current time unless it is already recorded
+
+    :param str name: milestone name
+    """
+    for recorded, _ in BOOT_MILESTONES:
+        if recorded == name:
+            return
+    BOOT_MILESTONES.append((name, time.ticks_us()))
+
+
+def milestones():
+    """ Returns recorded milestones in order
+
+    :return str: ``name,us,name,us,...``
+    """
+    return ",".join([f"{name},{us}" for name, us in BOOT_MILESTONES])
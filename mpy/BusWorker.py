@@ -0,0 +1,143 @@
+"""
+MIT License
+
+Copyright (c) 2023 Kazuki Yamamoto
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+Bus operation worker on core 1.
+
+Core 0 keeps the USB front end and the parser; decoded operations are handed over through a fixed-size request
+ring guarded by a lock and run in order by a thread on core 1. An operation writes its response into the stream it
+was queued with; the number of finished operations tells core 0 which responses are complete.
+
+Operations can be cancelled up to a ticket: queued ones are dropped without running, and a running one is expected to
+poll ``aborted()`` and return early, leaving the ring in order.
+"""
+import time
+import _thread
+from micropython import const
+
+QUEUE_DEPTH = const(8)
+_POLL_US = const(20)
+
+
+class BusWorker:
+    def __init__(self, depth=QUEUE_DEPTH):
+        """
+        :param int depth: number of operations which can wait in the request ring
+        """
+        self.lock = _thread.allocate_lock()
+        self.depth = depth
+        self.requests = [None] * depth  # (function, args, stream)
+        self.submitted = 0  # operations queued by core 0
+        self.done = 0  # operations finished by core 1
+        self.cancelled = 0  # operations up to this ticket are cancelled
+        self.stdout = None  # response stream of the operation running on core 1
+        self.ident = None  # thread id of core 1 while running
+        self.running = False
+
+    def start(self):
+        """ Launches worker thread on core 1
+        """
+        if not self.running:
+            self.running = True
+            _thread.start_new_thread(self._run, ())
+            while self.ident is None:
+                time.sleep_us(_POLL_US)
+
+    def stop(self):
+        """ Lets queued operations finish and ends worker thread
+        """
+        if self.running:
+            self.wait(self.submitted)
+            self.running = False
+            while self.ident is not None:
+                time.sleep_us(_POLL_US)
+
+    def on_worker(self):
+        """
+        :return bool: True if called from worker thread
+        """
+        return self.ident is not None and self.ident == _thread.get_ident()
+
+    def pending(self):
+        """
+        :return int: number of queued or running operations
+        """
+        return self.submitted - self.done
+
+    def submit(self, function, args, stream):
+        """ Queues ``function(*args)``; waits while the request ring is full
+
+        :param function:
+        :param tuple args:
+        :param stream: where the operation prints its response
+        :return int: ticket; the operation is finished once ``done`` reaches it
+        """
+        while self.submitted - self.done >= self.depth:
+            time.sleep_us(_POLL_US)
+        with self.lock:
+            self.requests[self.submitted % self.depth] = (function, args, stream)
+            self.submitted += 1
+            return self.submitted
+
+    def cancel(self, ticket):
+        """ Cancels operations up to ``ticket``; queued ones are dropped and a running one sees ``aborted()``
+
+        :param int ticket:
+        """
+        if ticket > self.cancelled:
+            self.cancelled = ticket
+
+    def aborted(self):
+        """ Long operations poll this to return early
+
+        :return bool: True if the running operation is cancelled
+        """
+        return self.done < self.cancelled
+
+    def wait(self, ticket):
+        """ Waits until operations up to ``ticket`` are finished
+
+        :param int ticket:
+        """
+        while self.done < ticket:
+            time.sleep_us(_POLL_US)
+
+    def _run(self):
+        self.ident = _thread.get_ident()
+        while self.running:
+            if self.done == self.submitted:
+                time.sleep_us(_POLL_US)
+                continue
+            with self.lock:
+                slot = self.done % self.depth
+                function, args, stream = self.requests[slot]
+                self.requests[slot] = None
+            self.stdout = stream
+            if self.done >= self.cancelled:
+                try:
+                    function(*args)
+                except Exception as e:
+                    print(e, file=stream)  # keep the worker alive; the error goes back as the response
+            self.stdout = None
+            self.done += 1
+        self.ident = None
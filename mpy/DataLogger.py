@@ -0,0 +1,221 @@
+"""
+MIT License
+
+Copyright (c) 2023 Kazuki Yamamoto
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+Flash backed data logger.
+
+A soft ``machine.Timer`` callback packs one record per period with ``struct`` into a RAM block. A full block is
+handed over to ``_flush()`` through ``micropython.schedule`` and the timer goes on with a second block, so flash is
+written outside the timer callback and once per ``BLOCK_SIZE`` bytes rather than per record. A block which fills
+up while the previous one is still waiting for flash is dropped and counted as lost.
+Blocks go into ring files of ``FILE_SIZE`` bytes under ``LOG_DIR``; once the size bound is reached the oldest file
+is overwritten.
+
+Every record starts with a ``uint32`` timestamp in ms since start, followed by the values given by the sample
+function, all little endian.
+"""
+import os
+import time
+import struct
+import machine
+from micropython import const, schedule
+
+LOG_DIR = "/log"
+BLOCK_SIZE = const(4096)
+FILE_SIZE = const(16384)
+TIMESTAMP_FORMAT = "<I"
+
+
+class DataLogger:
+    def __init__(self, path=LOG_DIR):
+        """
+        :param str path: directory of ring files
+        """
+        self.path = path
+        self.timer = None
+        self.fmt = TIMESTAMP_FORMAT
+        self.sample = None
+        self.record_size = struct.calcsize(TIMESTAMP_FORMAT)
+        self.per_block = 0  # records per RAM block
+        self.per_file = 0  # records per ring file
+        self.files = 0  # number of ring files
+        self.blocks = None  # two RAM blocks; the timer fills one while the other waits for flash
+        self.block = None  # RAM block being filled
+        self.fill = 0  # records in RAM block
+        self.pending = 0  # records in the other RAM block waiting for flash
+        self.first = 0  # sequence number of oldest file
+        self.last = 0  # sequence number of file being written
+        self.last_records = 0  # records in file being written
+        self.elapsed = 0
+        self.ticks = 0
+        self.lost = 0  # records dropped by a failed flash write
+
+    def running(self):
+        """
+        :return bool:
+        """
+        return self.timer is not None
+
+    def _name(self, seq):
+        return f"{self.path}/{seq % self.files}.bin"
+
+    def start(self, fmt, sample, interval, size):
+        """ Drops previous records and starts logging
+
+        :param str fmt: ``struct`` format of values returned by ``sample``, without byte order
+        :param sample: function returning tuple of values
+        :param int interval: record period in ms
+        :param int size: bound of flash use in bytes
+        """
+        self.stop()
+        self.clear()
+        self.fmt = TIMESTAMP_FORMAT + fmt
+        self.sample = sample
+        self.record_size = struct.calcsize(self.fmt)
+        self.per_block = BLOCK_SIZE // self.record_size
+        self.per_file = (FILE_SIZE // BLOCK_SIZE) * self.per_block
+        self.files = max(2, size // FILE_SIZE)
+        self.blocks = [bytearray(self.per_block * self.record_size), bytearray(self.per_block * self.record_size)]
+        self.block = self.blocks[0]
+        self.elapsed = 0
+        self.ticks = time.ticks_ms()
+        try:
+            os.mkdir(self.path)
+        except OSError:
+            pass  # exists
+        self.timer = machine.Timer(period=interval, mode=machine.Timer.PERIODIC, callback=self._tick)
+
+    def stop(self):
+        """ Stops logging and writes out the partial block
+
+        :return bool: True if it was running
+        """
+        if self.timer is None:
+            return False
+        self.timer.deinit()
+        self.timer = None
+        self._flush()  # block waiting for flash
+        self._write(self.block, self.fill)
+        self.fill = 0
+        return True
+
+    def clear(self):
+        """ Removes every record, including ring files left by an earlier boot
+        """
+        try:
+            names = os.listdir(self.path)
+        except OSError:
+            names = []  # no directory yet
+        for name in names:
+            os.remove(f"{self.path}/{name}")
+        self.fill = 0
+        self.pending = 0
+        self.first = 0
+        self.last = 0
+        self.last_records = 0
+        self.lost = 0
+
+    def _tick(self, timer):
+        now = time.ticks_ms()
+        self.elapsed += time.ticks_diff(now, self.ticks)
+        self.ticks = now
+        struct.pack_into(self.fmt, self.block, self.fill * self.record_size, self.elapsed, *self.sample())
+        self.fill += 1
+        if self.fill == self.per_block:
+            if self.pending:
+                self.lost += self.fill  # flash is behind; drop this block rather than wait in the callback
+            else:
+                self.pending = self.fill
+                self.block = self.blocks[1] if self.block is self.blocks[0] else self.blocks[0]
+            self.fill = 0
+            try:
+                schedule(self._flush, None)
+            except RuntimeError:
+                pass  # schedule queue is full; retried with the next full block, or stop() writes it
+
+    def _flush(self, _=None):
+        """ Writes the RAM block waiting for flash
+
+        :param _: dummy argument for mpy.schedule()
+        """
+        pending = self.pending
+        if pending == 0:
+            return
+        self._write(self.blocks[1] if self.block is self.blocks[0] else self.blocks[0], pending)
+        self.pending = 0
+
+    def _write(self, block, fill):
+        """ Appends ``fill`` records of ``block`` to the current ring file; moves on to the next file when it is full
+
+        :param bytearray block:
+        :param int fill: number of records
+        """
+        if fill == 0:
+            return
+        if self.last_records == self.per_file:
+            self.last += 1
+            self.last_records = 0
+            if self.last - self.first >= self.files:
+                self.first += 1
+        try:
+            with open(self._name(self.last), "ab" if self.last_records else "wb") as f:
+                f.write(memoryview(block)[:fill * self.record_size])
+            self.last_records += fill
+        except OSError:
+            self.lost += fill
+
+    def count(self):
+        """
+        :return int: number of stored records, including those not written to flash yet
+        """
+        return (self.last - self.first) * self.per_file + self.last_records + self.pending + self.fill
+
+    def read(self, first, count):
+        """ Yields records ``first`` to ``first + count - 1``, oldest first, as chunks of bytes.
+        Only while stopped, when every record is in flash
+
+        :param int first: record index; 0 is the oldest stored record
+        :param int count:
+        """
+        size = self.record_size
+        per_file = self.per_file
+        end = min(first + count, self.count())
+        index = first
+        while index < end:
+            seq = self.first + index // per_file
+            if seq > self.last:
+                break
+            offset = index % per_file
+            if seq == self.last and offset >= self.last_records:
+                break
+            stop = min(end - index, (per_file if seq < self.last else self.last_records) - offset)
+            with open(self._name(seq), "rb") as f:
+                f.seek(offset * size)
+                remaining = stop * size
+                while remaining > 0:
+                    chunk = f.read(min(remaining, BLOCK_SIZE))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    yield chunk
+            index += stop
@@ -0,0 +1,138 @@
+"""
+MIT License
+
+Copyright (c) 2023 Kazuki Yamamoto
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+Interrupt driven edge logger.
+
+A hard ``Pin.irq`` handler counts edges and stores ``time.ticks_us`` timestamps into preallocated arrays.
+Nothing is allocated in the handler: counters wrap within small int range and the ring drops new events
+once it is full, counting them as lost.
+"""
+import machine
+from array import array
+from micropython import const
+from time import ticks_us
+from LogicCapture import definite_length_block
+
+EVENT_RING_SIZE = const(256)  # must be a power of 2
+_RING_MASK = const(EVENT_RING_SIZE - 1)
+_COUNT_MASK = const(0x3FFF_FFFF)  # keep counters small ints
+
+EDGE_OFF = const(0)
+EDGE_RISE = const(1)
+EDGE_FALL = const(2)
+EDGE_BOTH = const(3)
+EDGE_STRINGS = {EDGE_OFF: "OFF", EDGE_RISE: "RISE", EDGE_FALL: "FALL", EDGE_BOTH: "BOTH"}
+EDGE_TRIGGERS = {EDGE_RISE: machine.Pin.IRQ_RISING, EDGE_FALL: machine.Pin.IRQ_FALLING,
+                 EDGE_BOTH: machine.Pin.IRQ_RISING | machine.Pin.IRQ_FALLING}
+
+_RISE = const(0)
+_FALL = const(1)
+_LOST = const(2)
+_HEAD = const(3)
+_FILL = const(4)
+
+
+class EdgeLogger:
+    def __init__(self, pin):
+        """
+        :param machine.Pin pin:
+        """
+        self.pin = pin
+        self.edge = EDGE_OFF
+        self.stamps = array("L", bytes(4 * EVENT_RING_SIZE))
+        self.levels = bytearray(EVENT_RING_SIZE)
+        self.state = array("L", bytes(4 * 5))  # rise, fall, lost, head, fill
+
+    def _irq(self, pin):
+        state = self.state
+        stamp = ticks_us()
+        edge = self.edge
+        if edge == EDGE_RISE:
+            level = 1
+        elif edge == EDGE_FALL:
+            level = 0
+        else:
+            level = pin.value()
+        if level:
+            state[_RISE] = (state[_RISE] + 1) & _COUNT_MASK
+        else:
+            state[_FALL] = (state[_FALL] + 1) & _COUNT_MASK
+        fill = state[_FILL]
+        if fill < EVENT_RING_SIZE:
+            head = state[_HEAD]
+            self.stamps[head] = stamp
+            self.levels[head] = level
+            state[_HEAD] = (head + 1) & _RING_MASK
+            state[_FILL] = fill + 1
+        else:
+            state[_LOST] = (state[_LOST] + 1) & _COUNT_MASK
+
+    def enable(self, edge):
+        """ Starts or stops logging
+
+        :param int edge: EDGE_OFF|EDGE_RISE|EDGE_FALL|EDGE_BOTH
+        """
+        self.pin.irq(handler=None)
+        self.edge = edge
+        if edge != EDGE_OFF:
+            self.pin.irq(handler=self._irq, trigger=EDGE_TRIGGERS[edge], hard=True)
+
+    def clear(self):
+        """ Resets counters and discards logged events
+        """
+        irq_state = machine.disable_irq()
+        for n in range(len(self.state)):
+            self.state[n] = 0
+        machine.enable_irq(irq_state)
+
+    def counts(self):
+        """
+        :return tuple: (rising edges, falling edges, lost events)
+        """
+        state = self.state
+        return state[_RISE], state[_FALL], state[_LOST]
+
+    def drain(self):
+        """ Takes every logged event out of the ring, oldest first
+
+        Returns definite length block ``#<n><length><payload>``; payload is 9 hex digits per event,
+        1 digit of level after the edge followed by 8 digits of ``ticks_us`` timestamp
+
+        :return str:
+        """
+        # The handler only writes past the logged events, so they can be read without blocking it
+        irq_state = machine.disable_irq()
+        fill = self.state[_FILL]
+        tail = (self.state[_HEAD] - fill) & _RING_MASK
+        machine.enable_irq(irq_state)
+
+        payload = []
+        for n in range(fill):
+            index = (tail + n) & _RING_MASK
+            payload.append(f"{self.levels[index]:01x}{self.stamps[index]:08x}")
+
+        irq_state = machine.disable_irq()
+        self.state[_FILL] -= fill
+        machine.enable_irq(irq_state)
+        return definite_length_block("".join(payload))
@@ -0,0 +1,106 @@
+"""
+MIT License
+
+Copyright (c) 2023 Kazuki Yamamoto
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+Garbage collector policy of the command loop.
+
+Collections are moved out of commands: ``idle()`` is called by the command loop in gaps between commands and collects
+once enough has been allocated since the last collection. ``lock()``/``unlock()`` around a command keep automatic
+collections out of it: with ``gc.disable()`` an allocation which does not fit raises MemoryError without collecting,
+so callers must handle it. Only collections run by this class are counted and timed.
+"""
+import gc
+import time
+from micropython import const
+
+IDLE_BUDGET = const(4096)  # bytes allocated since last collection before an idle collection runs
+_PROBE_GRANULE = const(16)
+
+
+class GcPolicy:
+    def __init__(self):
+        self.idle_collect = True
+        self.locked = False  # keep automatic collections out of commands
+        self.threshold = 0  # gc.threshold() budget in bytes; 0 for none
+        self.collections = 0
+        self.worst_us = 0
+        self.last_alloc = gc.mem_alloc()
+
+    def set_threshold(self, threshold):
+        """
+        :param int threshold: bytes allocated between automatic collections; 0 to collect only when the heap is full
+        """
+        self.threshold = threshold
+        gc.threshold(threshold if threshold > 0 else -1)
+
+    def collect(self):
+        """ Runs a timed collection
+        """
+        start = time.ticks_us()
+        gc.collect()
+        elapsed = time.ticks_diff(time.ticks_us(), start)
+        self.collections += 1
+        if elapsed > self.worst_us:
+            self.worst_us = elapsed
+        self.last_alloc = gc.mem_alloc()
+
+    def idle(self):
+        """ Called between commands; collects if ``IDLE_BUDGET`` bytes were allocated since last collection
+        """
+        if self.idle_collect and gc.mem_alloc() - self.last_alloc >= IDLE_BUDGET:
+            self.collect()
+
+    def lock(self):
+        """ Disables automatic collections until ``unlock()`` if LOCK is ON
+        """
+        if self.locked:
+            gc.disable()
+
+    def unlock(self):
+        if self.locked:
+            gc.enable()
+
+    def largest_free(self):
+        """ Probes the largest block which can be allocated, by bisection. Runs one counted collection first and
+        keeps collections disabled while probing, so that a failing probe does not trigger another one
+
+        :return int: bytes
+        """
+        self.collect()
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            low = 0
+            high = gc.mem_free()
+            while high - low > _PROBE_GRANULE:
+                size = (low + high) // 2
+                try:
+                    block = bytearray(size)
+                    del block
+                    low = size
+                except MemoryError:
+                    high = size
+        finally:
+            if enabled:
+                gc.enable()
+        return low
@@ -0,0 +1,56 @@
+"""
+MIT License
+
+Copyright (c) 2023 Kazuki Yamamoto
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+Hex text codec shared by SCPI callbacks and host tools.
+
+Bytes travel as 2 lower case hex digits per byte. Both directions run in ``binascii`` C code, which is faster than any
+per-byte Python loop (including viper); the separator between bytes is inserted by ``hexlify`` in the same pass.
+Results are new objects rather than views of reusable buffers: ``binascii`` has no variant writing into a given
+buffer, callers need ``str`` for ``print`` anyway, and filling a buffer byte by byte would bring the loop back.
+"""
+try:
+    import ubinascii as binascii
+except ImportError:
+    import binascii  # CPython on the host
+
+
+def hex_encode(data, sep=""):
+    """ Encodes ``data`` into hex text i.e. ``b"\\x01\\xab"`` to ``01ab``, or ``01,ab`` with ``sep=","``
+
+    :param data: bytes, bytearray or memoryview
+    :param str sep: one character put between bytes; empty for none
+    :return str:
+    """
+    if sep:
+        return binascii.hexlify(data, sep).decode()
+    return binascii.hexlify(data).decode()
+
+
+def hex_decode(text):
+    """ Decodes hex text of even length into bytes; raises ValueError on a non hex digit or odd length
+
+    :param str text: i.e. ``01ab``
+    :return bytes:
+    """
+    return binascii.unhexlify(text)
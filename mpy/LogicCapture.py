@@ -0,0 +1,236 @@
+"""
+MIT License
+
+Copyright (c) 2023 Kazuki Yamamoto
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+PIO based logic capture on GPIO14-22.
+
+A state machine samples 9 pins per sample clock into 16-bit words; DMA streams them into a ring buffer
+so that samples before the trigger are kept. The trigger is watched on ``GPIO_IN`` by the CPU and then
+aligned to the exact sample by searching the captured ring backwards.
+"""
+import time
+import machine
+import rp2
+import uctypes
+from array import array
+from micropython import const
+
+SAMPLE_BASE_PIN = const(14)
+SAMPLE_PINS = const(9)
+SAMPLE_MASK = const(0x1FF)
+RING_SAMPLES = const(4096)
+_RING_BYTES = const(8192)
+_RING_SIZE_BITS = const(13)  # DMA CTRL.RING_SIZE; 1 << 13 == _RING_BYTES
+_MAX_TRANSFERS = const(0x0FFF_FFFF)
+_PIO0_RXF0 = const(0x5020_0020)
+_DREQ_PIO0_RX0 = const(4)
+_SIO_GPIO_IN = const(0xD000_0004)
+_TRIGGER_SLACK = const(16)  # samples; joined RX FIFO holds up to 16 samples
+
+TRIG_IMMEDIATE = const(0)
+TRIG_RISE = const(1)
+TRIG_FALL = const(2)
+TRIG_PATTERN = const(3)
+
+ENCODING_RAW = const(0)
+ENCODING_RLE = const(1)
+ENCODING_STRINGS = {ENCODING_RAW: "RAW", ENCODING_RLE: "RLE"}
+
+STATE_IDLE = const(0)
+STATE_DONE = const(1)
+STATE_TIMEOUT = const(2)
+STATE_STRINGS = {STATE_IDLE: "IDLE", STATE_DONE: "DONE", STATE_TIMEOUT: "TIMEOUT"}
+
+
+@rp2.asm_pio(in_shiftdir=rp2.PIO.SHIFT_RIGHT, autopush=True, push_thresh=32, fifo_join=rp2.PIO.JOIN_RX)
+def sample_pins():
+    # 2 cycles per sample; two 16-bit samples per pushed word, older one in the lower half
+    in_(pins, 9)
+    in_(null, 7)
+
+
+def triggered(kind, mask, value, prev, now):
+    """ Tests trigger condition between two consecutive pin snapshots
+
+    :param int kind: TRIG_IMMEDIATE|TRIG_RISE|TRIG_FALL|TRIG_PATTERN
+    :param int mask: pin bit mask
+    :param int value: pattern value; used with TRIG_PATTERN only
+    :param int prev: previous snapshot
+    :param int now: current snapshot
+    :return bool:
+    """
+    if kind == TRIG_RISE:
+        return (~prev & now & mask) != 0
+    elif kind == TRIG_FALL:
+        return (prev & ~now & mask) != 0
+    elif kind == TRIG_PATTERN:
+        return (now & mask) == value and (prev & mask) != value
+    return True
+
+
+def definite_length_block(payload):
+    """ Wraps ``payload`` into IEEE 488.2 definite length block ``#<n><length><payload>``
+
+    :param str payload:
+    :return str:
+    """
+    length = str(len(payload))
+    return f"#{len(length)}{length}{payload}"
+
+
+class LogicCapture:
+    def __init__(self, base_pin, sm_id=0):
+        """
+        :param machine.Pin base_pin: first pin of the sampled block (GPIO14)
+        :param int sm_id: PIO0 state machine number, 0-3
+        """
+        self.base_pin = base_pin
+        self.sm_id = sm_id
+        self._backing = None
+        self.ring = None
+        self.samples = array("H")
+        self.state = STATE_IDLE
+
+    def _alloc(self):
+        """ Allocates ring buffer aligned to its size as DMA ring wrapping requires
+        """
+        if self.ring is None:
+            self._backing = bytearray(2 * _RING_BYTES)
+            offset = (-uctypes.addressof(self._backing)) % _RING_BYTES
+            self.ring = memoryview(self._backing)[offset:offset + _RING_BYTES]
+
+    def _sample(self, index):
+        i = (index % RING_SAMPLES) << 1
+        ring = self.ring
+        return ring[i] | (ring[i + 1] << 8)
+
+    def _locate(self, kind, mask, value, detected, lowest):
+        """ Searches the ring backwards from ``detected`` for the sample where the trigger condition met
+
+        :return int: sample index of trigger
+        """
+        cur = self._sample(detected)
+        index = detected
+        while index > lowest:
+            prev = self._sample(index - 1)
+            if triggered(kind, mask, value, prev, cur):
+                return index
+            cur = prev
+            index -= 1
+        return detected
+
+    def capture(self, rate, depth, pretrigger, kind=TRIG_IMMEDIATE, mask=0, value=0, timeout_ms=1000):
+        """ Runs one acquisition; blocks until done or ``timeout_ms`` elapsed
+
+        :param int rate: sample rate [Hz]
+        :param int depth: total number of samples, up to ``RING_SAMPLES``
+        :param int pretrigger: number of samples kept before trigger
+        :param int kind: TRIG_IMMEDIATE|TRIG_RISE|TRIG_FALL|TRIG_PATTERN
+        :param int mask: GPIO bit mask (bit n stands for GPIOn)
+        :param int value: GPIO pattern for TRIG_PATTERN
+        :param int timeout_ms:
+        :return int: STATE_DONE|STATE_TIMEOUT
+        """
+        self._alloc()
+        self.samples = array("H")
+        mem32 = machine.mem32
+        ticks_ms = time.ticks_ms
+        ticks_diff = time.ticks_diff
+
+        sm = rp2.StateMachine(self.sm_id, sample_pins, freq=2 * rate, in_base=self.base_pin)
+        dma = rp2.DMA()
+        ctrl = dma.pack_ctrl(size=2, inc_read=False, inc_write=True, ring_size=_RING_SIZE_BITS, ring_sel=True,
+                             treq_sel=_DREQ_PIO0_RX0 + self.sm_id)
+        started = ticks_ms()
+        state = STATE_TIMEOUT
+        try:
+            dma.config(read=_PIO0_RXF0 + 4 * self.sm_id, write=self.ring, count=_MAX_TRANSFERS, ctrl=ctrl,
+                       trigger=True)
+            sm.active(1)
+
+            if kind == TRIG_IMMEDIATE:
+                detected = pretrigger
+            else:
+                detected = -1
+                prev = mem32[_SIO_GPIO_IN]
+                while ticks_diff(ticks_ms(), started) < timeout_ms:
+                    now = mem32[_SIO_GPIO_IN]
+                    if triggered(kind, mask, value, prev, now):
+                        detected = 2 * (_MAX_TRANSFERS - dma.count) - 1
+                        if detected >= pretrigger:
+                            break
+                    prev = now
+                else:
+                    detected = -1
+
+            if detected >= 0:
+                target = detected + depth - pretrigger
+                while ticks_diff(ticks_ms(), started) < timeout_ms:
+                    if 2 * (_MAX_TRANSFERS - dma.count) > target:
+                        state = STATE_DONE
+                        break
+        finally:
+            sm.active(0)
+            dma.active(0)
+            end = 2 * (_MAX_TRANSFERS - dma.count)
+            dma.close()
+
+        if state == STATE_DONE:
+            if kind == TRIG_IMMEDIATE:
+                first = end - depth
+            else:
+                # CPU sees the edge later than the state machine does; FIFO backlog may shift it either way
+                latest = min(detected + _TRIGGER_SLACK, end - (depth - pretrigger))
+                lowest = max(end - RING_SAMPLES + pretrigger, pretrigger)
+                detected = self._locate(kind, (mask >> SAMPLE_BASE_PIN) & SAMPLE_MASK,
+                                        (value >> SAMPLE_BASE_PIN) & SAMPLE_MASK, latest, lowest)
+                first = detected - pretrigger
+            self.samples = array("H", (self._sample(i) & SAMPLE_MASK for i in range(first, first + depth)))
+        self.state = state
+        return state
+
+    def encode(self, encoding=ENCODING_RAW):
+        """ Encodes captured samples into hex string. Returns definite length block.
+
+        - RAW: 3 hex digits per sample
+        - RLE: 3 hex digits of sample value followed by 4 hex digits of run length, per run
+
+        :param int encoding: ENCODING_RAW|ENCODING_RLE
+        :return str:
+        """
+        samples = self.samples
+        if encoding == ENCODING_RLE:
+            runs = []
+            length = len(samples)
+            i = 0
+            while i < length:
+                value = samples[i]
+                run = 1
+                while i + run < length and samples[i + run] == value and run < 0xFFFF:
+                    run += 1
+                runs.append(f"{value:03x}{run:04x}")
+                i += run
+            payload = "".join(runs)
+        else:
+            payload = "".join(f"{s:03x}" for s in samples)
+        return definite_length_block(payload)
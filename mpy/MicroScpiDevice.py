@@ -27,6 +27,7 @@ import re
 if sys.version_info > (3, 6, 0):
     from typing import Tuple, List
 from collections import namedtuple
+from Accel import native
 
 rstring = re.compile(r"^(\*?[a-zA-Z]\w+[a-zA-Z])(\d+|\?)$")
 
@@ -45,6 +46,7 @@ class ScpiKeyword(namedtuple("ScpiKeyword", [
     def __str__(self):
         return self.long
 
+    @native
     def match(self, candidate):
         """
         :param str candidate: keyword string. may have option string either numeric or "?".
@@ -116,6 +118,7 @@ class ScpiCommand(namedtuple("ScpiCommand", [
     def cat(self):
         return ":".join([k.long for k in self.keywords])
 
+    @native
     def match(self, candidate_cmd):
         """ Tests if `candidate_cmd` matches with `keywords`.
 
@@ -148,7 +151,9 @@ class MicroScpiDevice:
     kw_esr = ScpiKeyword("*ESR", "*ESR", ["?"])
     kw_idn = ScpiKeyword("*IDN", "*IDN", ["?"])
     kw_opc = ScpiKeyword("*OPC", "*OPC", ["?"])
+    kw_rcl = ScpiKeyword("*RCL", "*RCL", None)
     kw_rst = ScpiKeyword("*RST", "*RST", None)
+    kw_sav = ScpiKeyword("*SAV", "*SAV", None)
     kw_sre = ScpiKeyword("*SRE", "*SRE", ["?"])
     kw_stb = ScpiKeyword("*STB", "*STB", ["?"])
     kw_tst = ScpiKeyword("*TST", "*TST", ["?"])
@@ -164,6 +169,7 @@ class MicroScpiDevice:
         self.error_wr_pointer = (self.error_wr_pointer + 1) & 0xFF
 
     @staticmethod
+    @native
     def mini_lexer(line: str):
         """ Split `line` into tuple of (list of keywords) and a parameter string
 
@@ -182,6 +188,58 @@ class MicroScpiDevice:
         else:
             return "", ""
 
+    def dispatch(self, command, param, opt):
+        """ Runs callback of matched `command`. Subclasses may override this to run it elsewhere
+
+        :param ScpiCommand command: matched command
+        :param str param: parameter string
+        :param list opt: option strings
+        """
+        command.callback(param, opt)
+
+    def idle(self):
+        """ Called by the command loop in gaps between commands
+        """
+        pass
+
+    def ticket(self):
+        """ Returns a ticket covering every command dispatched so far; see `wait()`
+
+        :return int:
+        """
+        return 0
+
+    def wait(self, ticket):
+        """ Waits until commands covered by `ticket` have finished
+
+        :param int ticket:
+        """
+        pass
+
+    def finished(self, ticket):
+        """ Tests if commands covered by ``ticket`` have finished, without waiting
+
+        :param int ticket:
+        :return bool:
+        """
+        return True
+
+    def cancel(self, ticket):
+        """ Cancels commands covered by ``ticket``. Subclasses may override this to stop long running commands
+
+        :param int ticket:
+        """
+        pass
+
+    def process_binary(self, frames):
+        """ Runs binary command frames. Subclasses may override this to support a binary protocol
+
+        :param memoryview frames: concatenated frames
+        :return bytes: concatenated replies
+        """
+        return b""
+
+    @native
     def parse_and_process(self, line: str):
         """ Parse `line` and process if it is valid
 
@@ -203,7 +261,7 @@ class MicroScpiDevice:
             for command in length_matched:
                 result = command.match(candidate_cmd)
                 if result.match is True:
-                    command.callback(candidate_param, result.opt)
+                    self.dispatch(command, candidate_param, result.opt)
                     break
             else:
                 # When no break occurred - error
@@ -0,0 +1,142 @@
+"""
+MIT License
+
+Copyright (c) 2023 Kazuki Yamamoto
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+PIO and DMA based digital pattern generator on GPIO14-22.
+
+A data DMA channel feeds 16-bit samples into the TX FIFO of a PIO1 state machine which drives 9 pins per sample
+clock. A control DMA channel chained from the data channel re-arms it by writing the buffer address into its
+``READ_ADDR_TRIG`` alias, reading from a null terminated address list; a single, non-incremented entry loops
+forever. Repeats therefore have no gap and need no CPU.
+"""
+import rp2
+import uctypes
+from array import array
+from micropython import const
+
+PATTERN_BASE_PIN = const(14)
+PATTERN_PINS = const(9)
+PATTERN_MASK = const(0x1FF)
+REPEAT_CONTINUOUS = const(0)
+_PIO1_TXF0 = const(0x5030_0010)
+_DREQ_PIO1_TX0 = const(8)
+_DMA_BASE = const(0x5000_0000)
+_DMA_CH_SIZE = const(0x40)
+_DMA_AL3_READ_ADDR_TRIG = const(0x3C)
+
+
+@rp2.asm_pio(out_init=(rp2.PIO.OUT_LOW,) * 9, out_shiftdir=rp2.PIO.SHIFT_RIGHT, autopull=True, pull_thresh=16,
+             fifo_join=rp2.PIO.JOIN_TX)
+def play_pins():
+    # 2 cycles per sample; pins hold the last sample while the FIFO is empty
+    out(pins, 9)
+    out(null, 7)
+
+
+class PatternGenerator:
+    def __init__(self, base_pin, sm_id=4):
+        """
+        :param machine.Pin base_pin: first pin of the driven block (GPIO14)
+        :param int sm_id: PIO1 state machine number, 4-7
+        """
+        self.base_pin = base_pin
+        self.sm_id = sm_id
+        self.samples = array("H")
+        self._blocks = array("I")
+        self._sm = None
+        self._data = None
+        self._control = None
+
+    def load(self, samples, append=False):
+        """ Stops playback and replaces (or extends) the pattern buffer
+
+        :param samples: iterable of 9-bit samples; bit 0 is GPIO14
+        :param bool append:
+        :return bool: True if the state machine was released, see ``stop()``
+        """
+        released = self.stop()
+        if not append:
+            self.samples = array("H")
+        for sample in samples:
+            self.samples.append(sample & PATTERN_MASK)
+        return released
+
+    def running(self):
+        """
+        :return bool: True while DMA still feeds the state machine
+        """
+        if self._data is None:
+            return False
+        return self._data.active() or self._control.active()
+
+    def start(self, rate, repeat=1):
+        """ Starts playback of the pattern buffer
+
+        :param int rate: sample rate [Hz]
+        :param int repeat: number of times the buffer is played; REPEAT_CONTINUOUS loops until ``stop()``
+        :return bool: False if pattern buffer is empty
+        :raises ValueError: ``rate`` is below what the PIO clock divider reaches (about sysclk / 131072)
+        """
+        self.stop()
+        length = len(self.samples)
+        if length == 0:
+            return False
+
+        # set up the state machine first so that a rate out of divider range leaves nothing allocated
+        self._sm = rp2.StateMachine(self.sm_id, play_pins, freq=2 * rate, out_base=self.base_pin)
+        address = uctypes.addressof(self.samples)
+        if repeat == REPEAT_CONTINUOUS:
+            self._blocks = array("I", [address])
+        else:
+            self._blocks = array("I", [address] * repeat + [0])  # writing 0 to a trigger alias is a null trigger
+
+        pio_sm = self.sm_id & 3
+        self._data = rp2.DMA()
+        self._control = rp2.DMA()
+        data_ctrl = self._data.pack_ctrl(size=1, inc_read=True, inc_write=False, treq_sel=_DREQ_PIO1_TX0 + pio_sm,
+                                         chain_to=self._control.channel)
+        control_ctrl = self._control.pack_ctrl(size=2, inc_read=repeat != REPEAT_CONTINUOUS, inc_write=False,
+                                               chain_to=self._control.channel)
+        self._data.config(read=self.samples, write=_PIO1_TXF0 + 4 * pio_sm, count=length, ctrl=data_ctrl)
+        self._control.config(read=self._blocks,
+                             write=_DMA_BASE + _DMA_CH_SIZE * self._data.channel + _DMA_AL3_READ_ADDR_TRIG,
+                             count=1, ctrl=control_ctrl)
+        self._sm.active(1)
+        self._control.active(1)
+        return True
+
+    def stop(self):
+        """ Stops playback and releases the state machine and DMA channels.
+        Pins stay connected to PIO until the caller re-initializes them.
+
+        :return bool: True if the state machine was released
+        """
+        if self._sm is None:
+            return False
+        self._sm.active(0)
+        self._control.close()
+        self._data.close()
+        self._sm = None
+        self._data = None
+        self._control = None
+        return True
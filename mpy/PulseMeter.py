@@ -0,0 +1,95 @@
+"""
+MIT License
+
+Copyright (c) 2023 Kazuki Yamamoto
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+PIO based pulse timer.
+
+A state machine running at system clock synchronizes to a rising edge, then counts 2-cycle loop iterations while
+the pin stays high and keeps counting until the next rising edge. It pushes the high time and the whole period as a
+pair and re-synchronizes, so a stall on a full RX FIFO never yields a partial cycle.
+"""
+import time
+import machine
+import rp2
+from micropython import const
+
+CYCLES_PER_COUNT = const(2)
+_PERIOD_OVERHEAD = const(2)  # cycles not covered by counting loops per period
+
+
+@rp2.asm_pio(fifo_join=rp2.PIO.JOIN_RX)
+def pulse_timer():
+    wrap_target()
+    wait(0, pin, 0)
+    wait(1, pin, 0)
+    mov(x, invert(null))
+    label("high")
+    jmp(x_dec, "high_next")
+    label("high_next")
+    jmp(pin, "high")
+    mov(y, x)
+    label("low")
+    jmp(pin, "done")
+    jmp(x_dec, "low")
+    label("done")
+    mov(isr, invert(y))
+    push(block)
+    mov(isr, invert(x))
+    push(block)
+    wrap()
+
+
+class PulseMeter:
+    def __init__(self, sm_id=1):
+        """
+        :param int sm_id: state machine number
+        """
+        self.sm_id = sm_id
+
+    def measure(self, pin, gate_ms):
+        """ Measures full cycles on ``pin`` for ``gate_ms`` and returns totals
+
+        :param machine.Pin pin:
+        :param int gate_ms: gate time [ms]
+        :return tuple: (number of cycles, total high cycles, total period cycles, system clock [Hz])
+        """
+        sysclk = machine.freq()
+        sm = rp2.StateMachine(self.sm_id, pulse_timer, freq=sysclk, in_base=pin, jmp_pin=pin)
+        ticks_ms = time.ticks_ms
+        ticks_diff = time.ticks_diff
+        count = 0
+        high = 0
+        period = 0
+        started = ticks_ms()
+        sm.active(1)
+        try:
+            while ticks_diff(ticks_ms(), started) < gate_ms:
+                while sm.rx_fifo() >= 2:
+                    high += sm.get()
+                    period += sm.get()
+                    count += 1
+        finally:
+            sm.active(0)
+        high = high * CYCLES_PER_COUNT
+        period = period * CYCLES_PER_COUNT + count * _PERIOD_OVERHEAD
+        return count, high, period, sysclk
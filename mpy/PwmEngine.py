@@ -0,0 +1,140 @@
+"""
+MIT License
+
+Copyright (c) 2023 Kazuki Yamamoto
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+Slice aware PWM engine.
+
+RP2040 has 8 PWM slices; GPIO ``n`` is channel ``n & 1`` (A/B) of slice ``(n >> 1) & 7``. Both channels of a
+slice share the divider and counter wrap, so they always run at one frequency. Settings are programmed straight
+into the slice registers: slices whose timing changes are stopped, cleared and then started together by one
+write to the ``EN`` register so that their counters stay in phase. Slices whose timing is unchanged only get
+their double buffered compare register updated, which takes effect at the next wrap without a glitch.
+"""
+import machine
+from micropython import const
+
+_PWM_BASE = const(0x4005_0000)
+_SLICE_STRIDE = const(0x14)
+_CSR = const(0x00)
+_DIV = const(0x04)
+_CTR = const(0x08)
+_CC = const(0x0C)
+_TOP = const(0x10)
+_PWM_EN = const(0x4005_00A0)
+_CSR_EN = const(0x01)
+_MAX_TOP = const(0xFFFE)  # keeps CC = TOP + 1 (100 % duty) within the 16-bit field
+_MIN_DIV16 = const(0x10)  # 1.0 in 8.4 fixed point
+_MAX_DIV16 = const(0xFFF)
+_MAX_DUTY = const(65535)
+
+CHANNEL_STRINGS = {0: "A", 1: "B"}
+
+
+def pwm_slice(gpio):
+    """
+    :param int gpio:
+    :return int: slice number
+    """
+    return (gpio >> 1) & 7
+
+
+def pwm_channel(gpio):
+    """
+    :param int gpio:
+    :return int: 0 for channel A, 1 for channel B
+    """
+    return gpio & 1
+
+
+def pwm_timing(freq, sysclk):
+    """ Chooses divider and wrap value for ``freq`` keeping the counter range as wide as possible
+
+    :param int freq: PWM frequency [Hz]
+    :param int sysclk: system clock [Hz]
+    :return tuple: (divider in 8.4 fixed point, TOP)
+    """
+    div16 = -(-sysclk * 16 // (freq * (_MAX_TOP + 1)))
+    div16 = min(max(div16, _MIN_DIV16), _MAX_DIV16)
+    top = min(sysclk * 16 // (div16 * freq) - 1, _MAX_TOP)
+    return div16, top
+
+
+class PwmEngine:
+    @staticmethod
+    def conflicts(channels):
+        """ Finds slices whose enabled channels ask for different frequencies
+
+        :param dict channels: {gpio: (enabled, freq, duty_u16)}
+        :return list: slice numbers
+        """
+        freqs = {}
+        found = []
+        for gpio, (enabled, freq, duty) in channels.items():
+            if enabled:
+                number = pwm_slice(gpio)
+                if freqs.get(number, freq) != freq and number not in found:
+                    found.append(number)
+                freqs[number] = freq
+        return found
+
+    @staticmethod
+    def program(channels, sysclk, align=False):
+        """ Programs slices of enabled channels; does not start stopped slices.
+        Call ``enable()`` with the returned mask once output pins are routed to PWM.
+
+        :param dict channels: {gpio: (enabled, freq, duty_u16)}; must be free of ``conflicts()``
+        :param int sysclk: system clock [Hz]
+        :param bool align: restart every programmed slice, not only the ones whose timing changes
+        :return int: mask of slices to start
+        """
+        mem32 = machine.mem32
+        restart = 0
+        for gpio, (enabled, freq, duty) in channels.items():
+            if not enabled:
+                continue
+            number = pwm_slice(gpio)
+            bit = 1 << number
+            base = _PWM_BASE + number * _SLICE_STRIDE
+            div16, top = pwm_timing(freq, sysclk)
+            if not restart & bit:
+                running = mem32[base + _CSR] & _CSR_EN
+                if align or not running or mem32[base + _DIV] & 0xFFF != div16 or mem32[base + _TOP] & 0xFFFF != top:
+                    restart |= bit
+                    mem32[_PWM_EN] = mem32[_PWM_EN] & ~bit & 0xFF
+                    mem32[base + _CSR] = 0
+                    mem32[base + _DIV] = div16
+                    mem32[base + _TOP] = top
+                    mem32[base + _CTR] = 0
+            cc = duty * (top + 1) // _MAX_DUTY
+            shift = 16 * pwm_channel(gpio)
+            mem32[base + _CC] = (mem32[base + _CC] & ~(0xFFFF << shift) & 0xFFFF_FFFF) | (cc << shift)
+        return restart
+
+    @staticmethod
+    def enable(mask):
+        """ Starts slices in ``mask`` at once
+
+        :param int mask: slice mask returned by ``program()``
+        """
+        if mask:
+            machine.mem32[_PWM_EN] = machine.mem32[_PWM_EN] & 0xFF | mask
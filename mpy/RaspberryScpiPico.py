@@ -31,7 +31,9 @@ from collections import OrderedDict
 - *ESR? <No Param>
 - *IDN? <No Param>
 - *OPC/*OPC? <No Param>
+- *RCL num
 - *RST <No Param>
+- *SAV num
 - *SRE/*SRE? <No Param>
 - *STB? <No Param>
 - *TST? <No Param>
@@ -39,18 +41,45 @@ from collections import OrderedDict
 - MACHINE:FREQuency[?] num|DEFault|MINimum|MAXimum
 
 - SYSTem:ERRor?
+- SYSTem:DUALcore[?] ON|OFF|DEFault
+- SYSTem:MEMory?
+- SYSTem:BOOT:TIMing?
+- SYSTem:TRACe? [first,count]
+- SYSTem:TRACe:LEVel[?] OFF|ERRor|INFO|DEBug|DEFault
+- SYSTem:TRACe:CLEar
+- SYSTem:GC:IDLE[?] ON|OFF|DEFault
+- SYSTem:GC:LOCK[?] ON|OFF|DEFault
+- SYSTem:GC:THReshold[?] num|DEFault|MINimum|MAXimum
+
+- MEMory:STATe:RECall:AUTO[?] num|OFF
 
 - PIN?
 - PIN[14|15|16|17|18|19|20|21|22|25]:MODE[?] INput|OUTput|ODrain|PWM|DEFault
 - PIN[14|15|16|17|18|19|20|21|22|25]:VALue[?] 0|1|OFF|ON|DEFault
 - PIN[14|15|16|17|18|19|20|21|22|25]:ON
 - PIN[14|15|16|17|18|19|20|21|22|25]:OFF
+- PIN[14|15|16|17|18|19|20|21|22|25]:MEASure:GATE[?] num|DEFault|MINimum|MAXimum
+- PIN[14|15|16|17|18|19|20|21|22|25]:MEASure:FREQuency?
+- PIN[14|15|16|17|18|19|20|21|22|25]:MEASure:PERiod?
+- PIN[14|15|16|17|18|19|20|21|22|25]:MEASure:PWIDth?
+- PIN[14|15|16|17|18|19|20|21|22|25]:MEASure:DCYCle?
+- PIN[14|15|16|17|18|19|20|21|22|25]:EVENt:EDGE[?] RISE|FALL|BOTH|OFF|DEFault
+- PIN[14|15|16|17|18|19|20|21|22|25]:EVENt:COUNt?
+- PIN[14|15|16|17|18|19|20|21|22|25]:EVENt:DATA?
+- PIN[14|15|16|17|18|19|20|21|22|25]:EVENt:CLEar
+
+- PORT:VALue[?] mask,value
+- PORT:ON mask
+- PORT:OFF mask
 
 - PWM?
 - PWM[14|15|16|17|18|19|20|21|22|25]:ON
 - PWM[14|15|16|17|18|19|20|21|22|25]:OFF
 - PWM[14|15|16|17|18|19|20|21|22|25]:FREQuency[?] num|DEFault|MINimum|MAXimum
 - PWM[14|15|16|17|18|19|20|21|22|25]:DUTY[?] num|DEFault|MINimum|MAXimum
+- PWM[14|15|16|17|18|19|20|21|22|25]:SLICe?
+- PWM:SYNChronous[?] ON|OFF|DEFault
+- PWM:APPLy [ALIGn]
 
 - LED?
 - LED:ON
@@ -79,17 +108,100 @@ from collections import OrderedDict
 - SPI[01]:WRITE data,pre_cs,post_cs
 - SPI[01]:READ? length,mask,pre_cs,post_cs
 
+- UART?
+- UART[01]:BAUDrate[?] num|DEFault|MINimum|MAXimum
+- UART[01]:WIDTH[?] 5|6|7|8|DEFault
+- UART[01]:PARITY[?] NONE|EVEN|ODD|DEFault
+- UART[01]:SBITs[?] 1|2|DEFault
+- UART[01]:START
+- UART[01]:STOP
+- UART[01]:STATe?
+- UART[01]:WRITE data
+- UART[01]:READ?
+- UART[01]:COUNt?
+
 - ADC[01234]:READ?
+- ADC[01234]:OVERsampling[?] num|DEFault|MINimum|MAXimum
+- ADC[01234]:MEASure:STATistics? count
+
+- LOGic:CAPTure:RATE[?] num|DEFault|MINimum|MAXimum
+- LOGic:CAPTure:DEPTh[?] num|DEFault|MINimum|MAXimum
+- LOGic:CAPTure:PRETrigger[?] num|DEFault|MINimum|MAXimum
+- LOGic:CAPTure:TRIGger[?] IMMediate|RISE,pin|FALL,pin|PATTern,mask,value
+- LOGic:CAPTure:ENCoding[?] RAW|RLE
+- LOGic:CAPTure:TIMeout[?] num|DEFault|MINimum|MAXimum
+- LOGic:CAPTure:START
+- LOGic:CAPTure:STATe?
+- LOGic:CAPTure:DATA?
+
+- PATTern:DATA[?] sample,sample,...
+- PATTern:APPend sample,sample,...
+- PATTern:RATE[?] num|DEFault|MINimum|MAXimum
+- PATTern:REPeat[?] num|CONTinuous|DEFault|MINimum|MAXimum
+- PATTern:START
+- PATTern:STOP
+- PATTern:STATe?
+
+- WATCh:INTerval[?] num|DEFault|MINimum|MAXimum
+- WATCh:TIMeout[?] num|DEFault|MINimum|MAXimum
+- WATCh:PIN[nn]:VALue? 0|1|OFF|ON
+- WATCh:I2C[01]:READ? address,memaddress,mask,target,addrsize
+- WATCh:SPI[01]:READ? command,mask,target,pre_cs,post_cs
+
+- SEQuence:RECord
+- SEQuence:WAIT num
+- SEQuence:END
+- SEQuence:REPeat[?] num|CONTinuous|DEFault|MINimum|MAXimum
+- SEQuence:START
+- SEQuence:STOP
+- SEQuence:STATe?
+- SEQuence:COUNt?
+- SEQuence:TIMing?
+
+- LOG:INTerval[?] num|DEFault|MINimum|MAXimum
+- LOG:ADC[?] mask
+- LOG:PORT[?] 0|1|OFF|ON
+- LOG:REGister[?] bus,address,memaddress,nbytes|OFF
+- LOG:SIZE[?] num|DEFault|MINimum|MAXimum
+- LOG:FORMat?
+- LOG:START
+- LOG:STOP
+- LOG:STATe?
+- LOG:COUNt?
+- LOG:DATA? [first,count]
+- LOG:CLEar
 
 """
 from micropython import const
 import sys
+import os
+import gc
+import struct
 import machine
+import io
 
 import re
-from math import ceil
+from math import sqrt
 from collections import namedtuple
 from MicroScpiDevice import ScpiKeyword, ScpiCommand, ScpiErrorNumber, MicroScpiDevice, cb_do_nothing, ERROR_LIST
+from LogicCapture import LogicCapture, RING_SAMPLES, TRIG_IMMEDIATE, TRIG_RISE, TRIG_FALL, TRIG_PATTERN, \
+    ENCODING_RAW, ENCODING_RLE, ENCODING_STRINGS, STATE_STRINGS, definite_length_block
+from PatternGenerator import PatternGenerator, PATTERN_BASE_PIN, PATTERN_PINS, PATTERN_MASK, REPEAT_CONTINUOUS
+from PulseMeter import PulseMeter
+from PwmEngine import PwmEngine, pwm_slice, pwm_channel, CHANNEL_STRINGS
+from BusWorker import BusWorker
+from UartBridge import UartBridge, UART_PINS
+from Sequencer import Sequencer, MAX_SEQUENCE_DELAY
+from DataLogger import DataLogger, FILE_SIZE, TIMESTAMP_FORMAT
+from EdgeLogger import EdgeLogger, EDGE_OFF, EDGE_RISE, EDGE_FALL, EDGE_BOTH, EDGE_STRINGS
+from HexCodec import hex_encode, hex_decode
+from GcPolicy import GcPolicy
+from Accel import native
+from BootTiming import mark, milestones
+from BinaryProtocol import FRAME_FORMAT, FRAME_HEADER_SIZE, OP_NOP, OP_I2C_WRITE, OP_I2C_READ, OP_I2C_READ_MEM, \
+    OP_SPI_TRANSFER, OP_PIN_READ, OP_PIN_WRITE, OP_ADC_READ, STATUS_OK, STATUS_BUS_FAIL, STATUS_INVALID, \
+    STATUS_TRUNCATED, STATUS_BUSY, reply
+from Trace import TRACE, TRACE_OFF, TRACE_ERROR, TRACE_INFO, TRACE_DEBUG, TRACE_LEVEL_STRINGS, DEFAULT_TRACE_LEVEL
 
 ABS_MAX_CLOCK = const(264_000_000)
 DEFAULT_CPU_CLOCK = const(125_000_000)
@@ -108,6 +220,78 @@ MIN_SPI_CLOCK = const(10_000)
 DEFAULT_SPI_CLOCK = const(1_000_000)
 MAX_UART_BAUD = const(500_000)
 MIN_UART_BAUD = const(300)
+DEFAULT_UART_BAUD = const(115_200)
+MAX_UART_BITS = const(8)
+MIN_UART_BITS = const(5)
+DEFAULT_UART_BITS = const(8)
+MAX_UART_STOP = const(2)
+MIN_UART_STOP = const(1)
+DEFAULT_UART_STOP = const(1)
+UART_PARITY_STRINGS = {None: "NONE", 0: "EVEN", 1: "ODD"}
+MAX_ADC_OVERSAMPLING = const(256)
+MIN_ADC_OVERSAMPLING = const(1)
+DEFAULT_ADC_OVERSAMPLING = const(1)
+MAX_ADC_STAT_COUNT = const(10_000)
+MAX_ADC_VALUE = const(65535)
+SIO_GPIO_IN = const(0xD000_0004)
+SIO_GPIO_OUT = const(0xD000_0010)
+SIO_GPIO_OUT_SET = const(0xD000_0014)
+SIO_GPIO_OUT_CLR = const(0xD000_0018)
+SIO_GPIO_OUT_XOR = const(0xD000_001C)
+SIO_GPIO_OE = const(0xD000_0020)
+SIO_GPIO_OE_SET = const(0xD000_0024)
+SIO_GPIO_OE_CLR = const(0xD000_0028)
+PORT_MASK = const(0x027F_C000)  # GPIO14-22 and GPIO25
+LOGIC_MASK = const(0x007F_C000)  # GPIO14-22
+MAX_LOGIC_RATE = const(25_000_000)
+MIN_LOGIC_RATE = const(1_000)
+DEFAULT_LOGIC_RATE = const(1_000_000)
+MAX_LOGIC_DEPTH = RING_SAMPLES - 512
+MIN_LOGIC_DEPTH = const(16)
+DEFAULT_LOGIC_DEPTH = const(1024)
+DEFAULT_LOGIC_PRETRIGGER = const(0)
+MAX_LOGIC_TIMEOUT = const(10_000)
+MIN_LOGIC_TIMEOUT = const(1)
+DEFAULT_LOGIC_TIMEOUT = const(1_000)
+MAX_PATTERN_RATE = const(25_000_000)
+MIN_PATTERN_RATE = const(1_000)
+DEFAULT_PATTERN_RATE = const(1_000_000)
+MAX_PATTERN_REPEAT = const(1_000)
+MIN_PATTERN_REPEAT = const(1)
+DEFAULT_PATTERN_REPEAT = const(1)
+MAX_PATTERN_SAMPLES = const(8192)
+MAX_MEASURE_GATE = const(10_000)
+MIN_MEASURE_GATE = const(1)
+DEFAULT_MEASURE_GATE = const(100)
+MEASURE_OVERFLOW = 9.9e37  # returned when no full cycle was seen in the gate time
+MAX_WATCH_INTERVAL = const(1_000)
+MIN_WATCH_INTERVAL = const(1)
+DEFAULT_WATCH_INTERVAL = const(10)
+MAX_WATCH_TIMEOUT = const(60_000)
+MIN_WATCH_TIMEOUT = const(1)
+DEFAULT_WATCH_TIMEOUT = const(1_000)
+MAX_SEQUENCE_REPEAT = const(1_000)
+MIN_SEQUENCE_REPEAT = const(1)
+DEFAULT_SEQUENCE_REPEAT = const(1)
+MIN_SEQUENCE_DELAY = const(1)
+DEFAULT_SEQUENCE_DELAY = const(1_000)
+MAX_LOG_INTERVAL = const(3_600_000)
+MIN_LOG_INTERVAL = const(10)
+DEFAULT_LOG_INTERVAL = const(1_000)
+MAX_LOG_SIZE = const(1_048_576)
+MIN_LOG_SIZE = const(32_768)
+DEFAULT_LOG_SIZE = const(65_536)
+LOG_ADC_MASK = const(0x1F)
+MAX_LOG_REGISTER = const(8)
+SAV_PATH = "/sav"
+SAV_MAGIC = b"SAV1"
+MAX_SAV_SLOT = const(9)
+MIN_SAV_SLOT = const(0)
+DEFAULT_SAV_SLOT = const(0)
+SAV_PULL_NONE = const(0xFF)  # stands for ``pull=None`` in saved state
+MAX_GC_THRESHOLD = const(65_536)
+MIN_GC_THRESHOLD = const(0)
+DEFAULT_GC_THRESHOLD = const(0)
 IO_ON = 1
 IO_OFF = 0
 IO_VALUE_STRINGS = {IO_ON: "ON", IO_OFF: "OFF"}
@@ -125,6 +309,7 @@ DEFAULT_SPI_MODE = SPI_MODE0
 SPI_CSPOL_HI = const(1)
 SPI_CSPOL_LO = const(0)
 DEFAULT_SPI_CSPOL = SPI_CSPOL_LO
+SPI_READ_CHUNK = const(256)  # SPI[01]:READ? checks for cancellation between chunks
 SPI_MASK_CKPOL = const(0x02)
 SPI_CKPOL_HI = const(1)
 SPI_CKPOL_LO = const(0)
@@ -145,6 +330,9 @@ DEFAULT_SPI_CKPH = SPI_CKPH_LO
 -222    data out of range; data value was outside of valid range
 -223    too much data; more data than expected
 -224    illegal parameter value; invalid parameter choice
+-225    out of memory; heap ran out while a command ran
+-250    mass storage error; flash file system access failed
+-256    file name not found; i.e. *RCL of an empty slot
 -333    I2C bus access fail
 -334    SPI bus access fail
 """
@@ -158,9 +346,13 @@ E_UNDEFINED_HEADER = ScpiErrorNumber(-113, "Undefined header")
 E_WRONG_NUMBER_CHARACTER = ScpiErrorNumber(-121, "Invalid character in number")
 E_CHARACTER_UNALLOWED = ScpiErrorNumber(-148, "Character data not allowed")
 E_STRING_UNALLOWED = ScpiErrorNumber(-158, "String data not allowed")
+E_SETTINGS_CONFLICT = ScpiErrorNumber(-221, "Settings conflict")
 E_OUT_OF_RANGE = ScpiErrorNumber(-222, "Data out of range")
 E_DATA_OVERFLOW = ScpiErrorNumber(-223, "Too much data")
 E_INVALID_PARAMETER = ScpiErrorNumber(-224, "Invalid parameter value")
+E_OUT_OF_MEMORY = ScpiErrorNumber(-225, "Out of memory")
+E_MASS_STORAGE = ScpiErrorNumber(-250, "Mass storage error")
+E_FILE_NOT_FOUND = ScpiErrorNumber(-256, "File name not found")
 E_I2C_FAIL = ScpiErrorNumber(-333, "I2C bus error")
 E_SPI_FAIL = ScpiErrorNumber(-334, "SPI bus error")
 
@@ -269,6 +461,158 @@ class SpiConfig(namedtuple("SpiConfig", [
     """
 
 
+class UartConfig(namedtuple("UartConfig", [
+    "baudrate",  # baud rate
+    "bits",  # data bits
+    "parity",  # None|0 (even)|1 (odd)
+    "stop"  # stop bits
+])):
+    """
+    :int baudrate: baud rate
+    :int bits: data bits
+    :int parity: None|0 (even)|1 (odd)
+    :int stop: stop bits
+    """
+
+
+DEFAULT_UART_CONFIG = UartConfig(DEFAULT_UART_BAUD, DEFAULT_UART_BITS, None, DEFAULT_UART_STOP)
+
+
+class AdcConfig(namedtuple("AdcConfig", [
+    "oversampling",  # number of raw samples averaged into one decimated sample
+])):
+    """
+    :int oversampling: number of raw samples averaged into one decimated sample
+    """
+
+
+DEFAULT_ADC_CONFIG = AdcConfig(DEFAULT_ADC_OVERSAMPLING)
+
+
+class MeasureConfig(namedtuple("MeasureConfig", [
+    "gate",  # gate time in ms
+])):
+    """
+    :int gate: gate time in ms
+    """
+
+
+DEFAULT_MEASURE_CONFIG = MeasureConfig(DEFAULT_MEASURE_GATE)
+
+
+class LogicConfig(namedtuple("LogicConfig", [
+    "rate",  # sample rate
+    "depth",  # number of samples
+    "pretrigger",  # number of samples before trigger
+    "trigger",  # TRIG_IMMEDIATE|TRIG_RISE|TRIG_FALL|TRIG_PATTERN
+    "mask",  # trigger pin mask
+    "value",  # trigger pattern
+    "encoding",  # ENCODING_RAW|ENCODING_RLE
+    "timeout"  # acquisition timeout in ms
+])):
+    """
+    :int rate: sample rate
+    :int depth: number of samples
+    :int pretrigger: number of samples before trigger
+    :int trigger: TRIG_IMMEDIATE|TRIG_RISE|TRIG_FALL|TRIG_PATTERN
+    :int mask: trigger pin mask
+    :int value: trigger pattern
+    :int encoding: ENCODING_RAW|ENCODING_RLE
+    :int timeout: acquisition timeout in ms
+    """
+
+
+class PatternConfig(namedtuple("PatternConfig", [
+    "rate",  # sample rate
+    "repeat"  # number of repeats; REPEAT_CONTINUOUS to loop
+])):
+    """
+    :int rate: sample rate
+    :int repeat: number of repeats; REPEAT_CONTINUOUS to loop
+    """
+
+
+DEFAULT_PATTERN_CONFIG = PatternConfig(DEFAULT_PATTERN_RATE, DEFAULT_PATTERN_REPEAT)
+
+
+class WatchConfig(namedtuple("WatchConfig", [
+    "interval",  # poll interval in ms
+    "timeout"  # watch timeout in ms
+])):
+    """
+    :int interval: poll interval in ms
+    :int timeout: watch timeout in ms
+    """
+
+
+DEFAULT_WATCH_CONFIG = WatchConfig(DEFAULT_WATCH_INTERVAL, DEFAULT_WATCH_TIMEOUT)
+
+
+class SequenceConfig(namedtuple("SequenceConfig", [
+    "repeat"  # number of loops; REPEAT_CONTINUOUS to loop
+])):
+    """
+    :int repeat: number of loops; REPEAT_CONTINUOUS to loop
+    """
+
+
+DEFAULT_SEQUENCE_CONFIG = SequenceConfig(DEFAULT_SEQUENCE_REPEAT)
+
+
+class LogConfig(namedtuple("LogConfig", [
+    "interval",  # record period in ms
+    "adc",  # ADC channel mask
+    "port",  # IO_ON to record GPIO_IN
+    "register",  # None or (bus, address, memaddress, nbytes) of I2C register to record
+    "size"  # bound of flash use in bytes
+])):
+    """
+    :int interval: record period in ms
+    :int adc: ADC channel mask
+    :int port: IO_ON to record GPIO_IN
+    :tuple register: None or (bus, address, memaddress, nbytes) of I2C register to record
+    :int size: bound of flash use in bytes
+    """
+
+
+DEFAULT_LOG_CONFIG = LogConfig(DEFAULT_LOG_INTERVAL, 0, IO_OFF, None, DEFAULT_LOG_SIZE)
+
+DEFAULT_LOGIC_CONFIG = LogicConfig(DEFAULT_LOGIC_RATE, DEFAULT_LOGIC_DEPTH, DEFAULT_LOGIC_PRETRIGGER, TRIG_IMMEDIATE,
+                                   0, 0, ENCODING_RAW, DEFAULT_LOGIC_TIMEOUT)
+
+
+class StatusCache:
+    """ Status query response made of one fragment per config entry.
+    Config entries are immutable namedtuples which are replaced on every change, so a fragment is rendered again
+    only when its entry is no longer the same object. An unchanged response is returned as is.
+    """
+
+    def __init__(self, render):
+        """
+        :param render: function(key, conf) returning response fragment of one config entry
+        """
+        self.render = render
+        self.confs = OrderedDict()
+        self.fragments = OrderedDict()
+        self.response = ""
+
+    @native
+    def get(self, entries):
+        """
+        :param entries: iterable of (key, conf) in response order
+        :return str: whole response
+        """
+        changed = False
+        for key, conf in entries:
+            if self.confs.get(key) is not conf:
+                self.confs[key] = conf
+                self.fragments[key] = self.render(key, conf)
+                changed = True
+        if changed:
+            self.response = "".join(self.fragments.values())
+        return self.response
+
+
 class RaspberryScpiPico(MicroScpiDevice):
     kw_machine = ScpiKeyword("MACHINE", "MACHINE", None)
     kw_pin = ScpiKeyword("PIN", "PIN", ["14", "15", "16", "17", "18", "19", "20", "21", "22", "25", "?"])
@@ -283,17 +627,17 @@ class RaspberryScpiPico(MicroScpiDevice):
     kw_duty = ScpiKeyword("DUTY", "DUTY", ["?"])
     kw_on = ScpiKeyword("ON", "ON", None)
     kw_off = ScpiKeyword("OFF", "OFF", None)
-    kw_uart = ScpiKeyword("UART", "UART", None)
-    kw_baud = ScpiKeyword("BAUDrate", "BAUD", None)
-    kw_parity = ScpiKeyword("PARITY", "PARITY", None)
-    kw_width = ScpiKeyword("WIDTH", "WIDTH", None)
+    kw_uart = ScpiKeyword("UART", "UART", ["0", "1", "?"])
+    kw_baud = ScpiKeyword("BAUDrate", "BAUD", ["?"])
+    kw_parity = ScpiKeyword("PARITY", "PARITY", ["?"])
+    kw_width = ScpiKeyword("WIDTH", "WIDTH", ["?"])
     kw_start = ScpiKeyword("START", "START", None)
     kw_stop = ScpiKeyword("STOP", "STOP", None)
     kw_i2c = ScpiKeyword("I2C", "I2C", ["0", "1", "?"])
     kw_scan = ScpiKeyword("SCAN", "SCAN", ["?"])
     kw_addr = ScpiKeyword("ADDRess", "ADDR", None)
     kw_bit = ScpiKeyword("BIT", "BIT", ["?"])
-    kw_memory = ScpiKeyword("MEMory", "MEM", None)
+    kw_memory = ScpiKeyword("MEMory", "MEM", ["?"])
     kw_freq = ScpiKeyword("FREQuency", "FREQ", ["?"])
     kw_spi = ScpiKeyword("SPI", "SPI", ["0", "1", "?"])
     kw_csel = ScpiKeyword("CSEL", "CS", None)
@@ -312,6 +656,69 @@ class RaspberryScpiPico(MicroScpiDevice):
     kw_error = ScpiKeyword("ERRor", "ERR", ["?"])
     kw_min = ScpiKeyword("MINimum", "MIN", None)
     kw_max = ScpiKeyword("MAXimum", "MAX", None)
+    kw_measure = ScpiKeyword("MEASure", "MEAS", None)
+    kw_port = ScpiKeyword("PORT", "PORT", ["?"])
+    kw_logic = ScpiKeyword("LOGic", "LOG", None)
+    kw_capture = ScpiKeyword("CAPTure", "CAPT", None)
+    kw_rate = ScpiKeyword("RATE", "RATE", ["?"])
+    kw_depth = ScpiKeyword("DEPTh", "DEPT", ["?"])
+    kw_pretrigger = ScpiKeyword("PRETrigger", "PRET", ["?"])
+    kw_trigger = ScpiKeyword("TRIGger", "TRIG", ["?"])
+    kw_encoding = ScpiKeyword("ENCoding", "ENC", ["?"])
+    kw_timeout = ScpiKeyword("TIMeout", "TIM", ["?"])
+    kw_data = ScpiKeyword("DATA", "DATA", ["?"])
+    kw_immediate = ScpiKeyword("IMMediate", "IMM", None)
+    kw_rise = ScpiKeyword("RISE", "RISE", None)
+    kw_fall = ScpiKeyword("FALL", "FALL", None)
+    kw_pattern = ScpiKeyword("PATTern", "PATT", None)
+    kw_raw = ScpiKeyword("RAW", "RAW", None)
+    kw_rle = ScpiKeyword("RLE", "RLE", None)
+    kw_append = ScpiKeyword("APPend", "APP", None)
+    kw_repeat = ScpiKeyword("REPeat", "REP", ["?"])
+    kw_continuous = ScpiKeyword("CONTinuous", "CONT", None)
+    kw_gate = ScpiKeyword("GATE", "GATE", ["?"])
+    kw_period = ScpiKeyword("PERiod", "PER", ["?"])
+    kw_pwidth = ScpiKeyword("PWIDth", "PWID", ["?"])
+    kw_dcycle = ScpiKeyword("DCYCle", "DCYC", ["?"])
+    kw_event = ScpiKeyword("EVENt", "EVEN", None)
+    kw_edge = ScpiKeyword("EDGE", "EDGE", ["?"])
+    kw_count = ScpiKeyword("COUNt", "COUN", ["?"])
+    kw_clear = ScpiKeyword("CLEar", "CLE", None)
+    kw_both = ScpiKeyword("BOTH", "BOTH", None)
+    kw_slice = ScpiKeyword("SLICe", "SLIC", ["?"])
+    kw_sync = ScpiKeyword("SYNChronous", "SYNC", ["?"])
+    kw_apply = ScpiKeyword("APPLy", "APPL", None)
+    kw_align = ScpiKeyword("ALIGn", "ALIG", None)
+    kw_dualcore = ScpiKeyword("DUALcore", "DUAL", ["?"])
+    kw_sbits = ScpiKeyword("SBITs", "SBIT", ["?"])
+    kw_none = ScpiKeyword("NONE", "NONE", None)
+    kw_even = ScpiKeyword("EVEN", "EVEN", None)
+    kw_odd = ScpiKeyword("ODD", "ODD", None)
+    kw_watch = ScpiKeyword("WATCh", "WATC", None)
+    kw_interval = ScpiKeyword("INTerval", "INT", ["?"])
+    kw_sequence = ScpiKeyword("SEQuence", "SEQ", None)
+    kw_record = ScpiKeyword("RECord", "REC", None)
+    kw_wait = ScpiKeyword("WAIT", "WAIT", None)
+    kw_end = ScpiKeyword("END", "END", None)
+    kw_timing = ScpiKeyword("TIMing", "TIM", ["?"])
+    kw_log = ScpiKeyword("LOG", "LOG", None)
+    kw_log_adc = ScpiKeyword("ADC", "ADC", ["?"])
+    kw_register = ScpiKeyword("REGister", "REG", ["?"])
+    kw_size = ScpiKeyword("SIZE", "SIZE", ["?"])
+    kw_format = ScpiKeyword("FORMat", "FORM", ["?"])
+    kw_recall = ScpiKeyword("RECall", "REC", None)
+    kw_auto = ScpiKeyword("AUTO", "AUTO", ["?"])
+    kw_gc = ScpiKeyword("GC", "GC", None)
+    kw_boot = ScpiKeyword("BOOT", "BOOT", None)
+    kw_trace = ScpiKeyword("TRACe", "TRAC", ["?"])
+    kw_level = ScpiKeyword("LEVel", "LEV", ["?"])
+    kw_info = ScpiKeyword("INFO", "INFO", None)
+    kw_debug = ScpiKeyword("DEBug", "DEB", None)
+    kw_idle = ScpiKeyword("IDLE", "IDLE", ["?"])
+    kw_lock = ScpiKeyword("LOCK", "LOCK", ["?"])
+    kw_threshold = ScpiKeyword("THReshold", "THR", ["?"])
+    kw_statistics = ScpiKeyword("STATistics", "STAT", ["?"])
+    kw_oversampling = ScpiKeyword("OVERsampling", "OVER", ["?"])
 
     "PIN[14|15|16|17|18|19|20|21|22|25]"
     pins = OrderedDict({
@@ -385,10 +792,62 @@ class RaspberryScpiPico(MicroScpiDevice):
         0: SpiConfig(DEFAULT_SPI_CLOCK, SPI_MODE0, sck0, mosi0, miso0, cs0),
         1: SpiConfig(DEFAULT_SPI_CLOCK, SPI_MODE0, sck1, mosi1, miso1, cs1)
     })
+    uart_conf = OrderedDict({
+        0: DEFAULT_UART_CONFIG,
+        1: DEFAULT_UART_CONFIG
+    })
+    adc_conf = OrderedDict({
+        0: AdcConfig(DEFAULT_ADC_OVERSAMPLING),
+        1: AdcConfig(DEFAULT_ADC_OVERSAMPLING),
+        2: AdcConfig(DEFAULT_ADC_OVERSAMPLING),
+        3: AdcConfig(DEFAULT_ADC_OVERSAMPLING),
+        4: AdcConfig(DEFAULT_ADC_OVERSAMPLING)
+    })
+    measure_conf = OrderedDict({
+        14: MeasureConfig(DEFAULT_MEASURE_GATE),
+        15: MeasureConfig(DEFAULT_MEASURE_GATE),
+        16: MeasureConfig(DEFAULT_MEASURE_GATE),
+        17: MeasureConfig(DEFAULT_MEASURE_GATE),
+        18: MeasureConfig(DEFAULT_MEASURE_GATE),
+        19: MeasureConfig(DEFAULT_MEASURE_GATE),
+        20: MeasureConfig(DEFAULT_MEASURE_GATE),
+        21: MeasureConfig(DEFAULT_MEASURE_GATE),
+        22: MeasureConfig(DEFAULT_MEASURE_GATE),
+        25: MeasureConfig(DEFAULT_MEASURE_GATE)
+    })
 
     def __init__(self):
         super().__init__()
+        self.worker = BusWorker()
+        self.gc_policy = GcPolicy()
+        self.deferred = []  # (ticket, stream) of core 1 responses to be printed on sys.stdout
         self.stdout = sys.stdout
+        self.logic = LogicCapture(pin14)
+        self.logic_conf = DEFAULT_LOGIC_CONFIG
+        self.pattern = PatternGenerator(pin14)
+        self.pattern_conf = DEFAULT_PATTERN_CONFIG
+        self.watch_conf = DEFAULT_WATCH_CONFIG
+        self.sequencer = Sequencer()
+        self.sequence_conf = DEFAULT_SEQUENCE_CONFIG
+        self.logger = DataLogger()
+        self.log_conf = DEFAULT_LOG_CONFIG
+        self.pulse = PulseMeter()
+        self.events = OrderedDict()  # EdgeLogger per pin; allocated on first use
+        self.pwm_engine = PwmEngine()
+        self.pwm_sync = False  # stage PWM settings until PWM:APPLy
+        self.pwm_staged = []  # pins changed since last PWM:APPLy
+        self.pin_status = StatusCache(self.render_pin_status)
+        self.pwm_status = StatusCache(self.render_pwm_status)
+        self.led_status = StatusCache(self.render_led_status)
+        self.i2c_status = StatusCache(self.render_i2c_status)
+        self.spi_status = StatusCache(self.render_spi_status)
+        self.uart_status = StatusCache(self.render_uart_status)
+        self.uarts = OrderedDict({
+            0: UartBridge(0),
+            1: UartBridge(1)
+        })
+        self.repl_uart = None  # UART bus number kept by os.dupterm(); set by main.py of the USBTMC build
+        mark("peripherals")
 
         cls = ScpiCommand((self.kw_cls,), False, cb_do_nothing)
         ese = ScpiCommand((self.kw_ese,), False, cb_do_nothing)
@@ -399,22 +858,55 @@ class RaspberryScpiPico(MicroScpiDevice):
         idn_q = ScpiCommand((self.kw_idn,), True, self.cb_idn)
         stb_q = ScpiCommand((self.kw_stb,), True, cb_do_nothing)
         tst_q = ScpiCommand((self.kw_tst,), True, cb_do_nothing)
+        sav = ScpiCommand((self.kw_sav,), False, self.cb_sav)
+        rcl = ScpiCommand((self.kw_rcl,), False, self.cb_rcl)
 
         machine_freq = ScpiCommand((self.kw_machine, self.kw_freq), False, self.cb_machine_freq)
 
         system_error = ScpiCommand((self.kw_system, self.kw_error), True, self.cb_system_error)
+        system_dualcore = ScpiCommand((self.kw_system, self.kw_dualcore), False, self.cb_system_dualcore)
+        system_memory = ScpiCommand((self.kw_system, self.kw_memory), True, self.cb_system_memory)
+        system_boot_timing = ScpiCommand((self.kw_system, self.kw_boot, self.kw_timing), True,
+                                         self.cb_system_boot_timing)
+        system_trace = ScpiCommand((self.kw_system, self.kw_trace), True, self.cb_system_trace)
+        system_trace_level = ScpiCommand((self.kw_system, self.kw_trace, self.kw_level), False,
+                                         self.cb_system_trace_level)
+        system_trace_clear = ScpiCommand((self.kw_system, self.kw_trace, self.kw_clear), False,
+                                         self.cb_system_trace_clear)
+        system_gc_idle = ScpiCommand((self.kw_system, self.kw_gc, self.kw_idle), False, self.cb_system_gc_idle)
+        system_gc_lock = ScpiCommand((self.kw_system, self.kw_gc, self.kw_lock), False, self.cb_system_gc_lock)
+        system_gc_threshold = ScpiCommand((self.kw_system, self.kw_gc, self.kw_threshold), False,
+                                          self.cb_system_gc_threshold)
+        memory_recall_auto = ScpiCommand((self.kw_memory, self.kw_status, self.kw_recall, self.kw_auto), False,
+                                         self.cb_memory_recall_auto)
 
         pin_q = ScpiCommand((self.kw_pin,), True, self.cb_pin_status)
         pin_mode = ScpiCommand((self.kw_pin, self.kw_mode), False, self.cb_pin_mode)
         pin_val = ScpiCommand((self.kw_pin, self.kw_value), False, self.cb_pin_val)
         pin_on = ScpiCommand((self.kw_pin, self.kw_on), False, self.cb_pin_on)
         pin_off = ScpiCommand((self.kw_pin, self.kw_off), False, self.cb_pin_off)
+        pin_gate = ScpiCommand((self.kw_pin, self.kw_measure, self.kw_gate), False, self.cb_pin_measure_gate)
+        pin_freq = ScpiCommand((self.kw_pin, self.kw_measure, self.kw_freq), True, self.cb_pin_measure_freq)
+        pin_period = ScpiCommand((self.kw_pin, self.kw_measure, self.kw_period), True, self.cb_pin_measure_period)
+        pin_pwidth = ScpiCommand((self.kw_pin, self.kw_measure, self.kw_pwidth), True, self.cb_pin_measure_pwidth)
+        pin_dcycle = ScpiCommand((self.kw_pin, self.kw_measure, self.kw_dcycle), True, self.cb_pin_measure_dcycle)
+        pin_event_edge = ScpiCommand((self.kw_pin, self.kw_event, self.kw_edge), False, self.cb_pin_event_edge)
+        pin_event_count = ScpiCommand((self.kw_pin, self.kw_event, self.kw_count), True, self.cb_pin_event_count)
+        pin_event_data = ScpiCommand((self.kw_pin, self.kw_event, self.kw_data), True, self.cb_pin_event_data)
+        pin_event_clear = ScpiCommand((self.kw_pin, self.kw_event, self.kw_clear), False, self.cb_pin_event_clear)
+
+        port_val = ScpiCommand((self.kw_port, self.kw_value), False, self.cb_port_val)
+        port_on = ScpiCommand((self.kw_port, self.kw_on), False, self.cb_port_on)
+        port_off = ScpiCommand((self.kw_port, self.kw_off), False, self.cb_port_off)
 
         pwm_q = ScpiCommand((self.kw_pwm,), True, self.cb_pwm_status)
         pwm_freq = ScpiCommand((self.kw_pwm, self.kw_freq), False, self.cb_pin_pwm_freq)
         pwm_duty = ScpiCommand((self.kw_pwm, self.kw_duty), False, self.cb_pin_pwm_duty)
         pwm_on = ScpiCommand((self.kw_pwm, self.kw_on), False, self.cb_pin_pwm_on)
         pwm_off = ScpiCommand((self.kw_pwm, self.kw_off), False, self.cb_pin_pwm_off)
+        pwm_slice_q = ScpiCommand((self.kw_pwm, self.kw_slice), True, self.cb_pin_pwm_slice)
+        pwm_sync = ScpiCommand((self.kw_pwm, self.kw_sync), False, self.cb_pwm_sync)
+        pwm_apply = ScpiCommand((self.kw_pwm, self.kw_apply), False, self.cb_pwm_apply)
 
         led_q = ScpiCommand((self.kw_led,), True, self.cb_led_status)
         led_val = ScpiCommand((self.kw_led, self.kw_value), True, self.cb_led_val)
@@ -442,21 +934,102 @@ class RaspberryScpiPico(MicroScpiDevice):
         spi_write = ScpiCommand((self.kw_spi, self.kw_write), False, self.cb_spi_write)
         spi_read = ScpiCommand((self.kw_spi, self.kw_read), False, self.cb_spi_read)
 
-        adc_read = ScpiCommand((self.kw_adc, self.kw_read), True, self.cb_adc_read)
+        uart_q = ScpiCommand((self.kw_uart,), True, self.cb_uart_status)
+        uart_baud = ScpiCommand((self.kw_uart, self.kw_baud), False, self.cb_uart_baud)
+        uart_width = ScpiCommand((self.kw_uart, self.kw_width), False, self.cb_uart_width)
+        uart_parity = ScpiCommand((self.kw_uart, self.kw_parity), False, self.cb_uart_parity)
+        uart_sbits = ScpiCommand((self.kw_uart, self.kw_sbits), False, self.cb_uart_sbits)
+        uart_start = ScpiCommand((self.kw_uart, self.kw_start), False, self.cb_uart_start)
+        uart_stop = ScpiCommand((self.kw_uart, self.kw_stop), False, self.cb_uart_stop)
+        uart_state = ScpiCommand((self.kw_uart, self.kw_status), True, self.cb_uart_state)
+        uart_write = ScpiCommand((self.kw_uart, self.kw_write), False, self.cb_uart_write)
+        uart_read = ScpiCommand((self.kw_uart, self.kw_read), True, self.cb_uart_read)
+        uart_count = ScpiCommand((self.kw_uart, self.kw_count), True, self.cb_uart_count)
 
-        self.commands = [cls, ese, opc, rst, sre, esr_q, idn_q, stb_q, tst_q,
+        adc_read = ScpiCommand((self.kw_adc, self.kw_read), True, self.cb_adc_read)
+        adc_over = ScpiCommand((self.kw_adc, self.kw_oversampling), False, self.cb_adc_oversampling)
+        adc_stat = ScpiCommand((self.kw_adc, self.kw_measure, self.kw_statistics), True, self.cb_adc_statistics)
+
+        logic_rate = ScpiCommand((self.kw_logic, self.kw_capture, self.kw_rate), False, self.cb_logic_rate)
+        logic_depth = ScpiCommand((self.kw_logic, self.kw_capture, self.kw_depth), False, self.cb_logic_depth)
+        logic_pretrigger = ScpiCommand((self.kw_logic, self.kw_capture, self.kw_pretrigger), False,
+                                       self.cb_logic_pretrigger)
+        logic_trigger = ScpiCommand((self.kw_logic, self.kw_capture, self.kw_trigger), False, self.cb_logic_trigger)
+        logic_encoding = ScpiCommand((self.kw_logic, self.kw_capture, self.kw_encoding), False, self.cb_logic_encoding)
+        logic_timeout = ScpiCommand((self.kw_logic, self.kw_capture, self.kw_timeout), False, self.cb_logic_timeout)
+        logic_start = ScpiCommand((self.kw_logic, self.kw_capture, self.kw_start), False, self.cb_logic_start)
+        logic_state = ScpiCommand((self.kw_logic, self.kw_capture, self.kw_status), True, self.cb_logic_state)
+        logic_data = ScpiCommand((self.kw_logic, self.kw_capture, self.kw_data), True, self.cb_logic_data)
+
+        pattern_data = ScpiCommand((self.kw_pattern, self.kw_data), False, self.cb_pattern_data)
+        pattern_append = ScpiCommand((self.kw_pattern, self.kw_append), False, self.cb_pattern_append)
+        pattern_rate = ScpiCommand((self.kw_pattern, self.kw_rate), False, self.cb_pattern_rate)
+        pattern_repeat = ScpiCommand((self.kw_pattern, self.kw_repeat), False, self.cb_pattern_repeat)
+        pattern_start = ScpiCommand((self.kw_pattern, self.kw_start), False, self.cb_pattern_start)
+        pattern_stop = ScpiCommand((self.kw_pattern, self.kw_stop), False, self.cb_pattern_stop)
+        pattern_state = ScpiCommand((self.kw_pattern, self.kw_status), True, self.cb_pattern_state)
+
+        watch_interval = ScpiCommand((self.kw_watch, self.kw_interval), False, self.cb_watch_interval)
+        watch_timeout = ScpiCommand((self.kw_watch, self.kw_timeout), False, self.cb_watch_timeout)
+        watch_pin = ScpiCommand((self.kw_watch, self.kw_pin, self.kw_value), True, self.cb_watch_pin)
+        watch_i2c = ScpiCommand((self.kw_watch, self.kw_i2c, self.kw_read), True, self.cb_watch_i2c)
+        watch_spi = ScpiCommand((self.kw_watch, self.kw_spi, self.kw_read), True, self.cb_watch_spi)
+
+        sequence_record = ScpiCommand((self.kw_sequence, self.kw_record), False, self.cb_sequence_record)
+        sequence_wait = ScpiCommand((self.kw_sequence, self.kw_wait), False, self.cb_sequence_wait)
+        sequence_end = ScpiCommand((self.kw_sequence, self.kw_end), False, self.cb_sequence_end)
+        sequence_repeat = ScpiCommand((self.kw_sequence, self.kw_repeat), False, self.cb_sequence_repeat)
+        sequence_start = ScpiCommand((self.kw_sequence, self.kw_start), False, self.cb_sequence_start)
+        sequence_stop = ScpiCommand((self.kw_sequence, self.kw_stop), False, self.cb_sequence_stop)
+        sequence_state = ScpiCommand((self.kw_sequence, self.kw_status), True, self.cb_sequence_state)
+        sequence_count = ScpiCommand((self.kw_sequence, self.kw_count), True, self.cb_sequence_count)
+        sequence_timing = ScpiCommand((self.kw_sequence, self.kw_timing), True, self.cb_sequence_timing)
+
+        log_interval = ScpiCommand((self.kw_log, self.kw_interval), False, self.cb_log_interval)
+        log_adc = ScpiCommand((self.kw_log, self.kw_log_adc), False, self.cb_log_adc)
+        log_port = ScpiCommand((self.kw_log, self.kw_port), False, self.cb_log_port)
+        log_register = ScpiCommand((self.kw_log, self.kw_register), False, self.cb_log_register)
+        log_size = ScpiCommand((self.kw_log, self.kw_size), False, self.cb_log_size)
+        log_format = ScpiCommand((self.kw_log, self.kw_format), True, self.cb_log_format)
+        log_start = ScpiCommand((self.kw_log, self.kw_start), False, self.cb_log_start)
+        log_stop = ScpiCommand((self.kw_log, self.kw_stop), False, self.cb_log_stop)
+        log_state = ScpiCommand((self.kw_log, self.kw_status), True, self.cb_log_state)
+        log_count = ScpiCommand((self.kw_log, self.kw_count), True, self.cb_log_count)
+        log_data = ScpiCommand((self.kw_log, self.kw_data), True, self.cb_log_data)
+        log_clear = ScpiCommand((self.kw_log, self.kw_clear), False, self.cb_log_clear)
+
+        self.commands = [cls, ese, opc, rst, sre, esr_q, idn_q, stb_q, tst_q, sav, rcl,
                          machine_freq,
-                         system_error,
+                         system_error, system_dualcore, system_memory, system_boot_timing, system_gc_idle,
+                         system_gc_lock, system_gc_threshold, system_trace, system_trace_level, system_trace_clear,
+                         memory_recall_auto,
                          pin_q, pin_mode, pin_val, pin_on, pin_off,
-                         pwm_q, pwm_freq, pwm_duty, pwm_on, pwm_off,
+                         pin_gate, pin_freq, pin_period, pin_pwidth, pin_dcycle,
+                         pin_event_edge, pin_event_count, pin_event_data, pin_event_clear,
+                         port_val, port_on, port_off,
+                         pwm_q, pwm_freq, pwm_duty, pwm_on, pwm_off, pwm_slice_q, pwm_sync, pwm_apply,
                          led_q, led_val, led_on, led_off, led_pwm_freq, led_pwm_duty, led_pwm_on, led_pwm_off,
                          i2c_q, i2c_scan_q, i2c_freq, i2c_abit, i2c_write, i2c_read_q,
                          i2c_write_memory, i2c_read_memory,
                          spi_q, spi_mode, spi_freq, spi_write, spi_read, spi_cs_val, spi_transfer,
-                         adc_read,
+                         uart_q, uart_baud, uart_width, uart_parity, uart_sbits, uart_start, uart_stop, uart_state,
+                         uart_write, uart_read, uart_count,
+                         adc_read, adc_over, adc_stat,
+                         logic_rate, logic_depth, logic_pretrigger, logic_trigger, logic_encoding, logic_timeout,
+                         logic_start, logic_state, logic_data,
+                         pattern_data, pattern_append, pattern_rate, pattern_repeat, pattern_start, pattern_stop,
+                         pattern_state,
+                         watch_interval, watch_timeout, watch_pin, watch_i2c, watch_spi,
+                         sequence_record, sequence_wait, sequence_end, sequence_repeat, sequence_start, sequence_stop,
+                         sequence_state, sequence_count, sequence_timing,
+                         log_interval, log_adc, log_port, log_register, log_size, log_format, log_start, log_stop,
+                         log_state, log_count, log_data, log_clear,
                          ]
+        mark("commands")
 
         self.error_indicate(False)
+        self.recall_auto()
+        mark("recall")
 
     @staticmethod
     def error_indicate(error=False):
@@ -467,13 +1040,286 @@ class RaspberryScpiPico(MicroScpiDevice):
         else:
             pin0.on()
 
+    @property
+    def stdout(self):
+        """ Response stream; operations running on core 1 get the stream they were queued with
+        """
+        if self.worker.on_worker():
+            return self.worker.stdout
+        return self._stdout
+
+    @stdout.setter
+    def stdout(self, stream):
+        self._stdout = stream
+
+    def dispatch(self, command, param, opt):
+        """ Routes ``command`` with automatic garbage collections kept out of it if SYSTem:GC:LOCK is ON.
+        If the heap runs out meanwhile, a collection runs and an out of memory error is pushed; the command is not
+        retried since it may have partly run
+
+        :param ScpiCommand command: matched command
+        :param str param: parameter string
+        :param list opt: option strings
+        """
+        self.gc_policy.lock()
+        try:
+            self.route(command, param, opt)
+        except MemoryError:
+            self.gc_policy.unlock()
+            self.gc_policy.collect()
+            self.error_push(E_OUT_OF_MEMORY)
+        finally:
+            self.gc_policy.unlock()
+
+    def route(self, command, param, opt):
+        """ Runs I2C, SPI, ADC, WATCh and SEQuence:START commands on core 1 in dual core mode.
+        Every command after a queued one is queued too, so that commands run and respond in order.
+        While a sequence is being recorded, commands are stored into it instead.
+
+        :param ScpiCommand command: matched command
+        :param str param: parameter string
+        :param list opt: option strings
+        """
+        worker = self.worker
+        keyword = command.keywords[0]
+        last = command.keywords[-1]
+        if keyword is self.kw_sequence and (last is self.kw_record or last is self.kw_wait or
+                                            last is self.kw_end or last is self.kw_stop):
+            command.callback(param, opt)  # sequencer controls; STOP must reach a sequence running on core 1
+        elif self.sequencer.recording and keyword is not self.kw_sequence and last is not self.kw_dualcore:
+            if not self.sequencer.add(command.callback, (param, opt)):
+                self.error_push(E_DATA_OVERFLOW)
+        elif not worker.running:
+            command.callback(param, opt)
+        elif last is self.kw_dualcore:
+            worker.wait(worker.submitted)
+            self.flush_deferred()
+            command.callback(param, opt)
+        elif (worker.pending() or keyword is self.kw_i2c or keyword is self.kw_spi or keyword is self.kw_adc
+              or keyword is self.kw_watch or (keyword is self.kw_sequence and last is self.kw_start)):
+            stream = self._stdout
+            if stream is sys.stdout:
+                stream = io.StringIO()
+                self.deferred.append((worker.submit(command.callback, (param, opt), stream), stream))
+            else:
+                worker.submit(command.callback, (param, opt), stream)
+        else:
+            command.callback(param, opt)
+
+    def idle(self):
+        """ Called by the command loop between commands; runs an idle garbage collection unless core 1 is busy
+        """
+        if not self.worker.pending():
+            self.gc_policy.idle()
+
+    def ticket(self):
+        """ Returns a ticket covering every command dispatched so far; 0 if all of them have finished
+
+        :return int:
+        """
+        return self.worker.submitted if self.worker.pending() else 0
+
+    def wait(self, ticket):
+        """ Waits until commands covered by ``ticket`` have finished on core 1
+
+        :param int ticket:
+        """
+        self.worker.wait(ticket)
+
+    def finished(self, ticket):
+        """ Tests if commands covered by ``ticket`` have finished on core 1, without waiting
+
+        :param int ticket:
+        :return bool:
+        """
+        return self.worker.done >= ticket
+
+    def cancel(self, ticket):
+        """ Cancels core 1 commands covered by ``ticket``: queued ones are dropped and a running WATCh, SPI read
+        or sequence returns early. Commands running on core 0 are not interrupted.
+
+        :param int ticket:
+        """
+        self.worker.cancel(ticket)
+        if self.sequencer.running and self.worker.aborted():
+            self.sequencer.abort = True
+
+    def aborted(self):
+        """ Long running commands poll this to return early
+
+        :return bool: True if the running core 1 command is cancelled
+        """
+        return self.worker.on_worker() and self.worker.aborted()
+
+    def flush_deferred(self):
+        """ Prints responses of finished core 1 operations which were queued from ``sys.stdout`` context, in order
+        """
+        deferred = self.deferred
+        while len(deferred) > 0 and self.worker.done >= deferred[0][0]:
+            ticket, stream = deferred.pop(0)
+            sys.stdout.write(stream.getvalue())
+
     def error_push(self, error_no):
+        worker = self.worker
+        if worker.pending() and not worker.on_worker():
+            # Keep the error queue in command order and written from one core only
+            worker.submit(self.error_push, (error_no,), None)
+            return
         super().error_push(error_no)
         self.error_indicate(True)
 
+    def process_binary(self, frames):
+        """ Runs binary command ``frames`` of a VENDOR_SPECIFIC_OUT transfer straight on the I2C, SPI, PIN and ADC
+        objects, without SCPI parsing; see ``BinaryProtocol``. Core 1 work queued before is waited for first,
+        so that binary and SCPI commands run in the order they arrived.
+
+        :param memoryview frames: concatenated frames
+        :return bytes: concatenated replies
+        """
+        worker = self.worker
+        if worker.pending():
+            worker.wait(worker.submitted)
+        replies = []
+        offset = 0
+        length = len(frames)
+        self.gc_policy.lock()
+        try:
+            while offset + FRAME_HEADER_SIZE <= length:
+                opcode, bus_number, address, read_length, payload_length = struct.unpack_from(FRAME_FORMAT, frames,
+                                                                                              offset)
+                offset += FRAME_HEADER_SIZE
+                if offset + payload_length > length:
+                    replies.append(reply(opcode, STATUS_TRUNCATED))
+                    break
+                payload = frames[offset:offset + payload_length]
+                offset += payload_length
+                replies.append(self.binary_frame(opcode, bus_number, address, read_length, payload))
+        finally:
+            self.gc_policy.unlock()
+        return b"".join(replies)
+
+    def uart_owns(self, pin_number):
+        """
+        :param int pin_number:
+        :return bool: True if the pin belongs to a running UART or to the REPL UART
+        """
+        for bus_number, uart in self.uarts.items():
+            if pin_number in UART_PINS[bus_number] and (uart.running() or bus_number == self.repl_uart):
+                return True
+        return False
+
+    def pin_busy(self, pin_number):
+        """
+        :param int pin_number:
+        :return bool: True if the pin is taken by PWM, a UART, the pattern generator or edge capture
+        """
+        if self.pwmv[pin_number] or self.pin_conf[pin_number].mode == machine.Pin.ALT:
+            return True
+        if self.uart_owns(pin_number):
+            return True
+        if self.pattern.running() and PATTERN_BASE_PIN <= pin_number < PATTERN_BASE_PIN + PATTERN_PINS:
+            return True
+        events = self.events.get(pin_number)
+        return events is not None and events.edge != EDGE_OFF
+
+    def binary_frame(self, opcode, bus_number, address, read_length, payload):
+        """ Runs one binary command frame
+
+        :param int opcode: OP_*
+        :param int bus_number: I2C/SPI bus number, pin number or ADC channel
+        :param int address: I2C target address, SPI chip select levels or pin value
+        :param int read_length: number of bytes to read
+        :param memoryview payload:
+        :return bytes: reply
+        """
+        try:
+            if opcode == OP_NOP:
+                return reply(opcode, STATUS_OK)
+            elif opcode == OP_I2C_WRITE:
+                address = address >> self.i2c_conf[bus_number].bit
+                self.i2c[bus_number].writeto(address, payload)
+                return reply(opcode, STATUS_OK)
+            elif opcode == OP_I2C_READ:
+                address = address >> self.i2c_conf[bus_number].bit
+                return reply(opcode, STATUS_OK, self.i2c[bus_number].readfrom(address, read_length))
+            elif opcode == OP_I2C_READ_MEM:
+                if len(payload) not in (1, 2):
+                    return reply(opcode, STATUS_INVALID)
+                address = address >> self.i2c_conf[bus_number].bit
+                memaddress = int.from_bytes(bytes(payload), "big")
+                data = self.i2c[bus_number].readfrom_mem(address, memaddress, read_length, addrsize=8 * len(payload))
+                return reply(opcode, STATUS_OK, data)
+            elif opcode == OP_SPI_TRANSFER:
+                bus = self.spi[bus_number]
+                cs_pin = self.spi_conf[bus_number].csel
+                data = bytearray(len(payload))
+                cs_pin.value(address & 1)
+                bus.write_readinto(payload, data)
+                cs_pin.value((address >> 1) & 1)
+                return reply(opcode, STATUS_OK, data)
+            elif opcode == OP_PIN_READ:
+                return reply(opcode, STATUS_OK, bytes((self.pins[bus_number].value(),)))
+            elif opcode == OP_PIN_WRITE:
+                if self.pin_busy(bus_number):
+                    self.error_push(E_SETTINGS_CONFLICT)
+                    return reply(opcode, STATUS_BUSY)
+                value = IO_ON if address else IO_OFF
+                self.pins[bus_number].init(machine.Pin.OUT, value=value)
+                self.pin_conf[bus_number] = PinConfig(machine.Pin.OUT, value, self.pin_conf[bus_number].pull)
+                return reply(opcode, STATUS_OK)
+            elif opcode == OP_ADC_READ:
+                value = round(self.adc_sample(self.adc[bus_number], self.adc_conf[bus_number].oversampling))
+                return reply(opcode, STATUS_OK, struct.pack("<H", value))
+        except KeyError:
+            pass  # no such bus, pin or channel
+        except OSError:
+            self.error_push(E_SPI_FAIL if opcode == OP_SPI_TRANSFER else E_I2C_FAIL)
+            return reply(opcode, STATUS_BUS_FAIL)
+        return reply(opcode, STATUS_INVALID)
+
+    def numeric_query(self, param, current, default, minimum, maximum):
+        """ Selects value to answer a numeric query with; DEFault|MINimum|MAXimum or ``current``
+
+        :param str param:
+        :param int current:
+        :param int default:
+        :param int minimum:
+        :param int maximum:
+        :return int:
+        """
+        if self.kw_def.match(param).match:
+            return default
+        elif self.kw_max.match(param).match:
+            return maximum
+        elif self.kw_min.match(param).match:
+            return minimum
+        return current
+
+    def numeric_param(self, param, default, minimum, maximum):
+        """ Converts ``param`` into int within ``minimum``-``maximum``; DEFault|MINimum|MAXimum are accepted.
+        Pushes an error and returns None if it fails.
+
+        :param str param:
+        :param int default:
+        :param int minimum:
+        :param int maximum:
+        :return int:
+        """
+        try:
+            value = self.numeric_query(param, None, default, minimum, maximum)
+            if value is None:
+                value = int(float(param))
+        except ValueError:
+            self.error_push(E_INVALID_PARAMETER)
+            return None
+        if minimum <= value <= maximum:
+            return value
+        self.error_push(E_OUT_OF_RANGE)
+        return None
+
     def cb_idn(self, param="", opt=None):
         """<Vendor name>,<Model number>,<Serial number>,<Firmware version>"""
-        serial = "".join(f"{d:02x}" for d in machine.unique_id())
+        serial = hex_encode(machine.unique_id())
 
         query = (opt[-1] == "?")
         if query:
@@ -487,6 +1333,10 @@ class RaspberryScpiPico(MicroScpiDevice):
         """
 
         # print(f"Reset", file=sys.stderr)
+        self.pattern.stop()
+        for events in self.events.values():
+            events.enable(EDGE_OFF)
+            events.clear()
         machine.freq(DEFAULT_CPU_CLOCK)
         # machine.soft_reset()
 
@@ -498,6 +1348,8 @@ class RaspberryScpiPico(MicroScpiDevice):
             self.pwm_conf[pwm_cfg] = DEFAULT_PWM_CONFIG
         for pwmv in self.pwmv.keys():
             self.pwmv[pwmv] = 0
+        self.pwm_sync = False
+        self.pwm_staged = []
         for spi in self.spi.values():
             spi.deinit()
             spi.init()
@@ -513,6 +1365,220 @@ class RaspberryScpiPico(MicroScpiDevice):
         for i2c_k in self.i2c_conf.keys():
             self.i2c_conf[i2c_k] = I2cConfig(DEFAULT_I2C_CLOCK, DEFAULT_I2C_BIT,
                                              self.i2c_conf[i2c_k].scl, self.i2c_conf[i2c_k].sda)
+        for adc_k in self.adc_conf.keys():
+            self.adc_conf[adc_k] = DEFAULT_ADC_CONFIG
+        for measure_k in self.measure_conf.keys():
+            self.measure_conf[measure_k] = DEFAULT_MEASURE_CONFIG
+        self.logic_conf = DEFAULT_LOGIC_CONFIG
+        self.pattern.load(())
+        self.pattern_conf = DEFAULT_PATTERN_CONFIG
+        self.watch_conf = DEFAULT_WATCH_CONFIG
+        if not self.sequencer.running:
+            self.sequencer.recording = False
+            self.sequencer.clear()
+        self.sequence_conf = DEFAULT_SEQUENCE_CONFIG
+        self.logger.stop()
+        self.log_conf = DEFAULT_LOG_CONFIG
+        for uart_k in self.uart_conf.keys():
+            if self.uarts[uart_k].stop():
+                self.restore_pins(UART_PINS[uart_k][0], 2)
+            self.uart_conf[uart_k] = DEFAULT_UART_CONFIG
+
+    def state_format(self):
+        """ ``struct`` format of saved state: magic, CPU clock, then per pin mode/value/pull,
+        per PWM pin freq/duty/enable, per I2C bus freq/address bit and per SPI bus freq/mode
+
+        :return str:
+        """
+        return ("<4sI" + "BBB" * len(self.pin_conf) + "IHB" * len(self.pwm_conf) +
+                "IB" * len(self.i2c_conf) + "IB" * len(self.spi_conf))
+
+    def state_pack(self):
+        """ Serializes ``pin_conf``, ``pwm_conf``, ``i2c_conf``, ``spi_conf`` and CPU clock
+
+        :return bytes:
+        """
+        values = [SAV_MAGIC, machine.freq()]
+        for conf in self.pin_conf.values():
+            values += (conf.mode, conf.value, SAV_PULL_NONE if conf.pull is None else conf.pull)
+        for pin_number, conf in self.pwm_conf.items():
+            values += (conf.freq, conf.duty_u16, self.pwmv[pin_number])
+        for conf in self.i2c_conf.values():
+            values += (conf.freq, conf.bit)
+        for conf in self.spi_conf.values():
+            values += (conf.freq, conf.mode)
+        return struct.pack(self.state_format(), *values)
+
+    def state_apply(self, data):
+        """ Applies state made by ``state_pack()`` in one pass: CPU clock, pins, every PWM slice at once,
+        then buses whose setting changed
+
+        :param bytes data:
+        :return bool: False if ``data`` is not a saved state of this firmware
+        """
+        fmt = self.state_format()
+        if len(data) != struct.calcsize(fmt):
+            return False
+        values = struct.unpack(fmt, data)
+        if values[0] != SAV_MAGIC:
+            return False
+        if values[1] != machine.freq():
+            machine.freq(values[1])
+        i = 2
+        for pin_number in self.pin_conf.keys():
+            mode, value, pull = values[i:i + 3]
+            i += 3
+            self.pin_conf[pin_number] = PinConfig(mode, value, None if pull == SAV_PULL_NONE else pull)
+            self.restore_pins(pin_number, 1)
+        for pin_number in self.pwm_conf.keys():
+            freq, duty_u16, enabled = values[i:i + 3]
+            i += 3
+            self.pwm_conf[pin_number] = PwmConfig(freq, duty_u16)
+            self.pwmv[pin_number] = enabled
+        self.pwm_sync = False
+        self.pwm_staged = []
+        self.pwm_apply(list(self.pwm_conf.keys()))
+        for bus_number, conf in self.i2c_conf.items():
+            freq, bit = values[i:i + 2]
+            i += 2
+            if freq != conf.freq:
+                self.i2c[bus_number] = machine.I2C(bus_number, scl=conf.scl, sda=conf.sda, freq=freq)
+            self.i2c_conf[bus_number] = I2cConfig(freq, bit, conf.scl, conf.sda)
+        for bus_number, conf in self.spi_conf.items():
+            freq, mode = values[i:i + 2]
+            i += 2
+            if freq != conf.freq or mode != conf.mode:
+                ckpol = SPI_CKPOL_HI if mode & SPI_MASK_CKPOL else SPI_CKPOL_LO
+                ckph = SPI_CKPH_HI if mode & SPI_MASK_CKPH else SPI_CKPH_LO
+                self.spi[bus_number] = machine.SPI(bus_number, baudrate=freq, sck=conf.sck, mosi=conf.mosi,
+                                                   miso=conf.miso, polarity=ckpol, phase=ckph)
+            self.spi_conf[bus_number] = SpiConfig(freq, mode, conf.sck, conf.mosi, conf.miso, conf.csel)
+        return True
+
+    def cb_sav(self, param="", opt=None):
+        """
+        - *SAV num
+        - num: 0-9
+
+        Stores pin, PWM, I2C and SPI settings and CPU clock into flash slot ``num``
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+
+        if query:
+            self.error_push(E_SYNTAX)
+        elif param is not None:
+            slot = self.numeric_param(param, DEFAULT_SAV_SLOT, MIN_SAV_SLOT, MAX_SAV_SLOT)
+            if slot is None:
+                return
+            try:
+                try:
+                    os.mkdir(SAV_PATH)
+                except OSError:
+                    pass  # exists
+                with open(f"{SAV_PATH}/{slot}.bin", "wb") as f:
+                    f.write(self.state_pack())
+            except OSError:
+                self.error_push(E_MASS_STORAGE)
+        else:
+            self.error_push(E_MISSING_PARAM)
+
+    def cb_rcl(self, param="", opt=None):
+        """
+        - *RCL num
+        - num: 0-9
+
+        Applies settings stored by ``*SAV num``
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+
+        if query:
+            self.error_push(E_SYNTAX)
+        elif param is not None:
+            slot = self.numeric_param(param, DEFAULT_SAV_SLOT, MIN_SAV_SLOT, MAX_SAV_SLOT)
+            if slot is not None:
+                self.recall(slot)
+        else:
+            self.error_push(E_MISSING_PARAM)
+
+    def recall(self, slot):
+        """ Applies state of ``slot``; pushes an error if it is empty or unreadable
+
+        :param int slot:
+        """
+        try:
+            with open(f"{SAV_PATH}/{slot}.bin", "rb") as f:
+                data = f.read()
+        except OSError:
+            self.error_push(E_FILE_NOT_FOUND)
+            return
+        if not self.state_apply(data):
+            self.error_push(E_MASS_STORAGE)
+
+    def recall_auto(self):
+        """ Power-on recall of the slot set by ``MEMory:STATe:RECall:AUTO``
+        """
+        try:
+            with open(f"{SAV_PATH}/auto") as f:
+                slot = int(f.read())
+        except (OSError, ValueError):
+            return  # power-on recall is off
+        self.recall(slot)
+
+    def cb_memory_recall_auto(self, param="", opt=None):
+        """
+        - MEMory:STATe:RECall:AUTO[?] num|OFF
+        - num: 0-9
+
+        Sets slot applied at power-on; OFF boots with defaults
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+        name = f"{SAV_PATH}/auto"
+
+        if query:
+            try:
+                with open(name) as f:
+                    print(int(f.read()), file=self.stdout)
+            except (OSError, ValueError):
+                print("OFF", file=self.stdout)
+        elif param is not None:
+            try:
+                if self.kw_off.match(param).match:
+                    try:
+                        os.remove(name)
+                    except OSError:
+                        pass  # already off
+                    return
+                slot = self.numeric_param(param, DEFAULT_SAV_SLOT, MIN_SAV_SLOT, MAX_SAV_SLOT)
+                if slot is None:
+                    return
+                try:
+                    os.mkdir(SAV_PATH)
+                except OSError:
+                    pass  # exists
+                with open(name, "w") as f:
+                    f.write(str(slot))
+            except OSError:
+                self.error_push(E_MASS_STORAGE)
+        else:
+            self.error_push(E_MISSING_PARAM)
 
     @staticmethod
     def cb_version(param="", opt=None):
@@ -591,9 +1657,13 @@ class RaspberryScpiPico(MicroScpiDevice):
         else:
             self.error_push(E_SYNTAX)
 
-    def cb_pin_status(self, param="", opt=None):
+    def cb_system_dualcore(self, param="", opt=None):
         """
-        - ``PIN?``
+        - SYSTem:DUALcore[?] ON|OFF|DEFault
+        - DEFault is OFF
+
+        ON: I2C, SPI and ADC commands run on core 1 while USB and the parser stay on core 0.
+        Not affected by ``*RST``
 
         :param param:
         :param opt:
@@ -604,153 +1674,229 @@ class RaspberryScpiPico(MicroScpiDevice):
         param = param.replace(" ", "")
 
         if query:
-            for pin in self.pin_conf.keys():
-                conf = self.pin_conf[pin]
-                mode = conf.mode
-                value = conf.value
-                message = ";".join([f"PIN{pin}:MODE {IO_MODE_STRINGS[mode]}",
-                                    f"PIN{pin}:VALue {IO_VALUE_STRINGS[value]}",
-                                    ])
-                print(message, end=";", file=self.stdout)
-            print("", file=self.stdout)
+            # print("cb_system_dualcore", "Query", param, file=sys.stderr)
+            running = False if self.kw_def.match(param).match else self.worker.running
+            print(IO_VALUE_STRINGS[IO_ON if running else IO_OFF], file=self.stdout)
+        elif param is not None:
+            # print("cb_system_dualcore", param, file=sys.stderr)
+            if param == str(IO_ON) or self.kw_on.match(param).match:
+                self.worker.start()
+            elif param == str(IO_OFF) or self.kw_off.match(param).match or self.kw_def.match(param).match:
+                self.worker.stop()
+                self.flush_deferred()
+            else:
+                self.error_push(E_INVALID_PARAMETER)
+        else:
+            self.error_push(E_MISSING_PARAM)
+
+    def cb_system_memory(self, param="", opt=None):
+        """
+        - SYSTem:MEMory?
+
+        Returns ``free,allocated,largest,collections,worst`` heap bytes, largest allocatable block in bytes,
+        number of collections run by the GC policy and the longest of them in us.
+        Probing the largest block runs one collection, counted too, before the heap figures are taken
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        policy = self.gc_policy
+
+        if query:
+            largest = policy.largest_free()
+            print(f"{gc.mem_free()},{gc.mem_alloc()},{largest},{policy.collections},{policy.worst_us}",
+                  file=self.stdout)
         else:
             self.error_push(E_SYNTAX)
 
-    def cb_pin_val(self, param="", opt=None):
+    def cb_system_boot_timing(self, param="", opt=None):
         """
-        - PIN[14|15|16|17|18|19|20|21|22|25]:VALue[?] 0|1|OFF|ON|DEFault
-        - DEFault is OFF
+        - SYSTem:BOOT:TIMing?
+
+        Returns ``name,us`` pairs of boot milestones in order; us counts from reset.
+        Milestones are ``main``, ``imports``, ``peripherals``, ``commands``, ``recall``, ``usb_init``, ``usb_open`` and
+        ``command`` for the first command received; USB milestones are recorded by USBTMC firmware only.
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+
+        if query:
+            print(milestones(), file=self.stdout)
+        else:
+            self.error_push(E_SYNTAX)
+
+    def cb_system_trace(self, param="", opt=None):
+        """
+        - SYSTem:TRACe? [first,count]
+
+        Returns trace records ``first`` to ``first + count - 1`` (all without parameter), oldest first, as
+        definite length block ``#<n><length><payload>``; payload is 2 hex digits per byte.
+        See ``Trace.py`` for record format and events
 
         :param param:
         :param opt:
         :return:
         """
 
-        pin_number = int(opt[0])
-        pin = self.pins[pin_number]
         query = (opt[-1] == "?")
         param = param.replace(" ", "")
-        conf = self.pin_conf[pin_number]
+        rstring = re.compile(r"^(|([0-9]+),([0-9]+))$")
 
         if query:
-            # print("cb_pin_val", pin_number, "Query", param, file=sys.stderr)
-            if param is not None:
-                if self.kw_def.match(param).match:
-                    val = DEFAULT_IO_VALUE
-                else:
-                    self.error_push(E_INVALID_PARAMETER)
-                    return
-            else:
-                val = pin.value()
-            print(IO_VALUE_STRINGS[val], file=self.stdout)
-        elif param is not None:
-            # print("cb_pin_val", pin_number, param, file=sys.stderr)
-            if param == str(IO_ON) or self.kw_on.match(param).match:
-                pin.init(machine.Pin.OUT, value=IO_ON)
-                self.pin_conf[pin_number] = PinConfig(machine.Pin.OUT, IO_ON, conf.pull)
-            elif param == str(IO_OFF) or self.kw_off.match(param).match or self.kw_def.match(param).match:
-                pin.init(machine.Pin.OUT, value=IO_OFF)
-                self.pin_conf[pin_number] = PinConfig(machine.Pin.OUT, IO_OFF, conf.pull)
-            else:
+            searched = rstring.search(param)
+            if searched is None:
                 self.error_push(E_INVALID_PARAMETER)
+                print(definite_length_block(""), file=self.stdout)
+                return
+            _, first, count = searched.groups()
+            first = int(first) if first else 0
+            count = int(count) if count else None
+            print(definite_length_block(hex_encode(TRACE.read(first, count))), file=self.stdout)
         else:
-            self.error_push(E_MISSING_PARAM)
+            self.error_push(E_SYNTAX)
 
-    def cb_pin_mode(self, param="", opt=None):
+    def cb_system_trace_level(self, param="", opt=None):
         """
-        - PIN[14|15|16|17|18|19|20|21|22|25]:MODE[?] INput|OUTput|ODrain|PWM|DEFault
-        - DEFault is INput
+        - SYSTem:TRACe:LEVel[?] OFF|ERRor|INFO|DEBug|DEFault
+        - DEFault is ERRor
+
+        Events above the level are not recorded. Not affected by ``*RST``
 
         :param param:
         :param opt:
         :return:
         """
 
-        pin_number = int(opt[0])
-        pin = self.pins[pin_number]
         query = (opt[-1] == "?")
         param = param.replace(" ", "")
-        conf = self.pin_conf[pin_number]
-        mode = conf.mode
-        alt = 0
 
         if query:
-            # print("cb_pin_mode", pin_number, "Query", param, file=sys.stderr)
-            if param is not None:
-                if self.kw_def.match(param).match:
-                    mode = DEFAULT_IO_MODE
-                else:
-                    self.error_push(E_INVALID_PARAMETER)
-                    return
-            print(IO_MODE_STRINGS[mode], file=self.stdout)
+            level = DEFAULT_TRACE_LEVEL if self.kw_def.match(param).match else TRACE.level
+            print(TRACE_LEVEL_STRINGS[level], file=self.stdout)
         elif param is not None:
-            # print("cb_pin_mode", pin_number, param, file=sys.stderr)
-            if self.kw_in.match(param).match or self.kw_def.match(param).match:
-                mode = machine.Pin.IN
-            elif self.kw_out.match(param).match:
-                mode = machine.Pin.OUT
-            elif self.kw_od.match(param).match:
-                mode = machine.Pin.OPEN_DRAIN
-            elif self.kw_pwm.match(param).match:
-                self.cb_pin_pwm_on("cb_pin_mode", opt)
-                mode = machine.Pin.ALT
-                alt = machine.Pin.ALT_PWM
+            if self.kw_off.match(param).match:
+                TRACE.level = TRACE_OFF
+            elif self.kw_error.match(param).match or self.kw_def.match(param).match:
+                TRACE.level = TRACE_ERROR
+            elif self.kw_info.match(param).match:
+                TRACE.level = TRACE_INFO
+            elif self.kw_debug.match(param).match:
+                TRACE.level = TRACE_DEBUG
             else:
                 self.error_push(E_INVALID_PARAMETER)
-                return
+        else:
+            self.error_push(E_MISSING_PARAM)
 
-            pin.init(mode, alt=alt, pull=conf.pull)
-            self.pins[pin_number] = pin
-            self.pin_conf[pin_number] = PinConfig(mode, conf.value, conf.pull)
-            # print(pin, file=sys.stderr)
+    def cb_system_trace_clear(self, param="", opt=None):
+        """
+        - SYSTem:TRACe:CLEar
+
+        Removes trace records
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        TRACE.clear()
+
+    def cb_system_gc_idle(self, param="", opt=None):
+        """
+        - SYSTem:GC:IDLE[?] ON|OFF|DEFault
+        - DEFault is ON
+
+        ON: collect garbage in gaps between commands. Not affected by ``*RST``
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+
+        if query:
+            idle = True if self.kw_def.match(param).match else self.gc_policy.idle_collect
+            print(IO_VALUE_STRINGS[IO_ON if idle else IO_OFF], file=self.stdout)
+        elif param is not None:
+            if param == str(IO_ON) or self.kw_on.match(param).match or self.kw_def.match(param).match:
+                self.gc_policy.idle_collect = True
+            elif param == str(IO_OFF) or self.kw_off.match(param).match:
+                self.gc_policy.idle_collect = False
+            else:
+                self.error_push(E_INVALID_PARAMETER)
         else:
             self.error_push(E_MISSING_PARAM)
 
-    def cb_pin_on(self, param="", opt=None):
+    def cb_system_gc_lock(self, param="", opt=None):
         """
-        - PIN[14|15|16|17|18|19|20|21|22|25]:ON
-        - PIN[14|15|16|17|18|19|20|21|22|25]:OFF
+        - SYSTem:GC:LOCK[?] ON|OFF|DEFault
+        - DEFault is OFF
+
+        ON: no garbage collection at all while a command runs on core 0; a command which runs out of heap fails with
+        an out of memory error instead, after which a collection runs. Use with SYSTem:GC:IDLE ON.
+        Not affected by ``*RST``
 
         :param param:
         :param opt:
         :return:
         """
 
-        pin_number = int(opt[0])
         query = (opt[-1] == "?")
         param = param.replace(" ", "")
 
         if query:
-            # print("cb_pin_on", pin_number, "Query", param, file=sys.stderr)
-            self.error_push(E_SYNTAX)
+            locked = False if self.kw_def.match(param).match else self.gc_policy.locked
+            print(IO_VALUE_STRINGS[IO_ON if locked else IO_OFF], file=self.stdout)
+        elif param is not None:
+            # this command runs between lock() and unlock() too; unlock() follows the new setting
+            if param == str(IO_ON) or self.kw_on.match(param).match:
+                self.gc_policy.locked = True
+            elif param == str(IO_OFF) or self.kw_off.match(param).match or self.kw_def.match(param).match:
+                self.gc_policy.locked = False
+                gc.enable()
+            else:
+                self.error_push(E_INVALID_PARAMETER)
         else:
-            # print("cb_pin_on", pin_number, param, file=sys.stderr)
-            self.cb_pin_val(param="ON", opt=opt)
+            self.error_push(E_MISSING_PARAM)
 
-    def cb_pin_off(self, param="", opt=None):
+    def cb_system_gc_threshold(self, param="", opt=None):
         """
-        - PIN[14|15|16|17|18|19|20|21|22|25]:ON
-        - PIN[14|15|16|17|18|19|20|21|22|25]:OFF
+        - SYSTem:GC:THReshold[?] num|DEFault|MINimum|MAXimum
+        - DEFault is 0 (collect only when the heap is full)
+
+        Bytes allocated between automatic collections, passed to ``gc.threshold()``. Not affected by ``*RST``
 
         :param param:
         :param opt:
         :return:
         """
 
-        pin_number = int(opt[0])
         query = (opt[-1] == "?")
         param = param.replace(" ", "")
+        policy = self.gc_policy
 
         if query:
-            # print("cb_pin_off", pin_number, "Query", param, file=sys.stderr)
-            self.error_push(E_SYNTAX)
+            threshold = self.numeric_query(param, policy.threshold, DEFAULT_GC_THRESHOLD, MIN_GC_THRESHOLD,
+                                           MAX_GC_THRESHOLD)
+            print(f"{threshold:_d}", file=self.stdout)
+        elif param is not None:
+            threshold = self.numeric_param(param, DEFAULT_GC_THRESHOLD, MIN_GC_THRESHOLD, MAX_GC_THRESHOLD)
+            if threshold is not None:
+                policy.set_threshold(threshold)
         else:
-            # print("cb_pin_off", pin_number, param, file=sys.stderr)
-            self.cb_pin_val(param="OFF", opt=opt)
+            self.error_push(E_MISSING_PARAM)
 
-    def cb_pwm_status(self, param="", opt=None):
+    def cb_pin_status(self, param="", opt=None):
         """
-        - ``PWM?``
+        - ``PIN?``
 
         :param param:
         :param opt:
@@ -761,22 +1907,23 @@ class RaspberryScpiPico(MicroScpiDevice):
         param = param.replace(" ", "")
 
         if query:
-            for pin in self.pin_conf.keys():
-                pwm_conf = self.pwm_conf[pin]
-                freq = pwm_conf.freq
-                duty = pwm_conf.duty_u16
-                message = ";".join([f"PWM{pin}:FREQuency {freq:_d}",
-                                    f"PWM{pin}:DUTY {duty:_d}"
-                                    ])
-                print(message, end=";", file=self.stdout)
-            print("", file=self.stdout)
+            print(self.pin_status.get(self.pin_conf.items()), file=self.stdout)
         else:
             self.error_push(E_SYNTAX)
 
-    def cb_pin_pwm_freq(self, param="", opt=None):
+    @staticmethod
+    def render_pin_status(pin, conf):
         """
-        - PWM[14|15|16|17|18|19|20|21|22|25]:FREQuency[?] num|DEFault|MINimum|MAXimum
-        - DEFault is 1000 [Hz]
+        :param int pin:
+        :param PinConfig conf:
+        :return str: ``PIN?`` response fragment
+        """
+        return f"PIN{pin}:MODE {IO_MODE_STRINGS[conf.mode]};PIN{pin}:VALue {IO_VALUE_STRINGS[conf.value]};"
+
+    def cb_pin_val(self, param="", opt=None):
+        """
+        - PIN[14|15|16|17|18|19|20|21|22|25]:VALue[?] 0|1|OFF|ON|DEFault
+        - DEFault is OFF
 
         :param param:
         :param opt:
@@ -785,59 +1932,38 @@ class RaspberryScpiPico(MicroScpiDevice):
 
         pin_number = int(opt[0])
         pin = self.pins[pin_number]
-        conf = self.pwm_conf[pin_number]
         query = (opt[-1] == "?")
-        pwm_freq = param
         param = param.replace(" ", "")
+        conf = self.pin_conf[pin_number]
 
         if query:
-            # print("cb_pin_pwm_freq", pin_number, "Query", param, file=sys.stderr)
+            # print("cb_pin_val", pin_number, "Query", param, file=sys.stderr)
             if param is not None:
                 if self.kw_def.match(param).match:
-                    pwm_freq = DEFAULT_PWM_CLOCK
-                elif self.kw_max.match(param).match:
-                    pwm_freq = MAX_PWM_CLOCK
-                elif self.kw_min.match(param).match:
-                    pwm_freq = MIN_PWM_CLOCK
+                    val = DEFAULT_IO_VALUE
                 else:
                     self.error_push(E_INVALID_PARAMETER)
                     return
             else:
-                pwm_freq = conf.freq
-            print(f"{pwm_freq:_d}", file=self.stdout)
-        elif pwm_freq is not None:
-            # print("cb_pin_pwm_freq", pin_number, param, file=sys.stderr)
-            if self.kw_def.match(pwm_freq).match:
-                pwm_freq = DEFAULT_PWM_CLOCK
-            elif self.kw_max.match(param).match:
-                pwm_freq = MAX_PWM_CLOCK
-            elif self.kw_min.match(param).match:
-                pwm_freq = MIN_PWM_CLOCK
-            else:
-                try:
-                    pwm_freq = int(float(pwm_freq))
-                except:
-                    self.error_push(E_INVALID_PARAMETER)
-                    return
-
-            if MIN_PWM_CLOCK <= pwm_freq <= MAX_PWM_CLOCK:
-                if self.pwmv[pin_number] == 1:
-                    pwm = machine.PWM(pin, freq=pwm_freq, duty_u16=conf.duty_u16)
-                    pwm.freq(pwm_freq)
-                    pwm.duty_u16(conf.duty_u16)
-                # print(pwm, file=sys.stderr)
-                vals = list(conf)
-                vals[conf.index(conf.freq)] = pwm_freq
-                self.pwm_conf[pin_number] = PwmConfig(*vals)
+                val = pin.value()
+            print(IO_VALUE_STRINGS[val], file=self.stdout)
+        elif param is not None:
+            # print("cb_pin_val", pin_number, param, file=sys.stderr)
+            if param == str(IO_ON) or self.kw_on.match(param).match:
+                pin.init(machine.Pin.OUT, value=IO_ON)
+                self.pin_conf[pin_number] = PinConfig(machine.Pin.OUT, IO_ON, conf.pull)
+            elif param == str(IO_OFF) or self.kw_off.match(param).match or self.kw_def.match(param).match:
+                pin.init(machine.Pin.OUT, value=IO_OFF)
+                self.pin_conf[pin_number] = PinConfig(machine.Pin.OUT, IO_OFF, conf.pull)
             else:
-                self.error_push(E_OUT_OF_RANGE)
+                self.error_push(E_INVALID_PARAMETER)
         else:
             self.error_push(E_MISSING_PARAM)
 
-    def cb_pin_pwm_duty(self, param="", opt=None):
+    def cb_pin_mode(self, param="", opt=None):
         """
-        - PWM[14|15|16|17|18|19|20|21|22|25]:DUTY[?] num|DEFault|MINimum|MAXimum
-        - DEFault is 32768
+        - PIN[14|15|16|17|18|19|20|21|22|25]:MODE[?] INput|OUTput|ODrain|PWM|DEFault
+        - DEFault is INput
 
         :param param:
         :param opt:
@@ -846,60 +1972,48 @@ class RaspberryScpiPico(MicroScpiDevice):
 
         pin_number = int(opt[0])
         pin = self.pins[pin_number]
-        conf = self.pwm_conf[pin_number]
         query = (opt[-1] == "?")
         param = param.replace(" ", "")
-        pwm_duty = param
+        conf = self.pin_conf[pin_number]
+        mode = conf.mode
+        alt = 0
 
         if query:
-            # print("cb_pin_pwm_duty", pin_number, "Query", param, file=sys.stderr)
-            if pwm_duty is not None:
+            # print("cb_pin_mode", pin_number, "Query", param, file=sys.stderr)
+            if param is not None:
                 if self.kw_def.match(param).match:
-                    pwm_duty = DEFAULT_PWM_DUTY
-                elif self.kw_max.match(param).match:
-                    pwm_duty = MAX_PWM_DUTY
-                elif self.kw_min.match(param).match:
-                    pwm_duty = MIN_PWM_DUTY
+                    mode = DEFAULT_IO_MODE
                 else:
                     self.error_push(E_INVALID_PARAMETER)
                     return
+            print(IO_MODE_STRINGS[mode], file=self.stdout)
+        elif param is not None:
+            # print("cb_pin_mode", pin_number, param, file=sys.stderr)
+            if self.kw_in.match(param).match or self.kw_def.match(param).match:
+                mode = machine.Pin.IN
+            elif self.kw_out.match(param).match:
+                mode = machine.Pin.OUT
+            elif self.kw_od.match(param).match:
+                mode = machine.Pin.OPEN_DRAIN
+            elif self.kw_pwm.match(param).match:
+                self.cb_pin_pwm_on("cb_pin_mode", opt)
+                mode = machine.Pin.ALT
+                alt = machine.Pin.ALT_PWM
             else:
-                pwm_duty = conf.duty_u16
-            print(f"{pwm_duty:_d}", file=self.stdout)
-        elif pwm_duty is not None:
-            # print("cb_pin_pwm_duty", pin_number, param, file=sys.stderr)
-
-            if self.kw_def.match(pwm_duty).match:
-                pwm_duty = DEFAULT_PWM_DUTY
-            elif self.kw_max.match(param).match:
-                pwm_duty = MAX_PWM_DUTY
-            elif self.kw_min.match(param).match:
-                pwm_duty = MIN_PWM_DUTY
-            else:
-                try:
-                    pwm_duty = int(float(pwm_duty))
-                except:
-                    self.error_push(E_INVALID_PARAMETER)
-                    return
+                self.error_push(E_INVALID_PARAMETER)
+                return
 
-            if MIN_PWM_DUTY <= pwm_duty <= MAX_PWM_DUTY:
-                if self.pwmv[pin_number] == 1:
-                    pwm = machine.PWM(pin, freq=conf.freq, duty_u16=pwm_duty)
-                    pwm.freq(conf.freq)
-                    pwm.duty_u16(pwm_duty)
-                    # print(pin, pwm)
-                # print(pwm, file=sys.stderr)
-                vals = list(conf)
-                vals[conf.index(conf.duty_u16)] = pwm_duty
-                self.pwm_conf[pin_number] = PwmConfig(*vals)
-            else:
-                self.error_push(E_OUT_OF_RANGE)
+            pin.init(mode, alt=alt, pull=conf.pull)
+            self.pins[pin_number] = pin
+            self.pin_conf[pin_number] = PinConfig(mode, conf.value, conf.pull)
+            # print(pin, file=sys.stderr)
         else:
             self.error_push(E_MISSING_PARAM)
 
-    def cb_pin_pwm_on(self, param="", opt=None):
+    def cb_pin_on(self, param="", opt=None):
         """
-        - PWM[14|15|16|17|18|19|20|21|22|25]:ON
+        - PIN[14|15|16|17|18|19|20|21|22|25]:ON
+        - PIN[14|15|16|17|18|19|20|21|22|25]:OFF
 
         :param param:
         :param opt:
@@ -907,26 +2021,20 @@ class RaspberryScpiPico(MicroScpiDevice):
         """
 
         pin_number = int(opt[0])
-        pin = self.pins[pin_number]
-        conf = self.pwm_conf[pin_number]
         query = (opt[-1] == "?")
         param = param.replace(" ", "")
 
         if query:
-            # print("cb_pin_pwm_on", pin_number, "Query", param, file=sys.stderr)
-            self.error_push(E_SYNTAX)
-        elif param is None:
-            # print("cb_pin_pwm_on", pin_number, file=sys.stderr)
-            pwm = machine.PWM(pin)
-            pwm.init(freq=conf.freq, duty_u16=conf.duty_u16)
-            self.pwmv[pin_number] = 1
-            self.cb_pin_mode("PWM", opt)
-        elif param != "cb_pin_mode":
+            # print("cb_pin_on", pin_number, "Query", param, file=sys.stderr)
             self.error_push(E_SYNTAX)
+        else:
+            # print("cb_pin_on", pin_number, param, file=sys.stderr)
+            self.cb_pin_val(param="ON", opt=opt)
 
-    def cb_pin_pwm_off(self, param="", opt=None):
+    def cb_pin_off(self, param="", opt=None):
         """
-        - PWM[14|15|16|17|18|19|20|21|22|25]:OFF
+        - PIN[14|15|16|17|18|19|20|21|22|25]:ON
+        - PIN[14|15|16|17|18|19|20|21|22|25]:OFF
 
         :param param:
         :param opt:
@@ -934,215 +2042,344 @@ class RaspberryScpiPico(MicroScpiDevice):
         """
 
         pin_number = int(opt[0])
-        pin = self.pins[pin_number]
-        conf = self.pwm_conf[pin_number]
         query = (opt[-1] == "?")
         param = param.replace(" ", "")
 
         if query:
-            # print("cb_pin_pwm_off", pin_number, "Query", param, file=sys.stderr)
+            # print("cb_pin_off", pin_number, "Query", param, file=sys.stderr)
             self.error_push(E_SYNTAX)
-        elif param is None:
-            # print("cb_pin_pwm_off", pin_number, file=sys.stderr)
-            self.pwmv[pin_number] = 0
-            pin.init(DEFAULT_IO_MODE)
-            self.cb_pin_mode("IN", opt)
         else:
-            self.error_push(E_MISSING_PARAM)
+            # print("cb_pin_off", pin_number, param, file=sys.stderr)
+            self.cb_pin_val(param="OFF", opt=opt)
 
-    def cb_led_status(self, param="", opt=None):
+    def cb_pin_measure_gate(self, param="", opt=None):
         """
-        - ``LED?``
+        - PIN[14|15|16|17|18|19|20|21|22|25]:MEASure:GATE[?] num|DEFault|MINimum|MAXimum
+        - DEFault is 100 [ms]
 
         :param param:
         :param opt:
         :return:
         """
 
-        pin_number = 25
+        pin_number = int(opt[0])
         query = (opt[-1] == "?")
-        conf = self.pin_conf[pin_number]
-        pwm_conf = self.pwm_conf[pin_number]
-        value = conf.value
-        freq = pwm_conf.freq
-        duty = pwm_conf.duty_u16
+        param = param.replace(" ", "")
+        conf = self.measure_conf[pin_number]
 
         if query:
-            print(f"LED:VALue {IO_VALUE_STRINGS[value]};LED:PWM:FREQuency {freq:_d};LED:PWM:DUTY {duty:_d}",
-                  file=self.stdout)
+            # print("cb_pin_measure_gate", pin_number, "Query", param, file=sys.stderr)
+            gate = self.numeric_query(param, conf.gate, DEFAULT_MEASURE_GATE, MIN_MEASURE_GATE, MAX_MEASURE_GATE)
+            print(f"{gate:_d}", file=self.stdout)
+        elif param is not None:
+            # print("cb_pin_measure_gate", pin_number, param, file=sys.stderr)
+            gate = self.numeric_param(param, DEFAULT_MEASURE_GATE, MIN_MEASURE_GATE, MAX_MEASURE_GATE)
+            if gate is not None:
+                self.measure_conf[pin_number] = MeasureConfig(gate)
         else:
-            self.error_push(E_SYNTAX)
+            self.error_push(E_MISSING_PARAM)
 
-    def cb_led_on(self, param="", opt=None):
+    def pin_measure(self, pin_number):
+        """ Measures cycles on a pin over its gate time and averages them.
+        Period and pulse width are ``MEASURE_OVERFLOW`` and duty cycle follows the pin level
+        if no full cycle was seen.
+
+        :param int pin_number:
+        :return tuple: (frequency [Hz], period [s], pulse width [s], duty cycle [%])
         """
-        - LED:ON
+        pin = self.pins[pin_number]
+        conf = self.measure_conf[pin_number]
+        count, high, period, sysclk = self.pulse.measure(pin, conf.gate)
+        if count == 0 or period == 0:
+            return 0.0, MEASURE_OVERFLOW, MEASURE_OVERFLOW, 100.0 if pin.value() else 0.0
+        return sysclk * count / period, period / (sysclk * count), high / (sysclk * count), 100 * high / period
+
+    def cb_pin_measure_freq(self, param="", opt=None):
+        """
+        - PIN[14|15|16|17|18|19|20|21|22|25]:MEASure:FREQuency?
+
+        Returns averaged frequency [Hz] of full cycles seen in the gate time
 
         :param param:
         :param opt:
         :return:
         """
 
-        opt[0] = "25"
+        pin_number = int(opt[0])
         query = (opt[-1] == "?")
 
         if query:
-            # print("cb_led_on", "Query", param, file=sys.stderr)
-            self.error_push(E_SYNTAX)
+            # print("cb_pin_measure_freq", pin_number, "Query", param, file=sys.stderr)
+            freq, period, width, duty = self.pin_measure(pin_number)
+            print(f"{freq:.6e}", file=self.stdout)
         else:
-            # print("cb_led_on", param, file=sys.stderr)
-            self.cb_pin_val(param="ON", opt=opt)
+            self.error_push(E_SYNTAX)
 
-    def cb_led_off(self, param="", opt=None):
+    def cb_pin_measure_period(self, param="", opt=None):
         """
-        - LED:OFF
+        - PIN[14|15|16|17|18|19|20|21|22|25]:MEASure:PERiod?
+
+        Returns averaged period [s] of full cycles seen in the gate time
 
         :param param:
         :param opt:
         :return:
         """
 
-        opt[0] = "25"
+        pin_number = int(opt[0])
         query = (opt[-1] == "?")
 
         if query:
-            # print("cb_led_off", "Query", param, file=sys.stderr)
-            self.error_push(E_SYNTAX)
+            # print("cb_pin_measure_period", pin_number, "Query", param, file=sys.stderr)
+            freq, period, width, duty = self.pin_measure(pin_number)
+            print(f"{period:.6e}", file=self.stdout)
         else:
-            # print("cb_led_off", param, file=sys.stderr)
-            self.cb_pin_val(param="OFF", opt=opt)
+            self.error_push(E_SYNTAX)
 
-    def cb_led_val(self, param, opt):
+    def cb_pin_measure_pwidth(self, param="", opt=None):
         """
-        - LED:VALue[?] 0|1|OFF|ON
+        - PIN[14|15|16|17|18|19|20|21|22|25]:MEASure:PWIDth?
+
+        Returns averaged positive pulse width [s] of full cycles seen in the gate time
 
         :param param:
         :param opt:
         :return:
         """
 
-        opt[0] = "25"
+        pin_number = int(opt[0])
         query = (opt[-1] == "?")
 
-        self.cb_pin_val(param, opt)
+        if query:
+            # print("cb_pin_measure_pwidth", pin_number, "Query", param, file=sys.stderr)
+            freq, period, width, duty = self.pin_measure(pin_number)
+            print(f"{width:.6e}", file=self.stdout)
+        else:
+            self.error_push(E_SYNTAX)
 
-    def cb_led_pwm_freq(self, param="", opt=None):
+    def cb_pin_measure_dcycle(self, param="", opt=None):
         """
-        - LED:PWM:FREQuency[?] num|DEFault|MINimum|MAXimum
-        - DEFault is 2000 [Hz]
+        - PIN[14|15|16|17|18|19|20|21|22|25]:MEASure:DCYCle?
+
+        Returns averaged duty cycle [%] of full cycles seen in the gate time
 
         :param param:
         :param opt:
         :return:
         """
 
-        opt[0] = "25"
+        pin_number = int(opt[0])
         query = (opt[-1] == "?")
-        pwm_freq = param
 
-        self.cb_pin_pwm_freq(param, opt)
+        if query:
+            # print("cb_pin_measure_dcycle", pin_number, "Query", param, file=sys.stderr)
+            freq, period, width, duty = self.pin_measure(pin_number)
+            print(f"{duty:.3f}", file=self.stdout)
+        else:
+            self.error_push(E_SYNTAX)
 
-    def cb_led_pwm_duty(self, param, opt):
-        """
-        - LED:PWM:DUTY[?] num|DEFault|MINimum|MAXimum
-        - DEFault is 32768
+    def pin_events(self, pin_number):
+        """ Returns EdgeLogger of a pin; its buffers are allocated on first call
 
-        :param param:
-        :param List[str] opt:
-        :return:
+        :param int pin_number:
+        :return EdgeLogger:
         """
+        if pin_number not in self.events:
+            self.events[pin_number] = EdgeLogger(self.pins[pin_number])
+        return self.events[pin_number]
 
-        opt[0] = "25"
-        query = (opt[-1] == "?")
-        pwm_duty = param
-
-        self.cb_pin_pwm_duty(param, opt)
-
-    def cb_led_pwm_on(self, param="", opt=None):
+    def cb_pin_event_edge(self, param="", opt=None):
         """
-        - LED:PWM:ON
+        - PIN[14|15|16|17|18|19|20|21|22|25]:EVENt:EDGE[?] RISE|FALL|BOTH|OFF|DEFault
+        - DEFault is OFF
 
         :param param:
         :param opt:
         :return:
         """
 
-        opt[0] = "25"
+        pin_number = int(opt[0])
         query = (opt[-1] == "?")
-        pwm_duty = param
+        param = param.replace(" ", "")
 
-        self.cb_pin_pwm_on(param, opt)
+        if query:
+            # print("cb_pin_event_edge", pin_number, "Query", param, file=sys.stderr)
+            if self.kw_def.match(param).match:
+                edge = EDGE_OFF
+            elif pin_number in self.events:
+                edge = self.events[pin_number].edge
+            else:
+                edge = EDGE_OFF
+            print(EDGE_STRINGS[edge], file=self.stdout)
+        elif param is not None:
+            # print("cb_pin_event_edge", pin_number, param, file=sys.stderr)
+            if self.kw_rise.match(param).match:
+                edge = EDGE_RISE
+            elif self.kw_fall.match(param).match:
+                edge = EDGE_FALL
+            elif self.kw_both.match(param).match:
+                edge = EDGE_BOTH
+            elif self.kw_off.match(param).match or self.kw_def.match(param).match:
+                edge = EDGE_OFF
+            else:
+                self.error_push(E_INVALID_PARAMETER)
+                return
+            if edge == EDGE_OFF and pin_number not in self.events:
+                return
+            self.pin_events(pin_number).enable(edge)
+        else:
+            self.error_push(E_MISSING_PARAM)
 
-    def cb_led_pwm_off(self, param="", opt=None):
+    def cb_pin_event_count(self, param="", opt=None):
         """
-        - LED:PWM:OFF
+        - PIN[14|15|16|17|18|19|20|21|22|25]:EVENt:COUNt?
+
+        Returns ``rise,fall,lost`` edge counts
 
         :param param:
         :param opt:
         :return:
         """
 
-        opt[0] = "25"
+        pin_number = int(opt[0])
         query = (opt[-1] == "?")
-        pwm_duty = param
 
-        self.cb_pin_pwm_off(param, opt)
+        if query:
+            # print("cb_pin_event_count", pin_number, "Query", param, file=sys.stderr)
+            rise, fall, lost = self.pin_events(pin_number).counts()
+            print(f"{rise},{fall},{lost}", file=self.stdout)
+        else:
+            self.error_push(E_SYNTAX)
 
-    def cb_i2c_status(self, param="", opt=None):
+    def cb_pin_event_data(self, param="", opt=None):
         """
-        - ``I2C?``
+        - PIN[14|15|16|17|18|19|20|21|22|25]:EVENt:DATA?
+
+        Returns ``rise,fall,lost,#<n><length><payload>`` and takes the logged events out of the ring.
+        Payload is 9 hex digits per event, oldest first: 1 digit of level after the edge
+        followed by 8 digits of ``ticks_us`` timestamp
 
         :param param:
         :param opt:
         :return:
         """
 
+        pin_number = int(opt[0])
         query = (opt[-1] == "?")
-        param = param.replace(" ", "")
 
         if query:
-            for bus in self.i2c_conf.keys():
-                conf = self.i2c_conf[bus]
-                shift = conf.bit
-                freq = conf.freq
-                print(f"I2C{bus}:ADDRess:BIT {shift};I2C{bus}:FREQuency {freq:_d};", end="", file=self.stdout)
-            else:
-                print("", file=self.stdout)
+            # print("cb_pin_event_data", pin_number, "Query", param, file=sys.stderr)
+            events = self.pin_events(pin_number)
+            block = events.drain()
+            rise, fall, lost = events.counts()
+            print(f"{rise},{fall},{lost},{block}", file=self.stdout)
         else:
-            self.error_push(E_MISSING_PARAM)
+            self.error_push(E_SYNTAX)
 
-    def cb_i2c_scan(self, param, opt):
+    def cb_pin_event_clear(self, param="", opt=None):
         """
-        - I2C[01]:SCAN?
+        - PIN[14|15|16|17|18|19|20|21|22|25]:EVENt:CLEar
 
         :param param:
         :param opt:
         :return:
         """
 
+        pin_number = int(opt[0])
         query = (opt[-1] == "?")
-        param = param.replace(" ", "")
 
-        if isinstance(opt[0], str):
-            bus_number = int(opt[0])
-            bus = self.i2c[bus_number]
-            conf = self.i2c_conf[bus_number]
-            shift = conf.bit
-            if query:
-                # print("cb_i2c_scan", "Query", param, file=sys.stderr)
-                scanned = bus.scan()
-                if not scanned:
-                    print(BUS_FAIL_CODE, file=self.stdout)
-                else:
-                    print(",".join([f"{(int(s) << shift):02x}" for s in scanned]), file=self.stdout)
-            else:
-                self.error_push(E_SYNTAX)
-        else:
+        if query:
+            # print("cb_pin_event_clear", pin_number, "Query", param, file=sys.stderr)
             self.error_push(E_SYNTAX)
+        elif pin_number in self.events:
+            # print("cb_pin_event_clear", pin_number, param, file=sys.stderr)
+            self.events[pin_number].clear()
 
-    def cb_i2c_freq(self, param, opt):
+    def port_open_drain(self, mask):
         """
-        - I2C[01]:FREQuency[?] num|DEFault|MINimum|MAXimum
-        - DEFault is 100_000 [Hz]
+        :param int mask: pin bit mask, subset of ``PORT_MASK``
+        :return int: mask of pins in ``mask`` configured as open drain
+        """
+        odrain = 0
+        for pin_number in self.pins.keys():
+            if mask & (1 << pin_number) and self.pin_conf[pin_number].mode == machine.Pin.OPEN_DRAIN:
+                odrain |= 1 << pin_number
+        return odrain
+
+    def port_levels(self, mask):
+        """ Levels driven on pins in ``mask``: output latch of push-pull pins, released driver of open drain pins
+
+        :param int mask: pin bit mask, subset of ``PORT_MASK``
+        :return int:
+        """
+        odrain = self.port_open_drain(mask)
+        return ((machine.mem32[SIO_GPIO_OUT] & ~odrain) | (~machine.mem32[SIO_GPIO_OE] & odrain)) & mask
+
+    def port_prepare_outputs(self, mask):
+        """ Switch every pin in ``mask`` which is not an output yet to a SIO output without enabling its driver;
+        its pull is kept. Returns the mask of pins whose output driver must be enabled afterwards.
+
+        :param int mask: pin bit mask of push-pull pins, subset of ``PORT_MASK``
+        :return int:
+        """
+        oe_mask = 0
+        for pin_number, pin in self.pins.items():
+            conf = self.pin_conf[pin_number]
+            if mask & (1 << pin_number) and conf.mode != machine.Pin.OUT:
+                self.pwmv[pin_number] = 0
+                pin.init(machine.Pin.IN, pull=conf.pull)  # SIO function, driver disabled; output latch is kept
+                oe_mask |= 1 << pin_number
+        return oe_mask
+
+    def port_update_conf(self, mask):
+        """ Reflect levels of pins in ``mask`` into ``pin_conf``; open drain pins stay open drain
+
+        :param int mask: pin bit mask, subset of ``PORT_MASK``
+        """
+        levels = self.port_levels(mask)
+        for pin_number in self.pins.keys():
+            if mask & (1 << pin_number):
+                conf = self.pin_conf[pin_number]
+                mode = machine.Pin.OPEN_DRAIN if conf.mode == machine.Pin.OPEN_DRAIN else machine.Pin.OUT
+                value = IO_ON if levels & (1 << pin_number) else IO_OFF
+                self.pin_conf[pin_number] = PinConfig(mode, value, conf.pull)
+
+    def port_write(self, register, mask, value):
+        """ Atomically update output latch of push-pull pins in ``mask`` via one SIO register write.
+        Pins which are not outputs yet are switched to output and enabled together by one ``GPIO_OE_SET`` write.
+        Open drain pins keep their latch low; they are released by ``GPIO_OE_CLR`` and pulled low by the same
+        ``GPIO_OE_SET`` write.
+
+        :param int register: one of ``SIO_GPIO_OUT_SET|SIO_GPIO_OUT_CLR|SIO_GPIO_OUT_XOR``
+        :param int mask: pin bit mask, subset of ``PORT_MASK``
+        :param int value: value written into ``register``
+        """
+        odrain = self.port_open_drain(mask)
+        high = self.port_levels(odrain)
+        if register == SIO_GPIO_OUT_SET:
+            high |= value & odrain
+        elif register == SIO_GPIO_OUT_CLR:
+            high &= ~value
+        else:
+            high ^= value & odrain
+        oe_mask = self.port_prepare_outputs(mask & ~odrain)
+        machine.mem32[register] = value & ~odrain
+        if high:
+            machine.mem32[SIO_GPIO_OE_CLR] = high
+        oe_mask |= odrain & ~high
+        if oe_mask:
+            machine.mem32[SIO_GPIO_OE_SET] = oe_mask
+        self.port_update_conf(mask)
+
+    def cb_port_val(self, param="", opt=None):
+        """
+        - PORT:VALue[?] mask,value
+
+        mask: 027fc000 or subset of it (bit n stands for GPIOn)
+        value: 00000000-027fc000
+
+        All masked pins change in a single ``GPIO_OUT_XOR`` register write; open drain pins keep their mode.
+        ``PORT:VALue? [mask]`` reads ``GPIO_IN``.
 
         :param param:
         :param opt:
@@ -1151,48 +2388,44 @@ class RaspberryScpiPico(MicroScpiDevice):
 
         query = (opt[-1] == "?")
         param = param.replace(" ", "")
-        bus_number = int(opt[0])
-        bus_freq = param
-        conf = self.i2c_conf[bus_number]
+        rstring = re.compile(r"^([0-9a-fA-F]+),([0-9a-fA-F]+)$")
+        rstring_q = re.compile(r"^([0-9a-fA-F]*)$")
 
         if query:
-            # print("cb_i2c_freq", bus_number, "Query", param, file=sys.stderr)
-
-            if self.kw_def.match(param).match:
-                bus_freq = DEFAULT_I2C_CLOCK
-            elif self.kw_max.match(param).match:
-                bus_freq = MAX_I2C_CLOCK
-            elif self.kw_min.match(param).match:
-                bus_freq = MIN_I2C_CLOCK
-            else:
-                bus_freq = conf.freq
-            print(f"{bus_freq:_d}", file=self.stdout)
-        elif bus_freq is not None:
-            # print("cb_i2c_freq", bus_number, param, file=sys.stderr)
-
-            if self.kw_def.match(bus_freq).match:
-                bus_freq = DEFAULT_I2C_CLOCK
-            elif self.kw_max.match(param).match:
-                bus_freq = MAX_I2C_CLOCK
-            elif self.kw_min.match(param).match:
-                bus_freq = MIN_I2C_CLOCK
+            # print("cb_port_val", "Query", param, file=sys.stderr)
+            searched = rstring_q.search(param)
+            if searched is not None:
+                mask = searched.group(1)
+                mask = int(mask, 16) if mask else PORT_MASK
+                if mask & ~PORT_MASK:
+                    self.error_push(E_OUT_OF_RANGE)
+                    return
+                value = machine.mem32[SIO_GPIO_IN] & mask
+                print(f"{value:08x}", file=self.stdout)
             else:
-                bus_freq = int(float(bus_freq))
-
-            if MIN_I2C_CLOCK <= bus_freq <= MAX_I2C_CLOCK:
-                bus = machine.I2C(bus_number, scl=conf.scl, sda=conf.sda, freq=bus_freq)
-                self.i2c[bus_number] = bus
-                vals = list(conf)
-                vals[conf.index(conf.freq)] = bus_freq
-                self.i2c_conf[bus_number] = I2cConfig(*vals)
+                self.error_push(E_INVALID_PARAMETER)
+        elif param is not None:
+            # print("cb_port_val", param, file=sys.stderr)
+            searched = rstring.search(param)
+            if searched is not None:
+                mask, value = searched.groups()
+                mask = int(mask, 16)
+                value = int(value, 16)
+                if (mask | value) & ~PORT_MASK:
+                    self.error_push(E_OUT_OF_RANGE)
+                    return
+                toggle = (self.port_levels(mask) ^ value) & mask
+                self.port_write(SIO_GPIO_OUT_XOR, mask, toggle)
             else:
-                self.error_push(E_OUT_OF_RANGE)
+                self.error_push(E_INVALID_PARAMETER)
         else:
             self.error_push(E_MISSING_PARAM)
 
-    def cb_i2c_address_bit(self, param, opt):
+    def cb_port_on(self, param="", opt=None):
         """
-        - I2C[01]:ADDRess:BIT[?] 0|1|DEFault
+        - PORT:ON mask
+
+        Drives all masked pins high in a single ``GPIO_OUT_SET`` register write.
 
         :param param:
         :param opt:
@@ -1201,37 +2434,28 @@ class RaspberryScpiPico(MicroScpiDevice):
 
         query = (opt[-1] == "?")
         param = param.replace(" ", "")
-        bus_number = int(opt[0])
-        bit = param
-        conf = self.i2c_conf[bus_number]
+        rstring = re.compile(r"^([0-9a-fA-F]+)$")
 
         if query:
-            # print("cb_i2c_address_bit", "Query", param, file=sys.stderr)
-
-            bit = conf.bit
-            print(f"{bit}", file=self.stdout)
-        elif bit is not None:
-            # print("cb_i2c_address_bit", param, file=sys.stderr)
-            if param in ["0", "1"]:
-                vals = list(conf)
-                vals[conf.index(conf.bit)] = int(param)
-                self.i2c_conf[bus_number] = I2cConfig(*vals)
-            elif self.kw_def.match(param).match:
-                vals = list(conf)
-                vals[conf.index(conf.bit)] = DEFAULT_I2C_BIT
-                self.i2c_conf[bus_number] = I2cConfig(*vals)
+            self.error_push(E_SYNTAX)
+        elif param is not None:
+            searched = rstring.search(param)
+            if searched is not None:
+                mask = int(searched.group(1), 16)
+                if mask & ~PORT_MASK:
+                    self.error_push(E_OUT_OF_RANGE)
+                    return
+                self.port_write(SIO_GPIO_OUT_SET, mask, mask)
             else:
                 self.error_push(E_INVALID_PARAMETER)
         else:
             self.error_push(E_MISSING_PARAM)
 
-    def cb_i2c_write(self, param, opt):
+    def cb_port_off(self, param="", opt=None):
         """
-        - I2C[01]:WRITE address,buffer,stop
+        - PORT:OFF mask
 
-        address: 01-ff
-        buffer: data
-        stop: 0|1
+        Drives all masked pins low in a single ``GPIO_OUT_CLR`` register write.
 
         :param param:
         :param opt:
@@ -1240,40 +2464,26 @@ class RaspberryScpiPico(MicroScpiDevice):
 
         query = (opt[-1] == "?")
         param = param.replace(" ", "")
-        bus_number = int(opt[0])
-        bus = self.i2c[bus_number]
-        conf = self.i2c_conf[bus_number]
-        shift = conf.bit
-        rstring = re.compile(r"^([1-9a-fA-F][0-9a-fA-F]),(([0-9a-fA-F][0-9a-fA-F])+),([01])$")
+        rstring = re.compile(r"^([0-9a-fA-F]+)$")
 
         if query:
-            # print("cb_i2c_write", "Query", param, file=sys.stderr)
             self.error_push(E_SYNTAX)
         elif param is not None:
-            # print("cb_i2c_write", param, file=sys.stderr)
             searched = rstring.search(param)
             if searched is not None:
-                address, data, _, stop = searched.groups()
-                stop = bool(int(stop))
-                address = int(f"0x{address}", 16) >> shift
-                data_array = int(f"0x{data}", 16).to_bytes(ceil(len(data) / 2), "big")
-                # print(f"0x{address:02x}", [f"0x{c:02x}" for c in data_array], stop, file=sys.stderr)
-                try:
-                    bus.writeto(address, bytes(data_array), stop)
-                except OSError:
-                    self.error_push(E_I2C_FAIL)
+                mask = int(searched.group(1), 16)
+                if mask & ~PORT_MASK:
+                    self.error_push(E_OUT_OF_RANGE)
+                    return
+                self.port_write(SIO_GPIO_OUT_CLR, mask, mask)
             else:
                 self.error_push(E_INVALID_PARAMETER)
         else:
             self.error_push(E_MISSING_PARAM)
 
-    def cb_i2c_read(self, param, opt):
+    def cb_pwm_status(self, param="", opt=None):
         """
-        - I2C[01]:READ? address,length,stop
-
-        address: 01-ff
-        length: 1-99
-        stop: 0|1
+        - ``PWM?``
 
         :param param:
         :param opt:
@@ -1282,96 +2492,2288 @@ class RaspberryScpiPico(MicroScpiDevice):
 
         query = (opt[-1] == "?")
         param = param.replace(" ", "")
-        bus_number = int(opt[0])
-        bus = self.i2c[bus_number]
-        conf = self.i2c_conf[bus_number]
-        shift = conf.bit
-        rstring = re.compile(r"^([1-9a-fA-F][0-9a-fA-F]),([1-9]|[1-9][0-9]+),([01])$")
 
         if query:
-            # print("cb_i2c_read", "Query", param, file=sys.stderr)
-            if param is not None:
-                # print("cb_i2c_read", param, file=sys.stderr)
-
-                searched = rstring.search(param)
-                if searched is not None:
-                    address, length, stop = searched.groups()
-                    stop = bool(int(stop))
-                    address = int(f"0x{address}", 16) >> shift
-                    # print(f"0x{address:02x}", length, stop, file=sys.stderr)
-                    try:
-                        read = bus.readfrom(int(address), int(length), stop)
-                        data = ",".join(f"{d:02x}" for d in read)
-                        print(data, file=self.stdout)
-                        return
-                    except OSError:
-                        self.error_push(E_I2C_FAIL)
-                        print(BUS_FAIL_CODE, file=self.stdout)
-                else:
-                    self.error_push(E_INVALID_PARAMETER)
-            else:
-                self.error_push(E_MISSING_PARAM)
+            print(self.pwm_status.get(self.pwm_conf.items()), file=self.stdout)
         else:
             self.error_push(E_SYNTAX)
-            print(BUS_FAIL_CODE, file=self.stdout)
 
-    def cb_i2c_write_memory(self, param, opt):
+    @staticmethod
+    def render_pwm_status(pin, conf):
         """
-        - I2C[01]:MEMory:WRITE address,memaddress,buf,addrsize
+        :param int pin:
+        :param PwmConfig conf:
+        :return str: ``PWM?`` response fragment
+        """
+        return f"PWM{pin}:FREQuency {conf.freq:_d};PWM{pin}:DUTY {conf.duty_u16:_d};"
 
-        address: 01-ff
-        memaddress: 0000-ffff
-        buf: data
-        addrsize: 1|2
+    def cb_pin_pwm_freq(self, param="", opt=None):
+        """
+        - PWM[14|15|16|17|18|19|20|21|22|25]:FREQuency[?] num|DEFault|MINimum|MAXimum
+        - DEFault is 1000 [Hz]
 
         :param param:
         :param opt:
         :return:
         """
 
+        pin_number = int(opt[0])
+        pin = self.pins[pin_number]
+        conf = self.pwm_conf[pin_number]
         query = (opt[-1] == "?")
+        pwm_freq = param
         param = param.replace(" ", "")
-        bus_number = int(opt[0])
-        bus: machine.I2C = self.i2c[bus_number]
-        conf = self.i2c_conf[bus_number]
-        shift = conf.bit
-        rstring = re.compile(
+
+        if query:
+            # print("cb_pin_pwm_freq", pin_number, "Query", param, file=sys.stderr)
+            if param is not None:
+                if self.kw_def.match(param).match:
+                    pwm_freq = DEFAULT_PWM_CLOCK
+                elif self.kw_max.match(param).match:
+                    pwm_freq = MAX_PWM_CLOCK
+                elif self.kw_min.match(param).match:
+                    pwm_freq = MIN_PWM_CLOCK
+                else:
+                    self.error_push(E_INVALID_PARAMETER)
+                    return
+            else:
+                pwm_freq = conf.freq
+            print(f"{pwm_freq:_d}", file=self.stdout)
+        elif pwm_freq is not None:
+            # print("cb_pin_pwm_freq", pin_number, param, file=sys.stderr)
+            if self.kw_def.match(pwm_freq).match:
+                pwm_freq = DEFAULT_PWM_CLOCK
+            elif self.kw_max.match(param).match:
+                pwm_freq = MAX_PWM_CLOCK
+            elif self.kw_min.match(param).match:
+                pwm_freq = MIN_PWM_CLOCK
+            else:
+                try:
+                    pwm_freq = int(float(pwm_freq))
+                except:
+                    self.error_push(E_INVALID_PARAMETER)
+                    return
+
+            if MIN_PWM_CLOCK <= pwm_freq <= MAX_PWM_CLOCK:
+                vals = list(conf)
+                vals[conf.index(conf.freq)] = pwm_freq
+                self.pwm_stage(pin_number, PwmConfig(*vals), self.pwmv[pin_number])
+            else:
+                self.error_push(E_OUT_OF_RANGE)
+        else:
+            self.error_push(E_MISSING_PARAM)
+
+    def cb_pin_pwm_duty(self, param="", opt=None):
+        """
+        - PWM[14|15|16|17|18|19|20|21|22|25]:DUTY[?] num|DEFault|MINimum|MAXimum
+        - DEFault is 32768
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        pin_number = int(opt[0])
+        pin = self.pins[pin_number]
+        conf = self.pwm_conf[pin_number]
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+        pwm_duty = param
+
+        if query:
+            # print("cb_pin_pwm_duty", pin_number, "Query", param, file=sys.stderr)
+            if pwm_duty is not None:
+                if self.kw_def.match(param).match:
+                    pwm_duty = DEFAULT_PWM_DUTY
+                elif self.kw_max.match(param).match:
+                    pwm_duty = MAX_PWM_DUTY
+                elif self.kw_min.match(param).match:
+                    pwm_duty = MIN_PWM_DUTY
+                else:
+                    self.error_push(E_INVALID_PARAMETER)
+                    return
+            else:
+                pwm_duty = conf.duty_u16
+            print(f"{pwm_duty:_d}", file=self.stdout)
+        elif pwm_duty is not None:
+            # print("cb_pin_pwm_duty", pin_number, param, file=sys.stderr)
+
+            if self.kw_def.match(pwm_duty).match:
+                pwm_duty = DEFAULT_PWM_DUTY
+            elif self.kw_max.match(param).match:
+                pwm_duty = MAX_PWM_DUTY
+            elif self.kw_min.match(param).match:
+                pwm_duty = MIN_PWM_DUTY
+            else:
+                try:
+                    pwm_duty = int(float(pwm_duty))
+                except:
+                    self.error_push(E_INVALID_PARAMETER)
+                    return
+
+            if MIN_PWM_DUTY <= pwm_duty <= MAX_PWM_DUTY:
+                vals = list(conf)
+                vals[conf.index(conf.duty_u16)] = pwm_duty
+                self.pwm_stage(pin_number, PwmConfig(*vals), self.pwmv[pin_number])
+            else:
+                self.error_push(E_OUT_OF_RANGE)
+        else:
+            self.error_push(E_MISSING_PARAM)
+
+    def cb_pin_pwm_on(self, param="", opt=None):
+        """
+        - PWM[14|15|16|17|18|19|20|21|22|25]:ON
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        pin_number = int(opt[0])
+        pin = self.pins[pin_number]
+        conf = self.pwm_conf[pin_number]
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+
+        if query:
+            # print("cb_pin_pwm_on", pin_number, "Query", param, file=sys.stderr)
+            self.error_push(E_SYNTAX)
+        elif param is None:
+            # print("cb_pin_pwm_on", pin_number, file=sys.stderr)
+            self.pwm_stage(pin_number, conf, 1)
+        elif param != "cb_pin_mode":
+            self.error_push(E_SYNTAX)
+
+    def cb_pin_pwm_off(self, param="", opt=None):
+        """
+        - PWM[14|15|16|17|18|19|20|21|22|25]:OFF
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        pin_number = int(opt[0])
+        pin = self.pins[pin_number]
+        conf = self.pwm_conf[pin_number]
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+
+        if query:
+            # print("cb_pin_pwm_off", pin_number, "Query", param, file=sys.stderr)
+            self.error_push(E_SYNTAX)
+        elif param is None:
+            # print("cb_pin_pwm_off", pin_number, file=sys.stderr)
+            if self.pwm_sync:
+                self.pwm_stage(pin_number, conf, 0)
+            else:
+                self.pwmv[pin_number] = 0
+                pin.init(DEFAULT_IO_MODE)
+                self.cb_pin_mode("IN", opt)
+        else:
+            self.error_push(E_MISSING_PARAM)
+
+    def pwm_stage(self, pin_number, conf, enabled):
+        """ Stores PWM setting of a pin. A running pin is updated at once unless PWM:SYNChronous is ON,
+        in which case the setting waits for PWM:APPLy. The setting is dropped if it conflicts with the other
+        channel of the slice.
+
+        :param int pin_number:
+        :param PwmConfig conf:
+        :param int enabled: 1 to run PWM on the pin
+        """
+        previous = (self.pwm_conf[pin_number], self.pwmv[pin_number])
+        self.pwm_conf[pin_number] = conf
+        self.pwmv[pin_number] = enabled
+        if self.pwm_sync:
+            if pin_number not in self.pwm_staged:
+                self.pwm_staged.append(pin_number)
+        elif enabled == 1 and not self.pwm_apply([pin_number]):
+            self.pwm_conf[pin_number], self.pwmv[pin_number] = previous
+
+    def pwm_apply(self, pin_numbers, align=False):
+        """ Programs PWM slices of ``pin_numbers`` and routes the pins to PWM or back to input.
+        Nothing is changed if running channels of one slice need different frequencies.
+
+        :param list pin_numbers:
+        :param bool align: restart every programmed slice so that all of them run in phase
+        :return bool: True if applied
+        """
+        slices = [pwm_slice(pin_number) for pin_number in pin_numbers]
+        channels = OrderedDict()
+        for pin_number, conf in self.pwm_conf.items():
+            if pwm_slice(pin_number) in slices:
+                channels[pin_number] = (self.pwmv[pin_number], conf.freq, conf.duty_u16)
+        if self.pwm_engine.conflicts(channels):
+            self.error_push(E_SETTINGS_CONFLICT)
+            return False
+
+        mask = self.pwm_engine.program(channels, machine.freq(), align)
+        for pin_number in pin_numbers:
+            mode = self.pin_conf[pin_number].mode
+            if self.pwmv[pin_number] == 1:
+                if mode != machine.Pin.ALT:
+                    self.cb_pin_mode("PWM", [str(pin_number)])
+            elif mode == machine.Pin.ALT:
+                self.pins[pin_number].init(DEFAULT_IO_MODE)
+                self.cb_pin_mode("IN", [str(pin_number)])
+        self.pwm_engine.enable(mask)
+        return True
+
+    def cb_pin_pwm_slice(self, param="", opt=None):
+        """
+        - PWM[14|15|16|17|18|19|20|21|22|25]:SLICe?
+
+        Returns ``slice,channel`` i.e. ``7,A``; both channels of a slice share the frequency
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        pin_number = int(opt[0])
+        query = (opt[-1] == "?")
+
+        if query:
+            # print("cb_pin_pwm_slice", pin_number, "Query", param, file=sys.stderr)
+            print(f"{pwm_slice(pin_number)},{CHANNEL_STRINGS[pwm_channel(pin_number)]}", file=self.stdout)
+        else:
+            self.error_push(E_SYNTAX)
+
+    def cb_pwm_sync(self, param="", opt=None):
+        """
+        - PWM:SYNChronous[?] ON|OFF|DEFault
+        - DEFault is OFF
+
+        ON: PWM[nn]:FREQuency, :DUTY, :ON and :OFF are staged until PWM:APPLy
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+
+        if query:
+            # print("cb_pwm_sync", "Query", param, file=sys.stderr)
+            sync = False if self.kw_def.match(param).match else self.pwm_sync
+            print(IO_VALUE_STRINGS[IO_ON if sync else IO_OFF], file=self.stdout)
+        elif param is not None:
+            # print("cb_pwm_sync", param, file=sys.stderr)
+            if param == str(IO_ON) or self.kw_on.match(param).match:
+                self.pwm_sync = True
+            elif param == str(IO_OFF) or self.kw_off.match(param).match or self.kw_def.match(param).match:
+                self.pwm_sync = False
+            else:
+                self.error_push(E_INVALID_PARAMETER)
+        else:
+            self.error_push(E_MISSING_PARAM)
+
+    def cb_pwm_apply(self, param="", opt=None):
+        """
+        - PWM:APPLy [ALIGn]
+
+        Applies staged PWM settings at once. Slices whose timing changes are restarted together in phase;
+        others only get the new duty at the end of their current period. ALIGn restarts every running slice.
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+
+        if query:
+            # print("cb_pwm_apply", "Query", param, file=sys.stderr)
+            self.error_push(E_SYNTAX)
+            return
+
+        # print("cb_pwm_apply", param, file=sys.stderr)
+        align = False
+        if param is not None and param != "":
+            if self.kw_align.match(param).match:
+                align = True
+            else:
+                self.error_push(E_INVALID_PARAMETER)
+                return
+        pin_numbers = list(self.pwm_staged)
+        if align:
+            pin_numbers += [pin_number for pin_number, pwmv in self.pwmv.items()
+                            if pwmv == 1 and pin_number not in pin_numbers]
+        if self.pwm_apply(pin_numbers, align):
+            self.pwm_staged = []
+
+    def cb_led_status(self, param="", opt=None):
+        """
+        - ``LED?``
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        pin_number = 25
+        query = (opt[-1] == "?")
+
+        if query:
+            print(self.led_status.get((("VALue", self.pin_conf[pin_number]), ("PWM", self.pwm_conf[pin_number]))),
+                  file=self.stdout)
+        else:
+            self.error_push(E_SYNTAX)
+
+    @staticmethod
+    def render_led_status(key, conf):
+        """
+        :param str key: "VALue" for PinConfig or "PWM" for PwmConfig
+        :param conf:
+        :return str: ``LED?`` response fragment
+        """
+        if key == "VALue":
+            return f"LED:VALue {IO_VALUE_STRINGS[conf.value]};"
+        return f"LED:PWM:FREQuency {conf.freq:_d};LED:PWM:DUTY {conf.duty_u16:_d}"
+
+    def cb_led_on(self, param="", opt=None):
+        """
+        - LED:ON
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        opt[0] = "25"
+        query = (opt[-1] == "?")
+
+        if query:
+            # print("cb_led_on", "Query", param, file=sys.stderr)
+            self.error_push(E_SYNTAX)
+        else:
+            # print("cb_led_on", param, file=sys.stderr)
+            self.cb_pin_val(param="ON", opt=opt)
+
+    def cb_led_off(self, param="", opt=None):
+        """
+        - LED:OFF
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        opt[0] = "25"
+        query = (opt[-1] == "?")
+
+        if query:
+            # print("cb_led_off", "Query", param, file=sys.stderr)
+            self.error_push(E_SYNTAX)
+        else:
+            # print("cb_led_off", param, file=sys.stderr)
+            self.cb_pin_val(param="OFF", opt=opt)
+
+    def cb_led_val(self, param, opt):
+        """
+        - LED:VALue[?] 0|1|OFF|ON
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        opt[0] = "25"
+        query = (opt[-1] == "?")
+
+        self.cb_pin_val(param, opt)
+
+    def cb_led_pwm_freq(self, param="", opt=None):
+        """
+        - LED:PWM:FREQuency[?] num|DEFault|MINimum|MAXimum
+        - DEFault is 2000 [Hz]
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        opt[0] = "25"
+        query = (opt[-1] == "?")
+        pwm_freq = param
+
+        self.cb_pin_pwm_freq(param, opt)
+
+    def cb_led_pwm_duty(self, param, opt):
+        """
+        - LED:PWM:DUTY[?] num|DEFault|MINimum|MAXimum
+        - DEFault is 32768
+
+        :param param:
+        :param List[str] opt:
+        :return:
+        """
+
+        opt[0] = "25"
+        query = (opt[-1] == "?")
+        pwm_duty = param
+
+        self.cb_pin_pwm_duty(param, opt)
+
+    def cb_led_pwm_on(self, param="", opt=None):
+        """
+        - LED:PWM:ON
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        opt[0] = "25"
+        query = (opt[-1] == "?")
+        pwm_duty = param
+
+        self.cb_pin_pwm_on(param, opt)
+
+    def cb_led_pwm_off(self, param="", opt=None):
+        """
+        - LED:PWM:OFF
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        opt[0] = "25"
+        query = (opt[-1] == "?")
+        pwm_duty = param
+
+        self.cb_pin_pwm_off(param, opt)
+
+    def cb_i2c_status(self, param="", opt=None):
+        """
+        - ``I2C?``
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+
+        if query:
+            print(self.i2c_status.get(self.i2c_conf.items()), file=self.stdout)
+        else:
+            self.error_push(E_MISSING_PARAM)
+
+    @staticmethod
+    def render_i2c_status(bus, conf):
+        """
+        :param int bus:
+        :param I2cConfig conf:
+        :return str: ``I2C?`` response fragment
+        """
+        return f"I2C{bus}:ADDRess:BIT {conf.bit};I2C{bus}:FREQuency {conf.freq:_d};"
+
+    def cb_i2c_scan(self, param, opt):
+        """
+        - I2C[01]:SCAN?
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+
+        if isinstance(opt[0], str):
+            bus_number = int(opt[0])
+            bus = self.i2c[bus_number]
+            conf = self.i2c_conf[bus_number]
+            shift = conf.bit
+            if query:
+                # print("cb_i2c_scan", "Query", param, file=sys.stderr)
+                scanned = bus.scan()
+                if not scanned:
+                    print(BUS_FAIL_CODE, file=self.stdout)
+                else:
+                    print(hex_encode(bytes(int(s) << shift for s in scanned), ","), file=self.stdout)
+            else:
+                self.error_push(E_SYNTAX)
+        else:
+            self.error_push(E_SYNTAX)
+
+    def cb_i2c_freq(self, param, opt):
+        """
+        - I2C[01]:FREQuency[?] num|DEFault|MINimum|MAXimum
+        - DEFault is 100_000 [Hz]
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+        bus_number = int(opt[0])
+        bus_freq = param
+        conf = self.i2c_conf[bus_number]
+
+        if query:
+            # print("cb_i2c_freq", bus_number, "Query", param, file=sys.stderr)
+
+            if self.kw_def.match(param).match:
+                bus_freq = DEFAULT_I2C_CLOCK
+            elif self.kw_max.match(param).match:
+                bus_freq = MAX_I2C_CLOCK
+            elif self.kw_min.match(param).match:
+                bus_freq = MIN_I2C_CLOCK
+            else:
+                bus_freq = conf.freq
+            print(f"{bus_freq:_d}", file=self.stdout)
+        elif bus_freq is not None:
+            # print("cb_i2c_freq", bus_number, param, file=sys.stderr)
+
+            if self.kw_def.match(bus_freq).match:
+                bus_freq = DEFAULT_I2C_CLOCK
+            elif self.kw_max.match(param).match:
+                bus_freq = MAX_I2C_CLOCK
+            elif self.kw_min.match(param).match:
+                bus_freq = MIN_I2C_CLOCK
+            else:
+                bus_freq = int(float(bus_freq))
+
+            if MIN_I2C_CLOCK <= bus_freq <= MAX_I2C_CLOCK:
+                bus = machine.I2C(bus_number, scl=conf.scl, sda=conf.sda, freq=bus_freq)
+                self.i2c[bus_number] = bus
+                vals = list(conf)
+                vals[conf.index(conf.freq)] = bus_freq
+                self.i2c_conf[bus_number] = I2cConfig(*vals)
+            else:
+                self.error_push(E_OUT_OF_RANGE)
+        else:
+            self.error_push(E_MISSING_PARAM)
+
+    def cb_i2c_address_bit(self, param, opt):
+        """
+        - I2C[01]:ADDRess:BIT[?] 0|1|DEFault
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+        bus_number = int(opt[0])
+        bit = param
+        conf = self.i2c_conf[bus_number]
+
+        if query:
+            # print("cb_i2c_address_bit", "Query", param, file=sys.stderr)
+
+            bit = conf.bit
+            print(f"{bit}", file=self.stdout)
+        elif bit is not None:
+            # print("cb_i2c_address_bit", param, file=sys.stderr)
+            if param in ["0", "1"]:
+                vals = list(conf)
+                vals[conf.index(conf.bit)] = int(param)
+                self.i2c_conf[bus_number] = I2cConfig(*vals)
+            elif self.kw_def.match(param).match:
+                vals = list(conf)
+                vals[conf.index(conf.bit)] = DEFAULT_I2C_BIT
+                self.i2c_conf[bus_number] = I2cConfig(*vals)
+            else:
+                self.error_push(E_INVALID_PARAMETER)
+        else:
+            self.error_push(E_MISSING_PARAM)
+
+    def cb_i2c_write(self, param, opt):
+        """
+        - I2C[01]:WRITE address,buffer,stop
+
+        address: 01-ff
+        buffer: data
+        stop: 0|1
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+        bus_number = int(opt[0])
+        bus = self.i2c[bus_number]
+        conf = self.i2c_conf[bus_number]
+        shift = conf.bit
+        rstring = re.compile(r"^([1-9a-fA-F][0-9a-fA-F]),(([0-9a-fA-F][0-9a-fA-F])+),([01])$")
+
+        if query:
+            # print("cb_i2c_write", "Query", param, file=sys.stderr)
+            self.error_push(E_SYNTAX)
+        elif param is not None:
+            # print("cb_i2c_write", param, file=sys.stderr)
+            searched = rstring.search(param)
+            if searched is not None:
+                address, data, _, stop = searched.groups()
+                stop = bool(int(stop))
+                address = int(f"0x{address}", 16) >> shift
+                data_array = hex_decode(data)
+                # print(f"0x{address:02x}", [f"0x{c:02x}" for c in data_array], stop, file=sys.stderr)
+                try:
+                    bus.writeto(address, bytes(data_array), stop)
+                except OSError:
+                    self.error_push(E_I2C_FAIL)
+            else:
+                self.error_push(E_INVALID_PARAMETER)
+        else:
+            self.error_push(E_MISSING_PARAM)
+
+    def cb_i2c_read(self, param, opt):
+        """
+        - I2C[01]:READ? address,length,stop
+
+        address: 01-ff
+        length: 1-99
+        stop: 0|1
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+        bus_number = int(opt[0])
+        bus = self.i2c[bus_number]
+        conf = self.i2c_conf[bus_number]
+        shift = conf.bit
+        rstring = re.compile(r"^([1-9a-fA-F][0-9a-fA-F]),([1-9]|[1-9][0-9]+),([01])$")
+
+        if query:
+            # print("cb_i2c_read", "Query", param, file=sys.stderr)
+            if param is not None:
+                # print("cb_i2c_read", param, file=sys.stderr)
+
+                searched = rstring.search(param)
+                if searched is not None:
+                    address, length, stop = searched.groups()
+                    stop = bool(int(stop))
+                    address = int(f"0x{address}", 16) >> shift
+                    # print(f"0x{address:02x}", length, stop, file=sys.stderr)
+                    try:
+                        read = bus.readfrom(int(address), int(length), stop)
+                        data = hex_encode(read, ",")
+                        print(data, file=self.stdout)
+                        return
+                    except OSError:
+                        self.error_push(E_I2C_FAIL)
+                        print(BUS_FAIL_CODE, file=self.stdout)
+                else:
+                    self.error_push(E_INVALID_PARAMETER)
+            else:
+                self.error_push(E_MISSING_PARAM)
+        else:
+            self.error_push(E_SYNTAX)
+            print(BUS_FAIL_CODE, file=self.stdout)
+
+    def cb_i2c_write_memory(self, param, opt):
+        """
+        - I2C[01]:MEMory:WRITE address,memaddress,buf,addrsize
+
+        address: 01-ff
+        memaddress: 0000-ffff
+        buf: data
+        addrsize: 1|2
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+        bus_number = int(opt[0])
+        bus: machine.I2C = self.i2c[bus_number]
+        conf = self.i2c_conf[bus_number]
+        shift = conf.bit
+        rstring = re.compile(
             r"^([1-9a-fA-F][0-9a-fA-F]),(([0-9a-fA-F][0-9a-fA-F])(|[0-9a-fA-F][0-9a-fA-F])),([0-9a-fA-F]+),([12])$")
 
         if query:
-            # print("cb_i2c_write_memory", "Query", param, file=sys.stderr)
+            # print("cb_i2c_write_memory", "Query", param, file=sys.stderr)
+            self.error_push(E_SYNTAX)
+        elif param is not None:
+            # print("cb_i2c_write_memory", param, file=sys.stderr)
+
+            searched = rstring.search(param)
+
+            if searched is not None:
+                address, memaddress, _, data, addrsize = searched.groups()
+                # print(address, memaddress, data, addrsize, file=sys.stderr)
+
+                address = int(f"0x{address}", 16) >> shift
+                memaddress = int(f"0x{memaddress}", 16)
+                data_array = hex_decode(data)
+                addrsize = 8 * int(addrsize)
+                # print(f"0x{address:02x}", f"0x{memaddress:02x}", [f"0x{c:02x}" for c in data_array], addrsize, file=sys.stderr)
+                try:
+                    bus.writeto_mem(address, memaddress, data_array, addrsize=addrsize)
+                except OSError:
+                    self.error_push(E_I2C_FAIL)
+            else:
+                self.error_push(E_INVALID_PARAMETER)
+        else:
+            self.error_push(E_MISSING_PARAM)
+
+    def cb_i2c_read_memory(self, param, opt):
+        """
+        - I2C[01]:MEMory:READ? address,memaddress,nbytes,addrsize
+
+        addr: 01-FF
+        memaddr: 00-FF | 0000-FFFF
+        nbytes: 1-99
+        addrsize: 1|2
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+        bus_number = int(opt[0])
+        bus: machine.I2C = self.i2c[bus_number]
+        conf: I2cConfig = self.i2c_conf[bus_number]
+        shift = conf.bit
+        rstring = re.compile(
+            r"^([1-9a-fA-F][0-9a-fA-F]),(([0-9a-fA-F][0-9a-fA-F])(|[0-9a-fA-F][0-9a-fA-F])),([1-9]|[1-9][0-9]),([12])$")
+
+        if query:
+            # print("cb_i2c_read_memory", "Query", param, file=sys.stderr)
+
+            if param is not None:
+                searched = rstring.search(param)
+                if searched is not None:
+                    address, memaddress, _, length, addrsize = searched.groups()
+                    address = int(f"0x{address}", 16) >> shift
+                    memaddress = int(f"0x{memaddress}", 16)
+                    length = int(length)
+                    addrsize = 8 * int(addrsize)
+
+                    try:
+                        read = bus.readfrom_mem(address, memaddress, length, addrsize=addrsize)
+                        data = hex_encode(read, ",")
+                        print(data, file=self.stdout)
+                        return
+                    except OSError:
+                        self.error_push(E_I2C_FAIL)
+                        print(BUS_FAIL_CODE, file=self.stdout)
+                else:
+                    self.error_push(E_INVALID_PARAMETER)
+            else:
+                self.error_push(E_MISSING_PARAM)
+        else:
+            self.error_push(E_SYNTAX)
+        print(BUS_FAIL_CODE, file=self.stdout)
+
+    def cb_adc_read(self, param, opt):
+        """
+        - ADC[01234]:READ?
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+        adc_ch = int(opt[0])
+        adc = self.adc[adc_ch]
+
+        conf = self.adc_conf[adc_ch]
+
+        if query:
+            # print("cb_adc_read", "Query", param, file=sys.stderr)
+            value = round(self.adc_sample(adc, conf.oversampling))
+            print(f"{value:_d}", file=self.stdout)  # decimal
+        else:
+            self.error_push(E_SYNTAX)
+
+    @staticmethod
+    def adc_sample(adc, oversampling=DEFAULT_ADC_OVERSAMPLING):
+        """ Take ``oversampling`` raw samples from ``adc`` and decimate them into one averaged sample
+
+        :param machine.ADC adc:
+        :param int oversampling:
+        :return float:
+        """
+        read_u16 = adc.read_u16
+        total = 0
+        for _ in range(oversampling):
+            total += read_u16()
+        return total / oversampling
+
+    def cb_adc_oversampling(self, param, opt):
+        """
+        - ADC[01234]:OVERsampling[?] num|DEFault|MINimum|MAXimum
+        - DEFault is 1 (no oversampling)
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+        adc_ch = int(opt[0])
+        conf = self.adc_conf[adc_ch]
+        oversampling = param
+
+        if query:
+            # print("cb_adc_oversampling", adc_ch, "Query", param, file=sys.stderr)
+            if self.kw_def.match(param).match:
+                oversampling = DEFAULT_ADC_OVERSAMPLING
+            elif self.kw_max.match(param).match:
+                oversampling = MAX_ADC_OVERSAMPLING
+            elif self.kw_min.match(param).match:
+                oversampling = MIN_ADC_OVERSAMPLING
+            else:
+                oversampling = conf.oversampling
+            print(f"{oversampling:_d}", file=self.stdout)
+        elif oversampling is not None:
+            # print("cb_adc_oversampling", adc_ch, param, file=sys.stderr)
+            try:
+                if self.kw_def.match(oversampling).match:
+                    oversampling = DEFAULT_ADC_OVERSAMPLING
+                elif self.kw_max.match(param).match:
+                    oversampling = MAX_ADC_OVERSAMPLING
+                elif self.kw_min.match(param).match:
+                    oversampling = MIN_ADC_OVERSAMPLING
+                else:
+                    oversampling = int(float(oversampling))
+
+                if MIN_ADC_OVERSAMPLING <= oversampling <= MAX_ADC_OVERSAMPLING:
+                    self.adc_conf[adc_ch] = AdcConfig(oversampling)
+                else:
+                    self.error_push(E_OUT_OF_RANGE)
+            except ValueError:
+                self.error_push(E_INVALID_PARAMETER)
+        else:
+            self.error_push(E_MISSING_PARAM)
+
+    def cb_adc_statistics(self, param, opt):
+        """
+        - ADC[01234]:MEASure:STATistics? count
+
+        count: 1-10000
+
+        Returns ``mean,min,max,stdev,rms`` of ``count`` decimated samples.
+        Samples are accumulated with Welford's method so that no sample buffer is kept.
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+        adc_ch = int(opt[0])
+        adc = self.adc[adc_ch]
+        conf = self.adc_conf[adc_ch]
+        rstring = re.compile(r"^([1-9][0-9]*)$")
+
+        if query:
+            # print("cb_adc_statistics", adc_ch, "Query", param, file=sys.stderr)
+            searched = rstring.search(param)
+            if searched is not None:
+                count = int(searched.group(1))
+                if count > MAX_ADC_STAT_COUNT:
+                    self.error_push(E_OUT_OF_RANGE)
+                    return
+
+                oversampling = conf.oversampling
+                mean = 0.0
+                m2 = 0.0
+                minimum = MAX_ADC_VALUE
+                maximum = 0
+                for n in range(1, count + 1):
+                    value = self.adc_sample(adc, oversampling)
+                    delta = value - mean
+                    mean += delta / n
+                    m2 += delta * (value - mean)
+                    if value < minimum:
+                        minimum = value
+                    if value > maximum:
+                        maximum = value
+                stdev = sqrt(m2 / (count - 1)) if count > 1 else 0.0
+                rms = sqrt(mean * mean + m2 / count)
+                print(f"{mean:.1f},{minimum:.1f},{maximum:.1f},{stdev:.1f},{rms:.1f}", file=self.stdout)
+            else:
+                self.error_push(E_INVALID_PARAMETER)
+        else:
+            self.error_push(E_SYNTAX)
+
+    def cb_logic_rate(self, param, opt):
+        """
+        - LOGic:CAPTure:RATE[?] num|DEFault|MINimum|MAXimum
+        - DEFault is 1_000_000 [Hz]
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+        conf = self.logic_conf
+
+        if query:
+            rate = self.numeric_query(param, conf.rate, DEFAULT_LOGIC_RATE, MIN_LOGIC_RATE, MAX_LOGIC_RATE)
+            print(f"{rate:_d}", file=self.stdout)
+        elif param is not None:
+            rate = self.numeric_param(param, DEFAULT_LOGIC_RATE, MIN_LOGIC_RATE, MAX_LOGIC_RATE)
+            if rate is not None:
+                self.logic_conf = LogicConfig(rate, conf.depth, conf.pretrigger, conf.trigger, conf.mask, conf.value,
+                                              conf.encoding, conf.timeout)
+        else:
+            self.error_push(E_MISSING_PARAM)
+
+    def cb_logic_depth(self, param, opt):
+        """
+        - LOGic:CAPTure:DEPTh[?] num|DEFault|MINimum|MAXimum
+        - DEFault is 1024 [samples]
+
+        PRETrigger is clipped to DEPTh.
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+        conf = self.logic_conf
+
+        if query:
+            depth = self.numeric_query(param, conf.depth, DEFAULT_LOGIC_DEPTH, MIN_LOGIC_DEPTH, MAX_LOGIC_DEPTH)
+            print(f"{depth:_d}", file=self.stdout)
+        elif param is not None:
+            depth = self.numeric_param(param, DEFAULT_LOGIC_DEPTH, MIN_LOGIC_DEPTH, MAX_LOGIC_DEPTH)
+            if depth is not None:
+                self.logic_conf = LogicConfig(conf.rate, depth, min(conf.pretrigger, depth), conf.trigger,
+                                              conf.mask, conf.value, conf.encoding, conf.timeout)
+        else:
+            self.error_push(E_MISSING_PARAM)
+
+    def cb_logic_pretrigger(self, param, opt):
+        """
+        - LOGic:CAPTure:PRETrigger[?] num|DEFault|MINimum|MAXimum
+        - DEFault is 0 [samples]; MAXimum is DEPTh
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+        conf = self.logic_conf
+
+        if query:
+            pretrigger = self.numeric_query(param, conf.pretrigger, DEFAULT_LOGIC_PRETRIGGER, 0, conf.depth)
+            print(f"{pretrigger:_d}", file=self.stdout)
+        elif param is not None:
+            pretrigger = self.numeric_param(param, DEFAULT_LOGIC_PRETRIGGER, 0, conf.depth)
+            if pretrigger is not None:
+                self.logic_conf = LogicConfig(conf.rate, conf.depth, pretrigger, conf.trigger, conf.mask, conf.value,
+                                              conf.encoding, conf.timeout)
+        else:
+            self.error_push(E_MISSING_PARAM)
+
+    def cb_logic_trigger(self, param, opt):
+        """
+        - LOGic:CAPTure:TRIGger[?] IMMediate|RISE,pin|FALL,pin|PATTern,mask,value
+
+        pin: 14-22
+        mask: 007fc000 or subset of it (bit n stands for GPIOn)
+        value: pattern to wait for, masked by mask
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+        conf = self.logic_conf
+        rstring_edge = re.compile(r"^([a-zA-Z]+),(1[4-9]|2[0-2])$")
+        rstring_pattern = re.compile(r"^([a-zA-Z]+),([0-9a-fA-F]+),([0-9a-fA-F]+)$")
+
+        if query:
+            if conf.trigger == TRIG_RISE or conf.trigger == TRIG_FALL:
+                edge = "RISE" if conf.trigger == TRIG_RISE else "FALL"
+                pin_number = 0
+                while conf.mask >> pin_number > 1:
+                    pin_number += 1
+                print(f"{edge},{pin_number}", file=self.stdout)
+            elif conf.trigger == TRIG_PATTERN:
+                print(f"PATTern,{conf.mask:08x},{conf.value:08x}", file=self.stdout)
+            else:
+                print("IMMediate", file=self.stdout)
+        elif param is not None:
+            trigger = None
+            mask = 0
+            value = 0
+            searched_edge = rstring_edge.search(param)
+            searched_pattern = rstring_pattern.search(param)
+            if self.kw_immediate.match(param).match:
+                trigger = TRIG_IMMEDIATE
+            elif searched_edge is not None:
+                edge, pin_number = searched_edge.groups()
+                mask = 1 << int(pin_number)
+                if self.kw_rise.match(edge).match:
+                    trigger = TRIG_RISE
+                elif self.kw_fall.match(edge).match:
+                    trigger = TRIG_FALL
+            elif searched_pattern is not None:
+                keyword, mask, value = searched_pattern.groups()
+                mask = int(mask, 16)
+                value = int(value, 16)
+                if self.kw_pattern.match(keyword).match:
+                    if (mask | value) & ~LOGIC_MASK or value & ~mask:
+                        self.error_push(E_OUT_OF_RANGE)
+                        return
+                    trigger = TRIG_PATTERN
+
+            if trigger is not None:
+                self.logic_conf = LogicConfig(conf.rate, conf.depth, conf.pretrigger, trigger, mask, value,
+                                              conf.encoding, conf.timeout)
+            else:
+                self.error_push(E_INVALID_PARAMETER)
+        else:
+            self.error_push(E_MISSING_PARAM)
+
+    def cb_logic_encoding(self, param, opt):
+        """
+        - LOGic:CAPTure:ENCoding[?] RAW|RLE|DEFault
+        - DEFault is RAW
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+        conf = self.logic_conf
+
+        if query:
+            print(ENCODING_STRINGS[conf.encoding], file=self.stdout)
+        elif param is not None:
+            if self.kw_raw.match(param).match or self.kw_def.match(param).match:
+                encoding = ENCODING_RAW
+            elif self.kw_rle.match(param).match:
+                encoding = ENCODING_RLE
+            else:
+                self.error_push(E_INVALID_PARAMETER)
+                return
+            self.logic_conf = LogicConfig(conf.rate, conf.depth, conf.pretrigger, conf.trigger, conf.mask, conf.value,
+                                          encoding, conf.timeout)
+        else:
+            self.error_push(E_MISSING_PARAM)
+
+    def cb_logic_timeout(self, param, opt):
+        """
+        - LOGic:CAPTure:TIMeout[?] num|DEFault|MINimum|MAXimum
+        - DEFault is 1000 [ms]
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+        conf = self.logic_conf
+
+        if query:
+            timeout = self.numeric_query(param, conf.timeout, DEFAULT_LOGIC_TIMEOUT, MIN_LOGIC_TIMEOUT,
+                                         MAX_LOGIC_TIMEOUT)
+            print(f"{timeout:_d}", file=self.stdout)
+        elif param is not None:
+            timeout = self.numeric_param(param, DEFAULT_LOGIC_TIMEOUT, MIN_LOGIC_TIMEOUT, MAX_LOGIC_TIMEOUT)
+            if timeout is not None:
+                self.logic_conf = LogicConfig(conf.rate, conf.depth, conf.pretrigger, conf.trigger, conf.mask,
+                                              conf.value, conf.encoding, timeout)
+        else:
+            self.error_push(E_MISSING_PARAM)
+
+    def cb_logic_start(self, param, opt):
+        """
+        - LOGic:CAPTure:START
+
+        Blocks until the acquisition completes or TIMeout elapses. Check result by ``LOGic:CAPTure:STATe?``.
+        A RATE too low for the current MACHine:FREQuency (below about sysclk / 131072) is a data out of range error
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        conf = self.logic_conf
+
+        if query:
+            self.error_push(E_SYNTAX)
+        else:
+            try:
+                self.logic.capture(conf.rate, conf.depth, conf.pretrigger, conf.trigger, conf.mask, conf.value,
+                                   conf.timeout)
+            except ValueError:
+                # PIO clock divider cannot go below the sample rate
+                self.error_push(E_OUT_OF_RANGE)
+
+    def cb_logic_state(self, param, opt):
+        """
+        - LOGic:CAPTure:STATe?
+
+        Returns IDLE|DONE|TIMEOUT
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+
+        if query:
+            print(STATE_STRINGS[self.logic.state], file=self.stdout)
+        else:
+            self.error_push(E_SYNTAX)
+
+    def cb_logic_data(self, param, opt):
+        """
+        - LOGic:CAPTure:DATA?
+
+        Returns definite length block ``#<n><length><payload>``; payload is hex text in ENCoding format
+
+        - RAW: 3 hex digits per sample; bit 0 is GPIO14
+        - RLE: 3 hex digits of sample followed by 4 hex digits of run length, per run
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+
+        if query:
+            print(self.logic.encode(self.logic_conf.encoding), file=self.stdout)
+        else:
+            self.error_push(E_SYNTAX)
+
+    def cb_spi_status(self, param="", opt=None):
+        """
+        - ``SPI?``
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+
+        if query:
+            print(self.spi_status.get(self.spi_conf.items()), file=self.stdout)
+        else:
+            self.error_push(E_MISSING_PARAM)
+
+    @staticmethod
+    def render_spi_status(bus, conf):
+        """
+        :param int bus:
+        :param SpiConfig conf:
+        :return str: ``SPI?`` response fragment
+        """
+        return f"SPI{bus}:CSEL:POLarity {conf.cspol};SPI{bus}:FREQuency {conf.freq:_d};SPI{bus}:MODE {conf.mode};"
+
+    def cb_spi_cs_pol(self, param, opt):
+        """
+        - SPI[01]:CSEL:POLarity[?] 0|1|DEFault
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+        bus_number = int(opt[0])
+        conf = self.spi_conf[bus_number]
+        cspol = param
+
+        if query:
+            # print("cb_spi_cs_pol", "Query", param, file=sys.stderr)
+            cspol = conf.cspol
+            print(cspol, file=self.stdout)
+        elif cspol is not None:
+            # print("cb_spi_cs_pol", param, file=sys.stderr)
+            if cspol in ["0", "1"]:
+                vals = list(conf)
+                vals[conf.index(conf.cspol)] = int(cspol)
+                self.spi_conf[bus_number] = SpiConfig(*vals)
+                self.cb_spi_cs_val("OFF", [bus_number])
+            elif self.kw_def.match(param).match:
+                vals = list(conf)
+                vals[conf.index(conf.cspol)] = DEFAULT_SPI_CSPOL
+                self.spi_conf[bus_number] = SpiConfig(*vals)
+                self.cb_spi_cs_val("OFF", [bus_number])
+            else:
+                self.error_push(E_INVALID_PARAMETER)
+        else:
+            self.error_push(E_MISSING_PARAM)
+
+    def cb_spi_cs_val(self, param, opt):
+        """
+        - SPI[01]:CSEL:VALue[?] 0|1|OFF|ON
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+        bus_number = int(opt[0])
+        conf = self.spi_conf[bus_number]
+        cs_pin = conf.csel
+
+        if query:
+            # print("cb_spi_cs_val", "Query", param, file=sys.stderr)
+            print(IO_VALUE_STRINGS[cs_pin.value()], file=self.stdout)
+        elif param is not None:
+            # print("cb_spi_cs_val", param, file=sys.stderr)
+            if param == str(SPI_CSPOL_HI) or self.kw_on.match(param).match:
+                cs_pin.value(SPI_CSPOL_HI)
+            elif param == str(SPI_CSPOL_LO) or self.kw_off.match(param).match:
+                cs_pin.value(SPI_CSPOL_LO)
+            else:
+                self.error_push(E_INVALID_PARAMETER)
+        else:
+            self.error_push(E_MISSING_PARAM)
+
+    def cb_spi_clock_phase(self, param, opt):
+        """
+        - SPI[01]:MODE[?] 0|1|2|3|DEFault
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+        bus_number = int(opt[0])
+        bus = self.spi[bus_number]
+        conf = self.spi_conf[bus_number]
+        mode = param
+        vals = list(conf)
+
+        if query:
+            # print("cb_spi_clock_phase", "Query", param, file=sys.stderr)
+            print(conf.mode, file=self.stdout)
+        elif mode is not None:
+            # print("cb_spi_clock_phase", param, file=sys.stderr)
+            if self.kw_def.match(param).match:
+                vals[conf.index(conf.mode)] = DEFAULT_SPI_MODE
+                conf = SpiConfig(*vals)
+
+                bus = machine.SPI(bus_number, baudrate=conf.freq, sck=conf.sck, mosi=conf.mosi, miso=conf.miso,
+                                  polarity=DEFAULT_SPI_CKPOL, phase=DEFAULT_SPI_CKPH)
+            elif mode in ["0", "1", "2", "3"]:
+                mode = int(mode)
+                ckpol = SPI_CKPOL_HI if mode & SPI_MASK_CKPOL else SPI_CKPOL_LO
+                ckph = SPI_CKPH_HI if mode & SPI_MASK_CKPH else SPI_CKPH_LO
+
+                vals[conf.index(conf.mode)] = int(mode)
+                conf = SpiConfig(*vals)
+
+                bus = machine.SPI(bus_number, baudrate=conf.freq, sck=conf.sck, mosi=conf.mosi, miso=conf.miso,
+                                  polarity=ckpol, phase=ckph)
+            else:
+                self.error_push(E_INVALID_PARAMETER)
+
+            self.spi_conf[bus_number] = conf
+            self.spi[bus_number] = bus
+        else:
+            self.error_push(E_MISSING_PARAM)
+
+    def cb_spi_freq(self, param, opt):
+        """
+        - SPI[01]:FREQuency[?] num|DEFault|MINimum|MAXimum
+        - DEFault is 1_000_000 [Hz]
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+        bus_number = int(opt[0])
+        bus_freq = param
+        conf = self.spi_conf[bus_number]
+        vals = list(conf)
+
+        if query:
+            # print("cb_spi_freq", bus_number, "Query", param, file=sys.stderr)
+            if self.kw_def.match(param).match:
+                bus_freq = DEFAULT_SPI_CLOCK
+            elif self.kw_max.match(param).match:
+                bus_freq = MAX_SPI_CLOCK
+            elif self.kw_min.match(param).match:
+                bus_freq = MIN_SPI_CLOCK
+            else:
+                bus_freq = conf.freq
+            print(f"{bus_freq:_d}", file=self.stdout)
+        elif bus_freq is not None:
+            # print("cb_spi_freq", bus_number, param, file=sys.stderr)
+            try:
+                if self.kw_def.match(bus_freq).match:
+                    bus_freq = DEFAULT_SPI_CLOCK
+                elif self.kw_max.match(param).match:
+                    bus_freq = MAX_SPI_CLOCK
+                elif self.kw_min.match(param).match:
+                    bus_freq = MIN_SPI_CLOCK
+                else:
+                    bus_freq = int(float(bus_freq))
+
+                if MIN_SPI_CLOCK <= bus_freq <= MAX_SPI_CLOCK:
+                    ckpol = SPI_CKPOL_HI if conf.mode & SPI_MASK_CKPOL else SPI_CKPOL_LO
+                    ckph = SPI_CKPH_HI if conf.mode & SPI_MASK_CKPH else SPI_CKPH_LO
+
+                    bus = machine.SPI(bus_number, baudrate=bus_freq, sck=conf.sck, mosi=conf.mosi, miso=conf.miso,
+                                      polarity=ckpol, phase=ckph)
+                    self.spi[bus_number] = bus
+
+                    vals[conf.index(conf.freq)] = bus_freq
+                    self.spi_conf[bus_number] = SpiConfig(*vals)
+                else:
+                    self.error_push(E_OUT_OF_RANGE)
+            except ValueError:
+                self.error_push(E_INVALID_PARAMETER)
+        else:
+            self.error_push(E_MISSING_PARAM)
+
+    def cb_spi_tx(self, param, opt):
+        """
+        - ``SPI[01]:TRANSfer data,pre_cs,post_cs``
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+        bus_number = int(opt[0])
+        bus = self.spi[bus_number]
+
+        rstring = re.compile(r"^(([0-9a-fA-F][0-9a-fA-F])+),([oO][nN]|[oO][fF][fF]|[01]),([oO][nN]|[oO][fF][fF]|[01])$")
+
+        if query:
+            # print("cb_spi_tx", bus_number, "Query", param, file=sys.stderr)
+            self.error_push(E_SYNTAX)
+        elif param is not None:
+            # print("cb_spi_tx", bus_number, param, file=sys.stderr)
+            searched = rstring.search(param)
+            if searched is not None:
+                data, _, pre_cs, post_cs = searched.groups()
+                # print(f"0x{data}", file=sys.stderr)
+                data_array = hex_decode(data)
+                read_data_array = bytearray(len(data_array))
+                # print([hex(c) for c in data_array], file=sys.stderr)
+                try:
+                    self.cb_spi_cs_val(pre_cs, [bus_number, ""])
+                    bus.write_readinto(data_array, read_data_array)
+                    self.cb_spi_cs_val(post_cs, [bus_number, ""])
+                    data = hex_encode(read_data_array, ",")
+                    print(data, file=self.stdout)
+                except OSError:
+                    self.error_push(E_SPI_FAIL)
+                    print(BUS_FAIL_CODE, file=self.stdout)
+            else:
+                self.error_push(E_INVALID_PARAMETER)
+        else:
+            self.error_push(E_MISSING_PARAM)
+
+    def cb_spi_write(self, param, opt):
+        """
+        - ``SPI[01]:WRITE data,pre_cs,post_cs``
+
+        :param param:
+        :param opt:
+        :return:
+        """
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+        bus_number = int(opt[0])
+        bus = self.spi[bus_number]
+        rstring = re.compile(r"^(([0-9a-fA-F][0-9a-fA-F])+),([oO][nN]|[oO][fF][fF]|[01]),([oO][nN]|[oO][fF][fF]|[01])$")
+
+        if query:
+            # print("cb_spi_write", bus_number, "Query", param, file=sys.stderr)
+            self.error_push(E_SYNTAX)
+        elif param is not None:
+            # print("cb_spi_write", bus_number, param, file=sys.stderr)
+            searched = rstring.search(param)
+            if searched is not None:
+                data, _, pre_cs, post_cs = searched.groups()
+                # print(f"0x{data}", file=sys.stderr)
+                data_array = hex_decode(data)
+                # print([hex(c) for c in data_array], file=sys.stderr)
+                try:
+                    self.cb_spi_cs_val(pre_cs, [bus_number, ""])
+                    bus.write(data_array)
+                    self.cb_spi_cs_val(post_cs, [bus_number, ""])
+                except OSError:
+                    self.error_push(E_SPI_FAIL)
+            else:
+                self.error_push(E_INVALID_PARAMETER)
+        else:
+            self.error_push(E_MISSING_PARAM)
+
+    def cb_spi_read(self, param, opt):
+        """
+        - ``SPI[01]:READ? length,mask,pre_cs,post_cs``
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+        bus_number = int(opt[0])
+        bus = self.spi[bus_number]
+        rstring = re.compile(
+            r"^([1-9]|[1-9][0-9]+),([0-9a-fA-F][0-9a-fA-F]),([oO][nN]|[oO][fF][fF]|[01]),([oO][nN]|[oO][fF][fF]|[01])$")
+
+        if query:
+            # print("cb_spi_read", bus_number, "Query", param, file=sys.stderr)
+            searched = rstring.search(param)
+
+            if searched is not None:
+                length, mask, pre_cs, post_cs = searched.groups()
+                # print(length, mask, file=sys.stderr)
+                try:
+                    length = int(length)
+                    data_array = bytearray(length)
+                    buffer = memoryview(data_array)
+                    mask = int(f"0x{mask}", 16)
+                    self.cb_spi_cs_val(pre_cs, [bus_number, ""])
+                    for start in range(0, length, SPI_READ_CHUNK):
+                        if self.aborted():
+                            self.cb_spi_cs_val(post_cs, [bus_number, ""])
+                            return
+                        bus.readinto(buffer[start:start + SPI_READ_CHUNK], mask)
+                    self.cb_spi_cs_val(post_cs, [bus_number, ""])
+                    data = hex_encode(data_array, ",")
+                    print(data, file=self.stdout)
+                    return
+                except OSError:
+                    self.error_push(E_SPI_FAIL)
+                except ValueError:
+                    self.error_push(E_INVALID_PARAMETER)
+            else:
+                self.error_push(E_INVALID_PARAMETER)
+        elif param is not None:
+            self.error_push(E_SYNTAX)
+        else:
+            self.error_push(E_MISSING_PARAM)
+
+    def cb_uart_status(self, param="", opt=None):
+        """
+        - ``UART?``
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+
+        if query:
+            print(self.uart_status.get(self.uart_conf.items()), file=self.stdout)
+        else:
+            self.error_push(E_SYNTAX)
+
+    @staticmethod
+    def render_uart_status(bus, conf):
+        """
+        :param int bus:
+        :param UartConfig conf:
+        :return str: ``UART?`` response fragment
+        """
+        return (f"UART{bus}:BAUDrate {conf.baudrate:_d};UART{bus}:WIDTH {conf.bits};"
+                f"UART{bus}:PARITY {UART_PARITY_STRINGS[conf.parity]};UART{bus}:SBITs {conf.stop};")
+
+    def uart_update(self, bus_number, conf):
+        """ Stores UART setting and applies it to an open port
+
+        :param int bus_number:
+        :param UartConfig conf:
+        """
+        self.uart_conf[bus_number] = conf
+        self.uarts[bus_number].configure(conf.baudrate, conf.bits, conf.parity, conf.stop)
+
+    def cb_uart_baud(self, param, opt):
+        """
+        - UART[01]:BAUDrate[?] num|DEFault|MINimum|MAXimum
+        - DEFault is 115_200
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+        bus_number = int(opt[0])
+        conf = self.uart_conf[bus_number]
+
+        if query:
+            # print("cb_uart_baud", bus_number, "Query", param, file=sys.stderr)
+            baudrate = self.numeric_query(param, conf.baudrate, DEFAULT_UART_BAUD, MIN_UART_BAUD, MAX_UART_BAUD)
+            print(f"{baudrate:_d}", file=self.stdout)
+        elif param is not None:
+            # print("cb_uart_baud", bus_number, param, file=sys.stderr)
+            baudrate = self.numeric_param(param, DEFAULT_UART_BAUD, MIN_UART_BAUD, MAX_UART_BAUD)
+            if baudrate is not None:
+                vals = list(conf)
+                vals[0] = baudrate
+                self.uart_update(bus_number, UartConfig(*vals))
+        else:
+            self.error_push(E_MISSING_PARAM)
+
+    def cb_uart_width(self, param, opt):
+        """
+        - UART[01]:WIDTH[?] 5|6|7|8|DEFault
+        - DEFault is 8
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+        bus_number = int(opt[0])
+        conf = self.uart_conf[bus_number]
+
+        if query:
+            # print("cb_uart_width", bus_number, "Query", param, file=sys.stderr)
+            bits = self.numeric_query(param, conf.bits, DEFAULT_UART_BITS, MIN_UART_BITS, MAX_UART_BITS)
+            print(f"{bits}", file=self.stdout)
+        elif param is not None:
+            # print("cb_uart_width", bus_number, param, file=sys.stderr)
+            bits = self.numeric_param(param, DEFAULT_UART_BITS, MIN_UART_BITS, MAX_UART_BITS)
+            if bits is not None:
+                vals = list(conf)
+                vals[1] = bits
+                self.uart_update(bus_number, UartConfig(*vals))
+        else:
+            self.error_push(E_MISSING_PARAM)
+
+    def cb_uart_parity(self, param, opt):
+        """
+        - UART[01]:PARITY[?] NONE|EVEN|ODD|DEFault
+        - DEFault is NONE
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+        bus_number = int(opt[0])
+        conf = self.uart_conf[bus_number]
+
+        if query:
+            # print("cb_uart_parity", bus_number, "Query", param, file=sys.stderr)
+            parity = None if self.kw_def.match(param).match else conf.parity
+            print(UART_PARITY_STRINGS[parity], file=self.stdout)
+        elif param is not None:
+            # print("cb_uart_parity", bus_number, param, file=sys.stderr)
+            if self.kw_none.match(param).match or self.kw_def.match(param).match:
+                parity = None
+            elif self.kw_even.match(param).match:
+                parity = 0
+            elif self.kw_odd.match(param).match:
+                parity = 1
+            else:
+                self.error_push(E_INVALID_PARAMETER)
+                return
+            vals = list(conf)
+            vals[2] = parity
+            self.uart_update(bus_number, UartConfig(*vals))
+        else:
+            self.error_push(E_MISSING_PARAM)
+
+    def cb_uart_sbits(self, param, opt):
+        """
+        - UART[01]:SBITs[?] 1|2|DEFault
+        - DEFault is 1
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+        bus_number = int(opt[0])
+        conf = self.uart_conf[bus_number]
+
+        if query:
+            # print("cb_uart_sbits", bus_number, "Query", param, file=sys.stderr)
+            stop = self.numeric_query(param, conf.stop, DEFAULT_UART_STOP, MIN_UART_STOP, MAX_UART_STOP)
+            print(f"{stop}", file=self.stdout)
+        elif param is not None:
+            # print("cb_uart_sbits", bus_number, param, file=sys.stderr)
+            stop = self.numeric_param(param, DEFAULT_UART_STOP, MIN_UART_STOP, MAX_UART_STOP)
+            if stop is not None:
+                vals = list(conf)
+                vals[3] = stop
+                self.uart_update(bus_number, UartConfig(*vals))
+        else:
+            self.error_push(E_MISSING_PARAM)
+
+    def cb_uart_start(self, param, opt):
+        """
+        - UART[01]:START
+
+        Opens the port; UART0 takes GPIO16 (TX) and GPIO17 (RX), UART1 takes GPIO20 (TX) and GPIO21 (RX).
+        UART0 is not available on the USBTMC build, which keeps its REPL on it. Not allowed while a pattern plays.
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        bus_number = int(opt[0])
+        conf = self.uart_conf[bus_number]
+
+        if query:
+            self.error_push(E_SYNTAX)
+        elif bus_number == self.repl_uart or self.pattern.running():
+            self.error_push(E_SETTINGS_CONFLICT)
+        else:
+            # print("cb_uart_start", bus_number, param, file=sys.stderr)
+            uart = self.uarts[bus_number]
+            if not uart.running():
+                for pin_number in UART_PINS[bus_number]:
+                    self.pwmv[pin_number] = 0
+                uart.start(conf.baudrate, conf.bits, conf.parity, conf.stop)
+
+    def cb_uart_stop(self, param, opt):
+        """
+        - UART[01]:STOP
+
+        Closes the port and gives its pins back as configured by PIN commands
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        bus_number = int(opt[0])
+
+        if query:
+            self.error_push(E_SYNTAX)
+        elif self.uarts[bus_number].stop():
+            # print("cb_uart_stop", bus_number, param, file=sys.stderr)
+            self.restore_pins(UART_PINS[bus_number][0], 2)
+
+    def cb_uart_state(self, param, opt):
+        """
+        - UART[01]:STATe?
+
+        Returns RUN|IDLE
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        bus_number = int(opt[0])
+
+        if query:
+            print("RUN" if self.uarts[bus_number].running() else "IDLE", file=self.stdout)
+        else:
+            self.error_push(E_SYNTAX)
+
+    def cb_uart_write(self, param, opt):
+        """
+        - UART[01]:WRITE data
+
+        data: hex bytes i.e. 48656c6c6f0d0a
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+        bus_number = int(opt[0])
+        uart = self.uarts[bus_number]
+        rstring = re.compile(r"^(([0-9a-fA-F][0-9a-fA-F])+)$")
+
+        if query:
+            # print("cb_uart_write", bus_number, "Query", param, file=sys.stderr)
+            self.error_push(E_SYNTAX)
+        elif param is not None:
+            # print("cb_uart_write", bus_number, param, file=sys.stderr)
+            searched = rstring.search(param)
+            if searched is None:
+                self.error_push(E_INVALID_PARAMETER)
+            elif not uart.running():
+                self.error_push(E_SETTINGS_CONFLICT)
+            else:
+                data = searched.group(1)
+                uart.write(hex_decode(data))
+        else:
+            self.error_push(E_MISSING_PARAM)
+
+    def cb_uart_read(self, param, opt):
+        """
+        - UART[01]:READ?
+
+        Returns every received byte as definite length block ``#<n><length><payload>``;
+        payload is 2 hex digits per byte
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        bus_number = int(opt[0])
+
+        if query:
+            # print("cb_uart_read", bus_number, "Query", param, file=sys.stderr)
+            data = self.uarts[bus_number].read()
+            print(definite_length_block(hex_encode(data)), file=self.stdout)
+        else:
+            self.error_push(E_SYNTAX)
+
+    def cb_uart_count(self, param, opt):
+        """
+        - UART[01]:COUNt?
+
+        Returns ``pending,lost`` byte counts
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        bus_number = int(opt[0])
+
+        if query:
+            uart = self.uarts[bus_number]
+            print(f"{uart.pending()},{uart.lost}", file=self.stdout)
+        else:
+            self.error_push(E_SYNTAX)
+
+    def cb_watch_interval(self, param, opt):
+        """
+        - WATCh:INTerval[?] num|DEFault|MINimum|MAXimum
+        - DEFault is 10 [ms]
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+        conf = self.watch_conf
+
+        if query:
+            interval = self.numeric_query(param, conf.interval, DEFAULT_WATCH_INTERVAL, MIN_WATCH_INTERVAL,
+                                          MAX_WATCH_INTERVAL)
+            print(f"{interval:_d}", file=self.stdout)
+        elif param is not None:
+            interval = self.numeric_param(param, DEFAULT_WATCH_INTERVAL, MIN_WATCH_INTERVAL, MAX_WATCH_INTERVAL)
+            if interval is not None:
+                self.watch_conf = WatchConfig(interval, conf.timeout)
+        else:
+            self.error_push(E_MISSING_PARAM)
+
+    def cb_watch_timeout(self, param, opt):
+        """
+        - WATCh:TIMeout[?] num|DEFault|MINimum|MAXimum
+        - DEFault is 1000 [ms]
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+        conf = self.watch_conf
+
+        if query:
+            timeout = self.numeric_query(param, conf.timeout, DEFAULT_WATCH_TIMEOUT, MIN_WATCH_TIMEOUT,
+                                         MAX_WATCH_TIMEOUT)
+            print(f"{timeout:_d}", file=self.stdout)
+        elif param is not None:
+            timeout = self.numeric_param(param, DEFAULT_WATCH_TIMEOUT, MIN_WATCH_TIMEOUT, MAX_WATCH_TIMEOUT)
+            if timeout is not None:
+                self.watch_conf = WatchConfig(conf.interval, timeout)
+        else:
+            self.error_push(E_MISSING_PARAM)
+
+    def watch(self, read, mask, target):
+        """ Calls ``read`` every INTerval until ``(value & mask) == target``, TIMeout elapses or it is cancelled
+
+        :param read: function returning current value; may raise OSError
+        :param int mask:
+        :param int target:
+        :return tuple: (hit, elapsed ms, last value)
+        """
+        conf = self.watch_conf
+        start = time.ticks_ms()
+        while True:
+            value = read()
+            elapsed = time.ticks_diff(time.ticks_ms(), start)
+            if (value & mask) == target:
+                return True, elapsed, value
+            if elapsed >= conf.timeout or self.aborted():
+                return False, elapsed, value
+            time.sleep_ms(conf.interval)
+
+    def cb_watch_pin(self, param, opt):
+        """
+        - WATCh:PIN[nn]:VALue? 0|1|OFF|ON
+
+        Blocks until the pin reads the value or TIMeout elapses. Returns ``hit,elapsed,value``;
+        hit is 1 if the value was seen, elapsed is in ms. Needs SYSTem:DUALcore ON, where it runs on core 1
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+        pin_number = int(opt[1])
+        pin = self.pins[pin_number]
+
+        if query and not self.worker.running:
+            self.error_push(E_SETTINGS_CONFLICT)  # would block the command loop and USB for up to TIMeout
+            print("0,0,", file=self.stdout)
+        elif query and param is not None:
+            # print("cb_watch_pin", pin_number, "Query", param, file=sys.stderr)
+            if param == str(IO_ON) or self.kw_on.match(param).match:
+                target = IO_ON
+            elif param == str(IO_OFF) or self.kw_off.match(param).match:
+                target = IO_OFF
+            else:
+                self.error_push(E_INVALID_PARAMETER)
+                return
+            hit, elapsed, value = self.watch(pin.value, 1, target)
+            print(f"{int(hit)},{elapsed:_d},{IO_VALUE_STRINGS[value]}", file=self.stdout)
+        elif query:
+            self.error_push(E_MISSING_PARAM)
+        else:
+            self.error_push(E_SYNTAX)
+
+    def cb_watch_i2c(self, param, opt):
+        """
+        - WATCh:I2C[01]:READ? address,memaddress,mask,target,addrsize
+
+        addr: 01-FF
+        memaddr: 00-FF | 0000-FFFF
+        mask: 1-4 bytes i.e. 80 or 0300
+        target: same length as mask
+        addrsize: 1|2
+
+        Blocks until ``(register & mask) == target`` or TIMeout elapses. Returns ``hit,elapsed,value``;
+        hit is 1 if the target was seen, elapsed is in ms, value is the last register read in hex.
+        Needs SYSTem:DUALcore ON, where it runs on core 1
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+        bus_number = int(opt[1])
+        bus: machine.I2C = self.i2c[bus_number]
+        conf: I2cConfig = self.i2c_conf[bus_number]
+        shift = conf.bit
+        rstring = re.compile(
+            r"^([1-9a-fA-F][0-9a-fA-F]),(([0-9a-fA-F][0-9a-fA-F])(|[0-9a-fA-F][0-9a-fA-F])),"
+            r"(([0-9a-fA-F][0-9a-fA-F])+),(([0-9a-fA-F][0-9a-fA-F])+),([12])$")
+
+        if query and not self.worker.running:
+            self.error_push(E_SETTINGS_CONFLICT)  # would block the command loop and USB for up to TIMeout
+            print(BUS_FAIL_CODE, file=self.stdout)
+        elif query:
+            # print("cb_watch_i2c", bus_number, "Query", param, file=sys.stderr)
+            if param is not None:
+                searched = rstring.search(param)
+                if searched is not None:
+                    address, memaddress, _, _, mask, _, target, _, addrsize = searched.groups()
+                    length = len(mask) // 2
+                    if len(target) != len(mask) or length > 4:
+                        self.error_push(E_INVALID_PARAMETER)
+                        print(BUS_FAIL_CODE, file=self.stdout)
+                        return
+                    address = int(f"0x{address}", 16) >> shift
+                    memaddress = int(f"0x{memaddress}", 16)
+                    addrsize = 8 * int(addrsize)
+                    buf = bytearray(length)
+
+                    def read():
+                        bus.readfrom_mem_into(address, memaddress, buf, addrsize=addrsize)
+                        return int.from_bytes(buf, "big")
+
+                    try:
+                        hit, elapsed, value = self.watch(read, int(f"0x{mask}", 16), int(f"0x{target}", 16))
+                        print(f"{int(hit)},{elapsed:_d},{value:0{2 * length}x}", file=self.stdout)
+                        return
+                    except OSError:
+                        self.error_push(E_I2C_FAIL)
+                else:
+                    self.error_push(E_INVALID_PARAMETER)
+            else:
+                self.error_push(E_MISSING_PARAM)
+        else:
+            self.error_push(E_SYNTAX)
+        print(BUS_FAIL_CODE, file=self.stdout)
+
+    def cb_watch_spi(self, param, opt):
+        """
+        - WATCh:SPI[01]:READ? command,mask,target,pre_cs,post_cs
+
+        command: hex bytes written before each read i.e. 05
+        mask: 1-4 bytes i.e. 01
+        target: same length as mask
+
+        Blocks until ``(register & mask) == target`` or TIMeout elapses. Returns ``hit,elapsed,value``;
+        hit is 1 if the target was seen, elapsed is in ms, value is the last register read in hex.
+        Needs SYSTem:DUALcore ON, where it runs on core 1
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+        bus_number = int(opt[1])
+        bus = self.spi[bus_number]
+        rstring = re.compile(
+            r"^(([0-9a-fA-F][0-9a-fA-F])+),(([0-9a-fA-F][0-9a-fA-F])+),(([0-9a-fA-F][0-9a-fA-F])+),"
+            r"([oO][nN]|[oO][fF][fF]|[01]),([oO][nN]|[oO][fF][fF]|[01])$")
+
+        if query and not self.worker.running:
+            self.error_push(E_SETTINGS_CONFLICT)  # would block the command loop and USB for up to TIMeout
+            print(BUS_FAIL_CODE, file=self.stdout)
+        elif query:
+            # print("cb_watch_spi", bus_number, "Query", param, file=sys.stderr)
+            if param is not None:
+                searched = rstring.search(param)
+                if searched is not None:
+                    command, _, mask, _, target, _, pre_cs, post_cs = searched.groups()
+                    length = len(mask) // 2
+                    if len(target) != len(mask) or length > 4:
+                        self.error_push(E_INVALID_PARAMETER)
+                        print(BUS_FAIL_CODE, file=self.stdout)
+                        return
+                    command = hex_decode(command)
+                    buf = bytearray(length)
+                    cs_opt = [bus_number, ""]
+
+                    def read():
+                        self.cb_spi_cs_val(pre_cs, cs_opt)
+                        bus.write(command)
+                        bus.readinto(buf)
+                        self.cb_spi_cs_val(post_cs, cs_opt)
+                        return int.from_bytes(buf, "big")
+
+                    try:
+                        hit, elapsed, value = self.watch(read, int(f"0x{mask}", 16), int(f"0x{target}", 16))
+                        print(f"{int(hit)},{elapsed:_d},{value:0{2 * length}x}", file=self.stdout)
+                        return
+                    except OSError:
+                        self.error_push(E_SPI_FAIL)
+                else:
+                    self.error_push(E_INVALID_PARAMETER)
+            else:
+                self.error_push(E_MISSING_PARAM)
+        else:
+            self.error_push(E_SYNTAX)
+        print(BUS_FAIL_CODE, file=self.stdout)
+
+    def restore_pins(self, first, count):
+        """ Gives pins back to SIO as configured in ``pin_conf`` after PIO used them
+
+        :param int first: first pin number
+        :param int count: number of pins
+        """
+        for pin_number in range(first, first + count):
+            conf = self.pin_conf[pin_number]
+            pin = self.pins[pin_number]
+            if conf.mode == machine.Pin.ALT:
+                pin.init(conf.mode, alt=machine.Pin.ALT_PWM, pull=conf.pull)
+            elif conf.mode == machine.Pin.IN:
+                pin.init(conf.mode, pull=conf.pull)
+            else:
+                pin.init(conf.mode, value=conf.value, pull=conf.pull)
+
+    def pattern_load(self, param, append=False):
+        """ Parses hex sample list ``param`` and loads it into the pattern generator
+
+        :param str param: sample,sample,...
+        :param bool append:
+        """
+        try:
+            samples = [int(d, 16) for d in param.split(",")]
+        except ValueError:
+            self.error_push(E_INVALID_PARAMETER)
+            return
+        if any(d > PATTERN_MASK or d < 0 for d in samples):
+            self.error_push(E_OUT_OF_RANGE)
+            return
+        if (len(self.pattern.samples) if append else 0) + len(samples) > MAX_PATTERN_SAMPLES:
+            self.error_push(E_DATA_OVERFLOW)
+            return
+        if self.pattern.load(samples, append):
+            self.pattern_release()
+
+    def pattern_release(self):
+        """ Gives pattern pins back as configured by PIN commands, except those a UART owns
+        """
+        for pin_number in range(PATTERN_BASE_PIN, PATTERN_BASE_PIN + PATTERN_PINS):
+            if not self.uart_owns(pin_number):
+                self.restore_pins(pin_number, 1)
+
+    def cb_pattern_data(self, param, opt):
+        """
+        - PATTern:DATA[?] sample,sample,...
+
+        sample: 000-1ff; bit 0 drives GPIO14, up to 8192 samples
+
+        Loading data stops playback.
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+
+        if query:
+            print(",".join(f"{d:03x}" for d in self.pattern.samples), file=self.stdout)
+        elif param is not None and len(param) > 0:
+            self.pattern_load(param)
+        else:
+            self.error_push(E_MISSING_PARAM)
+
+    def cb_pattern_append(self, param, opt):
+        """
+        - PATTern:APPend sample,sample,...
+
+        Appends samples to the pattern buffer so that long patterns can be uploaded in several commands.
+        Loading data stops playback.
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+
+        if query:
             self.error_push(E_SYNTAX)
+        elif param is not None and len(param) > 0:
+            self.pattern_load(param, append=True)
+        else:
+            self.error_push(E_MISSING_PARAM)
+
+    def cb_pattern_rate(self, param, opt):
+        """
+        - PATTern:RATE[?] num|DEFault|MINimum|MAXimum
+        - DEFault is 1_000_000 [Hz]
+
+        Takes effect on next PATTern:START
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+        conf = self.pattern_conf
+
+        if query:
+            rate = self.numeric_query(param, conf.rate, DEFAULT_PATTERN_RATE, MIN_PATTERN_RATE, MAX_PATTERN_RATE)
+            print(f"{rate:_d}", file=self.stdout)
         elif param is not None:
-            # print("cb_i2c_write_memory", param, file=sys.stderr)
+            rate = self.numeric_param(param, DEFAULT_PATTERN_RATE, MIN_PATTERN_RATE, MAX_PATTERN_RATE)
+            if rate is not None:
+                self.pattern_conf = PatternConfig(rate, conf.repeat)
+        else:
+            self.error_push(E_MISSING_PARAM)
 
-            searched = rstring.search(param)
+    def cb_pattern_repeat(self, param, opt):
+        """
+        - PATTern:REPeat[?] num|CONTinuous|DEFault|MINimum|MAXimum
+        - DEFault is 1 (one-shot)
 
-            if searched is not None:
-                address, memaddress, _, data, addrsize = searched.groups()
-                # print(address, memaddress, data, addrsize, file=sys.stderr)
+        Takes effect on next PATTern:START
 
-                address = int(f"0x{address}", 16) >> shift
-                memaddress = int(f"0x{memaddress}", 16)
-                data_array = int(f"0x{data}", 16).to_bytes(ceil(len(data) / 2), "big")
-                addrsize = 8 * int(addrsize)
-                # print(f"0x{address:02x}", f"0x{memaddress:02x}", [f"0x{c:02x}" for c in data_array], addrsize, file=sys.stderr)
-                try:
-                    bus.writeto_mem(address, memaddress, data_array, addrsize=addrsize)
-                except OSError:
-                    self.error_push(E_I2C_FAIL)
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+        conf = self.pattern_conf
+
+        if query:
+            repeat = self.numeric_query(param, conf.repeat, DEFAULT_PATTERN_REPEAT, MIN_PATTERN_REPEAT,
+                                        MAX_PATTERN_REPEAT)
+            if repeat == REPEAT_CONTINUOUS:
+                print("CONTinuous", file=self.stdout)
             else:
-                self.error_push(E_INVALID_PARAMETER)
+                print(f"{repeat:_d}", file=self.stdout)
+        elif param is not None:
+            if self.kw_continuous.match(param).match:
+                repeat = REPEAT_CONTINUOUS
+            else:
+                repeat = self.numeric_param(param, DEFAULT_PATTERN_REPEAT, MIN_PATTERN_REPEAT, MAX_PATTERN_REPEAT)
+            if repeat is not None:
+                self.pattern_conf = PatternConfig(conf.rate, repeat)
         else:
             self.error_push(E_MISSING_PARAM)
 
-    def cb_i2c_read_memory(self, param, opt):
+    def cb_pattern_start(self, param, opt):
         """
-        - I2C[01]:MEMory:READ? address,memaddress,nbytes,addrsize
+        - PATTern:START
 
-        addr: 01-FF
-        memaddr: 00-FF | 0000-FFFF
-        nbytes: 1-99
-        addrsize: 1|2
+        Plays the pattern buffer on GPIO14-22; returns immediately.
+        Not allowed while a UART or a PWM output uses one of these pins.
+        A RATE too low for the current MACHine:FREQuency (below about sysclk / 131072) is a data out of range error
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        conf = self.pattern_conf
+
+        if query:
+            self.error_push(E_SYNTAX)
+        elif any(self.uart_owns(pin_number) or self.pwmv[pin_number] or
+                 self.pin_conf[pin_number].mode == machine.Pin.ALT
+                 for pin_number in range(PATTERN_BASE_PIN, PATTERN_BASE_PIN + PATTERN_PINS)):
+            self.error_push(E_SETTINGS_CONFLICT)
+        else:
+            try:
+                if not self.pattern.start(conf.rate, conf.repeat):
+                    self.error_push(E_MISSING_PARAM)
+            except ValueError:
+                # PIO clock divider cannot go below the sample rate; a previous playback was stopped already
+                self.error_push(E_OUT_OF_RANGE)
+                self.pattern_release()
+
+    def cb_pattern_stop(self, param, opt):
+        """
+        - PATTern:STOP
+
+        Stops playback and gives GPIO14-22 back as configured by PIN commands, except pins of a running UART
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+
+        if query:
+            self.error_push(E_SYNTAX)
+        else:
+            if self.pattern.stop():
+                self.pattern_release()
+
+    def cb_pattern_state(self, param, opt):
+        """
+        - PATTern:STATe?
+
+        Returns RUN|IDLE
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+
+        if query:
+            print("RUN" if self.pattern.running() else "IDLE", file=self.stdout)
+        else:
+            self.error_push(E_SYNTAX)
+
+    def cb_sequence_record(self, param, opt):
+        """
+        - SEQuence:RECord
+
+        Clears the sequence and records following commands into it, until SEQuence:END.
+        SEQuence and SYSTem:DUALcore commands are not recorded
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+
+        if query:
+            self.error_push(E_SYNTAX)
+        elif self.sequencer.running:
+            self.error_push(E_SETTINGS_CONFLICT)
+        else:
+            self.sequencer.clear()
+            self.sequencer.recording = True
+
+    def cb_sequence_wait(self, param, opt):
+        """
+        - SEQuence:WAIT num|DEFault|MINimum|MAXimum
+        - DEFault is 1000 [us]
+
+        Delays next recorded step by ``num`` us
 
         :param param:
         :param opt:
@@ -1380,44 +4782,202 @@ class RaspberryScpiPico(MicroScpiDevice):
 
         query = (opt[-1] == "?")
         param = param.replace(" ", "")
-        bus_number = int(opt[0])
-        bus: machine.I2C = self.i2c[bus_number]
-        conf: I2cConfig = self.i2c_conf[bus_number]
-        shift = conf.bit
-        rstring = re.compile(
-            r"^([1-9a-fA-F][0-9a-fA-F]),(([0-9a-fA-F][0-9a-fA-F])(|[0-9a-fA-F][0-9a-fA-F])),([1-9]|[1-9][0-9]),([12])$")
 
         if query:
-            # print("cb_i2c_read_memory", "Query", param, file=sys.stderr)
+            self.error_push(E_SYNTAX)
+        elif param is not None:
+            if not self.sequencer.recording:
+                self.error_push(E_SETTINGS_CONFLICT)
+                return
+            delay = self.numeric_param(param, DEFAULT_SEQUENCE_DELAY, MIN_SEQUENCE_DELAY, MAX_SEQUENCE_DELAY)
+            if delay is not None:
+                self.sequencer.wait(delay)
+        else:
+            self.error_push(E_MISSING_PARAM)
 
-            if param is not None:
-                searched = rstring.search(param)
-                if searched is not None:
-                    address, memaddress, _, length, addrsize = searched.groups()
-                    address = int(f"0x{address}", 16) >> shift
-                    memaddress = int(f"0x{memaddress}", 16)
-                    length = int(length)
-                    addrsize = 8 * int(addrsize)
+    def cb_sequence_end(self, param, opt):
+        """
+        - SEQuence:END
 
-                    try:
-                        read = bus.readfrom_mem(address, memaddress, length, addrsize=addrsize)
-                        data = ",".join(f"{d:02x}" for d in read)
-                        print(data, file=self.stdout)
-                        return
-                    except OSError:
-                        self.error_push(E_I2C_FAIL)
-                        print(BUS_FAIL_CODE, file=self.stdout)
-                else:
-                    self.error_push(E_INVALID_PARAMETER)
+        Ends recording
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+
+        if query:
+            self.error_push(E_SYNTAX)
+        else:
+            self.sequencer.recording = False
+
+    def cb_sequence_repeat(self, param, opt):
+        """
+        - SEQuence:REPeat[?] num|CONTinuous|DEFault|MINimum|MAXimum
+        - DEFault is 1 (one-shot)
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+        conf = self.sequence_conf
+
+        if query:
+            repeat = self.numeric_query(param, conf.repeat, DEFAULT_SEQUENCE_REPEAT, MIN_SEQUENCE_REPEAT,
+                                        MAX_SEQUENCE_REPEAT)
+            if repeat == REPEAT_CONTINUOUS:
+                print("CONTinuous", file=self.stdout)
             else:
-                self.error_push(E_MISSING_PARAM)
+                print(f"{repeat:_d}", file=self.stdout)
+        elif param is not None:
+            if self.kw_continuous.match(param).match:
+                repeat = REPEAT_CONTINUOUS
+            else:
+                repeat = self.numeric_param(param, DEFAULT_SEQUENCE_REPEAT, MIN_SEQUENCE_REPEAT,
+                                            MAX_SEQUENCE_REPEAT)
+            if repeat is not None:
+                self.sequence_conf = SequenceConfig(repeat)
         else:
+            self.error_push(E_MISSING_PARAM)
+
+    def cb_sequence_start(self, param, opt):
+        """
+        - SEQuence:START
+
+        Runs the sequence REPeat times; blocks until it finishes or SEQuence:STOP is received.
+        SEQuence:STOP can only reach a running sequence in dual core mode, where it runs on core 1;
+        REPeat CONTinuous is a settings conflict in single core mode, since nothing could stop it
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+
+        if query:
             self.error_push(E_SYNTAX)
-        print(BUS_FAIL_CODE, file=self.stdout)
+        elif self.sequencer.recording:
+            self.error_push(E_SETTINGS_CONFLICT)
+        elif self.sequence_conf.repeat == REPEAT_CONTINUOUS and not self.worker.running:
+            self.error_push(E_SETTINGS_CONFLICT)
+        else:
+            self.sequencer.run(self.sequence_conf.repeat)
 
-    def cb_adc_read(self, param, opt):
+    def cb_sequence_stop(self, param, opt):
+        """
+        - SEQuence:STOP
+
+        Stops a running sequence before its next step
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+
+        if query:
+            self.error_push(E_SYNTAX)
+        elif self.sequencer.running:
+            self.sequencer.abort = True
+
+    def cb_sequence_state(self, param, opt):
+        """
+        - SEQuence:STATe?
+
+        Returns RECord|RUN|IDLE
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        sequencer = self.sequencer
+
+        if query:
+            print("RECord" if sequencer.recording else "RUN" if sequencer.running else "IDLE", file=self.stdout)
+        else:
+            self.error_push(E_SYNTAX)
+
+    def cb_sequence_count(self, param, opt):
+        """
+        - SEQuence:COUNt?
+
+        Returns ``steps,loops``; loops is the number of loops finished by the last run
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+
+        if query:
+            print(f"{len(self.sequencer.steps)},{self.sequencer.loops}", file=self.stdout)
+        else:
+            self.error_push(E_SYNTAX)
+
+    def cb_sequence_timing(self, param, opt):
+        """
+        - SEQuence:TIMing?
+
+        Returns ``scheduled,actual`` start offset pair of every step in the last loop, in us
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        sequencer = self.sequencer
+
+        if query:
+            print(",".join(f"{step[0]},{actual}" for step, actual in zip(sequencer.steps, sequencer.timing)),
+                  file=self.stdout)
+        else:
+            self.error_push(E_SYNTAX)
+
+    def cb_log_interval(self, param, opt):
+        """
+        - LOG:INTerval[?] num|DEFault|MINimum|MAXimum
+        - DEFault is 1000 [ms]
+
+        Takes effect on next LOG:START
+
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+        param = param.replace(" ", "")
+        conf = self.log_conf
+
+        if query:
+            interval = self.numeric_query(param, conf.interval, DEFAULT_LOG_INTERVAL, MIN_LOG_INTERVAL,
+                                          MAX_LOG_INTERVAL)
+            print(f"{interval:_d}", file=self.stdout)
+        elif param is not None:
+            interval = self.numeric_param(param, DEFAULT_LOG_INTERVAL, MIN_LOG_INTERVAL, MAX_LOG_INTERVAL)
+            if interval is not None:
+                vals = list(conf)
+                vals[0] = interval
+                self.log_conf = LogConfig(*vals)
+        else:
+            self.error_push(E_MISSING_PARAM)
+
+    def cb_log_adc(self, param, opt):
         """
-        - ADC[01234]:READ?
+        - LOG:ADC[?] mask
+
+        mask: 00-1f; bit n records ADCn as uint16
 
         :param param:
         :param opt:
@@ -1426,19 +4986,31 @@ class RaspberryScpiPico(MicroScpiDevice):
 
         query = (opt[-1] == "?")
         param = param.replace(" ", "")
-        adc_ch = int(opt[0])
-        adc = self.adc[adc_ch]
+        conf = self.log_conf
+        rstring = re.compile(r"^([0-9a-fA-F]+)$")
 
         if query:
-            # print("cb_adc_read", "Query", param, file=sys.stderr)
-            value = adc.read_u16()
-            print(f"{value:_d}", file=self.stdout)  # decimal
+            print(f"{conf.adc:02x}", file=self.stdout)
+        elif param is not None:
+            searched = rstring.search(param)
+            if searched is not None:
+                mask = int(searched.group(1), 16)
+                if mask & ~LOG_ADC_MASK:
+                    self.error_push(E_OUT_OF_RANGE)
+                    return
+                vals = list(conf)
+                vals[1] = mask
+                self.log_conf = LogConfig(*vals)
+            else:
+                self.error_push(E_INVALID_PARAMETER)
         else:
-            self.error_push(E_SYNTAX)
+            self.error_push(E_MISSING_PARAM)
 
-    def cb_spi_status(self, param="", opt=None):
+    def cb_log_port(self, param, opt):
         """
-        - ``SPI?``
+        - LOG:PORT[?] 0|1|OFF|ON
+
+        ON records ``GPIO_IN`` masked by 027fc000 as uint32
 
         :param param:
         :param opt:
@@ -1447,22 +5019,32 @@ class RaspberryScpiPico(MicroScpiDevice):
 
         query = (opt[-1] == "?")
         param = param.replace(" ", "")
+        conf = self.log_conf
 
         if query:
-            for bus in self.spi_conf.keys():
-                conf = self.spi_conf[bus]
-                cspol = conf.cspol
-                freq = conf.freq
-                mode = conf.mode
-                print(f"SPI{bus}:CSEL:POLarity {cspol};SPI{bus}:FREQuency {freq:_d};SPI{bus}:MODE {mode};", end="",
-                      file=self.stdout)
-            print("", file=self.stdout)
+            print(IO_VALUE_STRINGS[conf.port], file=self.stdout)
+        elif param is not None:
+            if param == str(IO_ON) or self.kw_on.match(param).match:
+                port = IO_ON
+            elif param == str(IO_OFF) or self.kw_off.match(param).match:
+                port = IO_OFF
+            else:
+                self.error_push(E_INVALID_PARAMETER)
+                return
+            vals = list(conf)
+            vals[2] = port
+            self.log_conf = LogConfig(*vals)
         else:
             self.error_push(E_MISSING_PARAM)
 
-    def cb_spi_cs_pol(self, param, opt):
+    def cb_log_register(self, param, opt):
         """
-        - SPI[01]:CSEL:POLarity[?] 0|1|DEFault
+        - LOG:REGister[?] bus,address,memaddress,nbytes|OFF
+
+        bus: 0|1
+        addr: 01-FF
+        memaddr: 00-FF (8 bit memory address)
+        nbytes: 1-8; recorded as raw bytes, all 0 when the read fails
 
         :param param:
         :param opt:
@@ -1471,34 +5053,37 @@ class RaspberryScpiPico(MicroScpiDevice):
 
         query = (opt[-1] == "?")
         param = param.replace(" ", "")
-        bus_number = int(opt[0])
-        conf = self.spi_conf[bus_number]
-        cspol = param
+        conf = self.log_conf
+        rstring = re.compile(r"^([01]),([1-9a-fA-F][0-9a-fA-F]),([0-9a-fA-F][0-9a-fA-F]),([1-8])$")
 
         if query:
-            # print("cb_spi_cs_pol", "Query", param, file=sys.stderr)
-            cspol = conf.cspol
-            print(cspol, file=self.stdout)
-        elif cspol is not None:
-            # print("cb_spi_cs_pol", param, file=sys.stderr)
-            if cspol in ["0", "1"]:
-                vals = list(conf)
-                vals[conf.index(conf.cspol)] = int(cspol)
-                self.spi_conf[bus_number] = SpiConfig(*vals)
-                self.cb_spi_cs_val("OFF", [bus_number])
-            elif self.kw_def.match(param).match:
-                vals = list(conf)
-                vals[conf.index(conf.cspol)] = DEFAULT_SPI_CSPOL
-                self.spi_conf[bus_number] = SpiConfig(*vals)
-                self.cb_spi_cs_val("OFF", [bus_number])
+            if conf.register is None:
+                print("OFF", file=self.stdout)
             else:
-                self.error_push(E_INVALID_PARAMETER)
+                bus_number, address, memaddress, length = conf.register
+                print(f"{bus_number},{address:02x},{memaddress:02x},{length}", file=self.stdout)
+        elif param is not None:
+            if self.kw_off.match(param).match:
+                register = None
+            else:
+                searched = rstring.search(param)
+                if searched is None:
+                    self.error_push(E_INVALID_PARAMETER)
+                    return
+                bus_number, address, memaddress, length = searched.groups()
+                register = (int(bus_number), int(f"0x{address}", 16), int(f"0x{memaddress}", 16), int(length))
+            vals = list(conf)
+            vals[3] = register
+            self.log_conf = LogConfig(*vals)
         else:
             self.error_push(E_MISSING_PARAM)
 
-    def cb_spi_cs_val(self, param, opt):
+    def cb_log_size(self, param, opt):
         """
-        - SPI[01]:CSEL:VALue[?] 0|1|OFF|ON
+        - LOG:SIZE[?] num|DEFault|MINimum|MAXimum
+        - DEFault is 65536 [bytes]
+
+        Bound of flash use; rounded down to 16384 byte ring files. Takes effect on next LOG:START
 
         :param param:
         :param opt:
@@ -1507,27 +5092,58 @@ class RaspberryScpiPico(MicroScpiDevice):
 
         query = (opt[-1] == "?")
         param = param.replace(" ", "")
-        bus_number = int(opt[0])
-        conf = self.spi_conf[bus_number]
-        cs_pin = conf.csel
+        conf = self.log_conf
 
         if query:
-            # print("cb_spi_cs_val", "Query", param, file=sys.stderr)
-            print(IO_VALUE_STRINGS[cs_pin.value()], file=self.stdout)
+            size = self.numeric_query(param, conf.size, DEFAULT_LOG_SIZE, MIN_LOG_SIZE, MAX_LOG_SIZE)
+            print(f"{size:_d}", file=self.stdout)
         elif param is not None:
-            # print("cb_spi_cs_val", param, file=sys.stderr)
-            if param == str(SPI_CSPOL_HI) or self.kw_on.match(param).match:
-                cs_pin.value(SPI_CSPOL_HI)
-            elif param == str(SPI_CSPOL_LO) or self.kw_off.match(param).match:
-                cs_pin.value(SPI_CSPOL_LO)
-            else:
-                self.error_push(E_INVALID_PARAMETER)
+            size = self.numeric_param(param, DEFAULT_LOG_SIZE, MIN_LOG_SIZE, MAX_LOG_SIZE)
+            if size is not None:
+                vals = list(conf)
+                vals[4] = size - size % FILE_SIZE
+                self.log_conf = LogConfig(*vals)
         else:
             self.error_push(E_MISSING_PARAM)
 
-    def cb_spi_clock_phase(self, param, opt):
+    def log_source(self, conf):
+        """ Builds ``struct`` format and sample function of one record from ``conf``
+
+        :param LogConfig conf:
+        :return tuple: (format, function returning tuple of values)
         """
-        - SPI[01]:MODE[?] 0|1|2|3|DEFault
+        adcs = [adc for ch, adc in self.adc.items() if conf.adc & (1 << ch)]
+        fmt = "H" * len(adcs)
+        port = conf.port == IO_ON
+        if port:
+            fmt += "I"
+        register = conf.register
+        if register is not None:
+            bus_number, address, memaddress, length = register
+            bus = self.i2c[bus_number]
+            address >>= self.i2c_conf[bus_number].bit
+            fmt += f"{length}s"
+            failed = bytes(length)
+
+        def sample():
+            values = [adc.read_u16() for adc in adcs]
+            if port:
+                values.append(machine.mem32[SIO_GPIO_IN] & PORT_MASK)
+            if register is not None:
+                try:
+                    values.append(bus.readfrom_mem(address, memaddress, length))
+                except OSError:
+                    values.append(failed)
+            return values
+
+        return fmt, sample
+
+    def cb_log_format(self, param, opt):
+        """
+        - LOG:FORMat?
+
+        Returns ``struct`` format of one record, i.e. ``<IHI2s``; the first field is timestamp in ms since LOG:START.
+        Describes running or last log, or next LOG:START when idle without records
 
         :param param:
         :param opt:
@@ -1535,46 +5151,42 @@ class RaspberryScpiPico(MicroScpiDevice):
         """
 
         query = (opt[-1] == "?")
-        param = param.replace(" ", "")
-        bus_number = int(opt[0])
-        bus = self.spi[bus_number]
-        conf = self.spi_conf[bus_number]
-        mode = param
-        vals = list(conf)
+        logger = self.logger
 
         if query:
-            # print("cb_spi_clock_phase", "Query", param, file=sys.stderr)
-            print(conf.mode, file=self.stdout)
-        elif mode is not None:
-            # print("cb_spi_clock_phase", param, file=sys.stderr)
-            if self.kw_def.match(param).match:
-                vals[conf.index(conf.mode)] = DEFAULT_SPI_MODE
-                conf = SpiConfig(*vals)
+            if logger.running() or logger.count() > 0:
+                print(logger.fmt, file=self.stdout)
+            else:
+                print(TIMESTAMP_FORMAT + self.log_source(self.log_conf)[0], file=self.stdout)
+        else:
+            self.error_push(E_SYNTAX)
 
-                bus = machine.SPI(bus_number, baudrate=conf.freq, sck=conf.sck, mosi=conf.mosi, miso=conf.miso,
-                                  polarity=DEFAULT_SPI_CKPOL, phase=DEFAULT_SPI_CKPH)
-            elif mode in ["0", "1", "2", "3"]:
-                mode = int(mode)
-                ckpol = SPI_CKPOL_HI if mode & SPI_MASK_CKPOL else SPI_CKPOL_LO
-                ckph = SPI_CKPH_HI if mode & SPI_MASK_CKPH else SPI_CKPH_LO
+    def cb_log_start(self, param, opt):
+        """
+        - LOG:START
 
-                vals[conf.index(conf.mode)] = int(mode)
-                conf = SpiConfig(*vals)
+        Drops stored records and starts logging every INTerval.
+        I2C register reads run on core 0; avoid I2C commands on the same bus in dual core mode while logging
 
-                bus = machine.SPI(bus_number, baudrate=conf.freq, sck=conf.sck, mosi=conf.mosi, miso=conf.miso,
-                                  polarity=ckpol, phase=ckph)
-            else:
-                self.error_push(E_INVALID_PARAMETER)
+        :param param:
+        :param opt:
+        :return:
+        """
 
-            self.spi_conf[bus_number] = conf
-            self.spi[bus_number] = bus
+        query = (opt[-1] == "?")
+        conf = self.log_conf
+
+        if query:
+            self.error_push(E_SYNTAX)
         else:
-            self.error_push(E_MISSING_PARAM)
+            fmt, sample = self.log_source(conf)
+            self.logger.start(fmt, sample, conf.interval, conf.size)
 
-    def cb_spi_freq(self, param, opt):
+    def cb_log_stop(self, param, opt):
         """
-        - SPI[01]:FREQuency[?] num|DEFault|MINimum|MAXimum
-        - DEFault is 1_000_000 [Hz]
+        - LOG:STOP
+
+        Stops logging and writes buffered records to flash
 
         :param param:
         :param opt:
@@ -1582,55 +5194,35 @@ class RaspberryScpiPico(MicroScpiDevice):
         """
 
         query = (opt[-1] == "?")
-        param = param.replace(" ", "")
-        bus_number = int(opt[0])
-        bus_freq = param
-        conf = self.spi_conf[bus_number]
-        vals = list(conf)
 
         if query:
-            # print("cb_spi_freq", bus_number, "Query", param, file=sys.stderr)
-            if self.kw_def.match(param).match:
-                bus_freq = DEFAULT_SPI_CLOCK
-            elif self.kw_max.match(param).match:
-                bus_freq = MAX_SPI_CLOCK
-            elif self.kw_min.match(param).match:
-                bus_freq = MIN_SPI_CLOCK
-            else:
-                bus_freq = conf.freq
-            print(f"{bus_freq:_d}", file=self.stdout)
-        elif bus_freq is not None:
-            # print("cb_spi_freq", bus_number, param, file=sys.stderr)
-            try:
-                if self.kw_def.match(bus_freq).match:
-                    bus_freq = DEFAULT_SPI_CLOCK
-                elif self.kw_max.match(param).match:
-                    bus_freq = MAX_SPI_CLOCK
-                elif self.kw_min.match(param).match:
-                    bus_freq = MIN_SPI_CLOCK
-                else:
-                    bus_freq = int(float(bus_freq))
+            self.error_push(E_SYNTAX)
+        else:
+            self.logger.stop()
 
-                if MIN_SPI_CLOCK <= bus_freq <= MAX_SPI_CLOCK:
-                    ckpol = SPI_CKPOL_HI if conf.mode & SPI_MASK_CKPOL else SPI_CKPOL_LO
-                    ckph = SPI_CKPH_HI if conf.mode & SPI_MASK_CKPH else SPI_CKPH_LO
+    def cb_log_state(self, param, opt):
+        """
+        - LOG:STATe?
 
-                    bus = machine.SPI(bus_number, baudrate=bus_freq, sck=conf.sck, mosi=conf.mosi, miso=conf.miso,
-                                      polarity=ckpol, phase=ckph)
-                    self.spi[bus_number] = bus
+        Returns RUN|IDLE
 
-                    vals[conf.index(conf.freq)] = bus_freq
-                    self.spi_conf[bus_number] = SpiConfig(*vals)
-                else:
-                    self.error_push(E_OUT_OF_RANGE)
-            except ValueError:
-                self.error_push(E_INVALID_PARAMETER)
+        :param param:
+        :param opt:
+        :return:
+        """
+
+        query = (opt[-1] == "?")
+
+        if query:
+            print("RUN" if self.logger.running() else "IDLE", file=self.stdout)
         else:
-            self.error_push(E_MISSING_PARAM)
+            self.error_push(E_SYNTAX)
 
-    def cb_spi_tx(self, param, opt):
+    def cb_log_count(self, param, opt):
         """
-        - ``SPI[01]:TRANSfer data,pre_cs,post_cs``
+        - LOG:COUNt?
+
+        Returns ``records,lost``; lost counts records dropped by failed or late flash writes
 
         :param param:
         :param opt:
@@ -1638,80 +5230,59 @@ class RaspberryScpiPico(MicroScpiDevice):
         """
 
         query = (opt[-1] == "?")
-        param = param.replace(" ", "")
-        bus_number = int(opt[0])
-        bus = self.spi[bus_number]
-
-        rstring = re.compile(r"^(([0-9a-fA-F][0-9a-fA-F])+),([oO][nN]|[oO][fF][fF]|[01]),([oO][nN]|[oO][fF][fF]|[01])$")
 
         if query:
-            # print("cb_spi_tx", bus_number, "Query", param, file=sys.stderr)
-            self.error_push(E_SYNTAX)
-        elif param is not None:
-            # print("cb_spi_tx", bus_number, param, file=sys.stderr)
-            searched = rstring.search(param)
-            if searched is not None:
-                data, _, pre_cs, post_cs = searched.groups()
-                # print(f"0x{data}", file=sys.stderr)
-                string_length = len(data)
-                data_array = tuple(int(f"0x{data[i:i + 2]}", 16) for i in range(0, string_length, 2))
-                length = len(data_array)
-                read_data_array = bytearray([0] * length)
-                # print([hex(c) for c in data_array], file=sys.stderr)
-                try:
-                    self.cb_spi_cs_val(pre_cs, [bus_number, ""])
-                    bus.write_readinto(bytes(data_array), read_data_array)
-                    self.cb_spi_cs_val(post_cs, [bus_number, ""])
-                    data = ",".join(f"{d:02x}" for d in read_data_array)
-                    print(data, file=self.stdout)
-                except OSError:
-                    self.error_push(E_SPI_FAIL)
-                    print(BUS_FAIL_CODE, file=self.stdout)
-            else:
-                self.error_push(E_INVALID_PARAMETER)
+            print(f"{self.logger.count()},{self.logger.lost}", file=self.stdout)
         else:
-            self.error_push(E_MISSING_PARAM)
+            self.error_push(E_SYNTAX)
 
-    def cb_spi_write(self, param, opt):
+    def cb_log_data(self, param, opt):
         """
-        - ``SPI[01]:WRITE data,pre_cs,post_cs``
+        - LOG:DATA? [first,count]
+
+        Returns records ``first`` to ``first + count - 1`` (all without parameter), oldest first, as
+        definite length block ``#<n><length><payload>``; payload is 2 hex digits per byte.
+        Page through long logs with ``first,count`` to bound response size.
+        Not allowed while logging; the ring files move under the read and the payload would not match its length
 
         :param param:
         :param opt:
         :return:
         """
+
         query = (opt[-1] == "?")
         param = param.replace(" ", "")
-        bus_number = int(opt[0])
-        bus = self.spi[bus_number]
-        rstring = re.compile(r"^(([0-9a-fA-F][0-9a-fA-F])+),([oO][nN]|[oO][fF][fF]|[01]),([oO][nN]|[oO][fF][fF]|[01])$")
+        logger = self.logger
+        rstring = re.compile(r"^(|([0-9]+),([0-9]+))$")
 
         if query:
-            # print("cb_spi_write", bus_number, "Query", param, file=sys.stderr)
-            self.error_push(E_SYNTAX)
-        elif param is not None:
-            # print("cb_spi_write", bus_number, param, file=sys.stderr)
             searched = rstring.search(param)
-            if searched is not None:
-                data, _, pre_cs, post_cs = searched.groups()
-                # print(f"0x{data}", file=sys.stderr)
-                string_length = len(data)
-                data_array = (int(f"0x{data[i:i + 2]}", 16) for i in range(0, string_length, 2))
-                # print([hex(c) for c in data_array], file=sys.stderr)
-                try:
-                    self.cb_spi_cs_val(pre_cs, [bus_number, ""])
-                    bus.write(bytes(data_array))
-                    self.cb_spi_cs_val(post_cs, [bus_number, ""])
-                except OSError:
-                    self.error_push(E_SPI_FAIL)
-            else:
+            if searched is None:
                 self.error_push(E_INVALID_PARAMETER)
+                print(definite_length_block(""), file=self.stdout)
+                return
+            if logger.running():
+                self.error_push(E_SETTINGS_CONFLICT)
+                print(definite_length_block(""), file=self.stdout)
+                return
+            _, first, count = searched.groups()
+            total = logger.count()
+            first = int(first) if first else 0
+            count = int(count) if count else total
+            count = max(0, min(count, total - first))
+            length = str(2 * count * logger.record_size)
+            print(f"#{len(length)}{length}", end="", file=self.stdout)
+            for chunk in logger.read(first, count):
+                print(hex_encode(chunk), end="", file=self.stdout)
+            print("", file=self.stdout)
         else:
-            self.error_push(E_MISSING_PARAM)
+            self.error_push(E_SYNTAX)
 
-    def cb_spi_read(self, param, opt):
+    def cb_log_clear(self, param, opt):
         """
-        - ``SPI[01]:READ? length,mask,pre_cs,post_cs``
+        - LOG:CLEar
+
+        Removes stored records; not allowed while logging
 
         :param param:
         :param opt:
@@ -1719,35 +5290,10 @@ class RaspberryScpiPico(MicroScpiDevice):
         """
 
         query = (opt[-1] == "?")
-        param = param.replace(" ", "")
-        bus_number = int(opt[0])
-        bus = self.spi[bus_number]
-        rstring = re.compile(
-            r"^([1-9]|[1-9][0-9]+),([0-9a-fA-F][0-9a-fA-F]),([oO][nN]|[oO][fF][fF]|[01]),([oO][nN]|[oO][fF][fF]|[01])$")
 
         if query:
-            # print("cb_spi_read", bus_number, "Query", param, file=sys.stderr)
-            searched = rstring.search(param)
-
-            if searched is not None:
-                length, mask, pre_cs, post_cs = searched.groups()
-                # print(length, mask, file=sys.stderr)
-                try:
-                    data_array = bytearray([0] * int(length))
-                    mask = int(f"0x{mask}", 16)
-                    self.cb_spi_cs_val(pre_cs, [bus_number, ""])
-                    bus.readinto(data_array, mask)
-                    self.cb_spi_cs_val(post_cs, [bus_number, ""])
-                    data = ",".join(f"{d:02x}" for d in data_array)
-                    print(data, file=self.stdout)
-                    return
-                except OSError:
-                    self.error_push(E_SPI_FAIL)
-                except ValueError:
-                    self.error_push(E_INVALID_PARAMETER)
-            else:
-                self.error_push(E_INVALID_PARAMETER)
-        elif param is not None:
             self.error_push(E_SYNTAX)
+        elif self.logger.running():
+            self.error_push(E_SETTINGS_CONFLICT)
         else:
-            self.error_push(E_MISSING_PARAM)
+            self.logger.clear()
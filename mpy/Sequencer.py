@@ -0,0 +1,109 @@
+"""
+MIT License
+
+Copyright (c) 2023 Kazuki Yamamoto
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+Timed command sequencer.
+
+Steps are parsed commands (callback and its arguments) recorded with a start offset in microseconds from the start of
+the loop. A run busy-waits on ``time.ticks_us()`` to each offset, so that the gap between two steps is set by the
+device rather than by USB scheduling. Actual start offsets of the last loop are kept for timing reports.
+"""
+import time
+from array import array
+from micropython import const
+
+MAX_SEQUENCE_STEPS = const(256)
+MAX_SEQUENCE_DELAY = const(10_000_000)  # us
+REPEAT_CONTINUOUS = const(0)
+
+
+class Sequencer:
+    def __init__(self):
+        self.steps = []  # (offset, function, args)
+        self.length = 0  # offset of the end of a loop in us
+        self.timing = array("l")  # actual start offsets of the last loop in us
+        self.loops = 0  # finished loops of the last run
+        self.recording = False
+        self.running = False
+        self.abort = False
+
+    def clear(self):
+        """ Drops every step
+        """
+        self.steps = []
+        self.length = 0
+        self.timing = array("l")
+        self.loops = 0
+
+    def wait(self, delay):
+        """ Moves start offset of next step ``delay`` us later
+
+        :param int delay: us
+        """
+        self.length += delay
+
+    def add(self, function, args):
+        """ Appends step ``function(*args)`` at current offset
+
+        :param function:
+        :param tuple args:
+        :return bool: False if the sequence is full
+        """
+        if len(self.steps) >= MAX_SEQUENCE_STEPS:
+            return False
+        self.steps.append((self.length, function, args))
+        return True
+
+    def run(self, repeat):
+        """ Runs steps ``repeat`` times or until ``abort`` is set; blocks until then
+
+        :param int repeat: number of loops; REPEAT_CONTINUOUS to loop until ``abort``
+        :return int: finished loops
+        """
+        ticks_us = time.ticks_us
+        ticks_diff = time.ticks_diff
+        steps = self.steps
+        length = self.length
+        timing = array("l", [0] * len(steps))
+        self.timing = timing
+        self.loops = 0
+        self.abort = False
+        self.running = True
+        try:
+            while repeat == REPEAT_CONTINUOUS or self.loops < repeat:
+                start = ticks_us()
+                for i, (offset, function, args) in enumerate(steps):
+                    while ticks_diff(ticks_us(), start) < offset:
+                        if self.abort:
+                            return self.loops
+                    timing[i] = ticks_diff(ticks_us(), start)
+                    function(*args)
+                while ticks_diff(ticks_us(), start) < length:
+                    if self.abort:
+                        return self.loops
+                if self.abort:
+                    return self.loops
+                self.loops += 1
+            return self.loops
+        finally:
+            self.running = False
@@ -0,0 +1,144 @@
+"""
+MIT License
+
+Copyright (c) 2023 Kazuki Yamamoto
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+Trace of the USBTMC stack.
+
+``trace()`` packs one binary event record into a RAM ring of ``TRACE_RECORDS`` records, so nothing is printed on the
+UART while a transfer is in progress; the oldest record is overwritten once the ring is full. Events above the
+trace level are dropped before anything is packed. Call sites are written inside ``if __debug__:`` blocks, which
+the compiler removes from modules frozen with ``opt=1``; see ``tmc/manifest.py``.
+
+Each record is ``TRACE_RECORD_FORMAT``: ``ticks_us`` (uint32), level (uint8), event (uint8) and two arguments
+(uint16, int32), little endian.
+
+|Event  |Name               |a                  |b
+|-------|-------------------|-------------------|-------------------
+|1      |BULK_OUT           |msgID              |TransferSize
+|2      |SHORT_HEADER       |received bytes     |
+|3      |BTAG_MISMATCH      |bTag               |bTagInverse
+|4      |UNKNOWN_MSGID      |msgID              |
+|5      |DEV_DEP_OUT        |bmTransferAttr     |TransferSize
+|6      |REQUEST_IN         |bmTransferAttr     |TransferSize
+|7      |BULK_IN            |EOM                |message bytes
+|8      |RESPONSE           |pending            |response bytes or ticket
+|9      |PARSE_FAIL         |                   |
+|10     |NO_RESPONSE        |                   |
+|11     |OUT_OF_STOCK       |                   |
+|12     |VENDOR_OUT         |                   |TransferSize
+|13     |VENDOR_IN          |                   |TransferSize
+|14     |QUEUE_OVERFLOW     |msgID              |held messages or vendor replies
+|15     |TOO_LARGE          |msgID              |TransferSize
+"""
+import time
+import struct
+from micropython import const
+
+TRACE_OFF = const(0)
+TRACE_ERROR = const(1)
+TRACE_INFO = const(2)
+TRACE_DEBUG = const(3)
+TRACE_LEVEL_STRINGS = {TRACE_OFF: "OFF", TRACE_ERROR: "ERR", TRACE_INFO: "INFO", TRACE_DEBUG: "DEB"}
+DEFAULT_TRACE_LEVEL = TRACE_ERROR
+
+EV_BULK_OUT = const(1)
+EV_SHORT_HEADER = const(2)
+EV_BTAG_MISMATCH = const(3)
+EV_UNKNOWN_MSGID = const(4)
+EV_DEV_DEP_OUT = const(5)
+EV_REQUEST_IN = const(6)
+EV_BULK_IN = const(7)
+EV_RESPONSE = const(8)
+EV_PARSE_FAIL = const(9)
+EV_NO_RESPONSE = const(10)
+EV_OUT_OF_STOCK = const(11)
+EV_VENDOR_OUT = const(12)
+EV_VENDOR_IN = const(13)
+EV_QUEUE_OVERFLOW = const(14)
+EV_TOO_LARGE = const(15)
+
+TRACE_RECORD_FORMAT = "<IBBHi"
+TRACE_RECORD_SIZE = const(12)
+TRACE_RECORDS = const(256)
+
+
+class TraceRing:
+    def __init__(self, records=TRACE_RECORDS):
+        """
+        :param int records: ring size in records
+        """
+        self.level = DEFAULT_TRACE_LEVEL
+        self.records = records
+        self.ring = bytearray(records * TRACE_RECORD_SIZE)
+        self.head = 0  # index of next record to write
+        self.total = 0  # records written since last clear
+
+    def trace(self, level, event, a=0, b=0):
+        """ Records ``event`` unless ``level`` is above the trace level
+
+        :param int level: TRACE_ERROR|TRACE_INFO|TRACE_DEBUG
+        :param int event: event number
+        :param int a: 16 bit argument
+        :param int b: 32 bit signed argument
+        """
+        if level > self.level:
+            return
+        head = self.head
+        struct.pack_into(TRACE_RECORD_FORMAT, self.ring, head * TRACE_RECORD_SIZE,
+                         time.ticks_us() & 0xFFFFFFFF, level, event, a & 0xFFFF, b)
+        self.head = (head + 1) % self.records
+        self.total += 1
+
+    def count(self):
+        """ Number of records held in the ring
+
+        :return int:
+        """
+        return min(self.total, self.records)
+
+    def read(self, first=0, count=None):
+        """ Returns records ``first`` to ``first + count - 1``, oldest first
+
+        :param int first: record index; 0 is the oldest record held
+        :param int count: number of records; all to the newest without it
+        :return bytes:
+        """
+        held = self.count()
+        if count is None:
+            count = held
+        count = max(0, min(count, held - first))
+        start = (self.head - held + first) % self.records
+        ring = memoryview(self.ring)
+        size = TRACE_RECORD_SIZE
+        if start + count <= self.records:
+            return bytes(ring[start * size:(start + count) * size])
+        wrap = self.records - start
+        return bytes(ring[start * size:]) + bytes(ring[:(count - wrap) * size])
+
+    def clear(self):
+        self.head = 0
+        self.total = 0
+
+
+TRACE = TraceRing()
+trace = TRACE.trace
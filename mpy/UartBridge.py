@@ -0,0 +1,158 @@
+"""
+MIT License
+
+Copyright (c) 2023 Kazuki Yamamoto
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+UART bridge with an IRQ fed receive ring.
+
+``machine.UART`` buffers incoming bytes in its own ``rxbuf``; the ``IRQ_RXIDLE`` handler moves them into a larger
+ring so that a burst arriving between two host polls is kept. A read drains the ring as one block.
+"""
+import machine
+from micropython import const
+
+RX_RING_SIZE = const(16384)
+_RXBUF_SIZE = const(4096)  # 80 ms at 500 kbaud
+_TXBUF_SIZE = const(1024)
+_SCRATCH_SIZE = const(64)
+
+UART_PINS = {0: (16, 17), 1: (20, 21)}  # uart_id: (tx, rx)
+
+
+class UartBridge:
+    def __init__(self, uart_id):
+        """
+        :param int uart_id: 0|1
+        """
+        self.uart_id = uart_id
+        self.tx, self.rx = UART_PINS[uart_id]
+        self.uart = None
+        self.ring = None
+        self.ring_mv = None
+        self.scratch = None
+        self.tail = 0
+        self.count = 0
+        self.lost = 0
+        self.busy = False  # set while a read drains; the IRQ handler leaves the ring alone then
+
+    def running(self):
+        """
+        :return bool: True if the port is open
+        """
+        return self.uart is not None
+
+    def start(self, baudrate, bits, parity, stop):
+        """ Opens the port on its TX/RX pins; the receive ring is allocated on first call
+
+        :param int baudrate:
+        :param int bits: 5-8
+        :param parity: None|0 (even)|1 (odd)
+        :param int stop: 1|2
+        """
+        if self.ring is None:
+            self.ring = bytearray(RX_RING_SIZE)
+            self.ring_mv = memoryview(self.ring)
+            self.scratch = bytearray(_SCRATCH_SIZE)
+        self.tail = 0
+        self.count = 0
+        self.lost = 0
+        self.uart = machine.UART(self.uart_id, baudrate=baudrate, bits=bits, parity=parity, stop=stop,
+                                 tx=machine.Pin(self.tx), rx=machine.Pin(self.rx),
+                                 rxbuf=_RXBUF_SIZE, txbuf=_TXBUF_SIZE)
+        self.uart.irq(handler=self._irq, trigger=machine.UART.IRQ_RXIDLE)
+
+    def configure(self, baudrate, bits, parity, stop):
+        """ Changes settings of an open port
+
+        :param int baudrate:
+        :param int bits: 5-8
+        :param parity: None|0 (even)|1 (odd)
+        :param int stop: 1|2
+        """
+        if self.uart is not None:
+            self._pull()
+            self.uart.init(baudrate=baudrate, bits=bits, parity=parity, stop=stop)
+
+    def stop(self):
+        """ Closes the port; the pins must be given back by the caller
+
+        :return bool: True if the port was open
+        """
+        if self.uart is None:
+            return False
+        self.uart.irq(handler=None)
+        self.uart.deinit()
+        self.uart = None
+        return True
+
+    def _irq(self, uart):
+        if not self.busy:
+            self._pull()
+
+    def _pull(self):
+        """ Moves bytes from ``rxbuf`` into the ring; bytes which do not fit are counted as lost
+        """
+        uart = self.uart
+        size = RX_RING_SIZE
+        while uart.any():
+            free = size - self.count
+            if free == 0:
+                self.lost += uart.readinto(self.scratch) or 0
+                continue
+            head = (self.tail + self.count) % size
+            n = uart.readinto(self.ring_mv[head:min(size, head + free)]) or 0
+            if n == 0:
+                break
+            self.count += n
+
+    def write(self, data):
+        """
+        :param bytes data:
+        """
+        self.uart.write(data)
+
+    def pending(self):
+        """
+        :return int: number of received bytes waiting to be read
+        """
+        return self.count + self.uart.any() if self.uart is not None else self.count
+
+    def read(self):
+        """ Takes every received byte, including those still in ``rxbuf``
+
+        :return bytes:
+        """
+        if self.ring is None:
+            return b""
+        self.busy = True
+        try:
+            if self.uart is not None:
+                self._pull()
+            tail = self.tail
+            count = self.count
+            first = min(count, RX_RING_SIZE - tail)
+            data = bytes(self.ring_mv[tail:tail + first]) + bytes(self.ring_mv[0:count - first])
+            self.tail = (tail + count) % RX_RING_SIZE
+            self.count = 0
+        finally:
+            self.busy = False
+        return data
@@ -21,15 +21,33 @@ LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
+from BootTiming import mark
+
+mark("main")
+
 import sys
+import select
 
 from RaspberryScpiPico import RaspberryScpiPico
 
+mark("imports")
+
 gets = sys.stdin.readline
 pico = RaspberryScpiPico()
+poller = select.poll()
+poller.register(sys.stdin, select.POLLIN)
+first_command = True
 
 while True:
-    line = gets().strip()
-    if len(line) > 0:
-        for _line in line.split(";"):
-            pico.parse_and_process(_line)
+    # Poll so that responses of commands running on core 1 are printed without waiting for the next line
+    if poller.poll(10):
+        line = gets().strip()
+        if len(line) > 0:
+            if first_command:
+                mark("command")
+                first_command = False
+            for _line in line.split(";"):
+                pico.parse_and_process(_line)
+    else:
+        pico.idle()
+    pico.flush_deferred()
@@ -1,5 +1,21 @@
 include("$(MPY_DIR)/ports/rp2/boards/manifest.py")
 
-module("MicroScpiDevice.py", base_path="../")
-module("RaspberryScpiPico.py", base_path="../")
+# Native build variant freezes copies with literal @micropython.native, written by native/make_native.py
+module("MicroScpiDevice.py", base_path="../native/build" if options.native else "../")
+module("RaspberryScpiPico.py", base_path="../native/build" if options.native else "../")
+module("LogicCapture.py", base_path="../")
+module("PatternGenerator.py", base_path="../")
+module("PulseMeter.py", base_path="../")
+module("EdgeLogger.py", base_path="../")
+module("PwmEngine.py", base_path="../")
+module("BusWorker.py", base_path="../")
+module("UartBridge.py", base_path="../")
+module("Sequencer.py", base_path="../")
+module("DataLogger.py", base_path="../")
+module("HexCodec.py", base_path="../")
+module("GcPolicy.py", base_path="../")
+module("Accel.py", base_path="../native" if options.native else "../")
+module("BootTiming.py", base_path="../")
+module("Trace.py", base_path="../")
+module("BinaryProtocol.py", base_path="../")
 module("main.py")
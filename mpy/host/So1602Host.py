@@ -26,6 +26,7 @@ import time
 from halo import Halo
 
 from SO1602OLED import SO1602OLED
+from HexCodec import hex_encode
 
 CR = 0x0d
 LF = 0x0a
@@ -70,7 +71,7 @@ class So1602Host(SO1602OLED):
         for line in lines:
             if line != "":
                 data = bytes(line, encoding="utf8")
-                data_array = "".join([f"{d:02x}" for d in data])
+                data_array = hex_encode(data)
                 self.inst.write(f"I2C{self.bus}:MEMory:WRITE {self.slave_address:02x},40,{data_array},1")
             self.line_feed()
             self.send_command(0x80 | (self.line_counter << 5))
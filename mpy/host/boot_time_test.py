@@ -0,0 +1,89 @@
+"""
+MIT License
+
+Copyright (c) 2023 Kazuki Yamamoto
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+Measures wall-clock time from power-on to the first ``*IDN?`` answer of a USBTMC firmware, then reads device side
+milestones with ``SYSTem:BOOT:TIMing?``.
+
+Power-on is either the end of ``--power-cycle`` shell command, e.g. ``uhubctl -a cycle -l 1-1 -p 2``,
+or the moment Enter is pressed when the device is plugged in by hand.
+"""
+import time
+import argparse
+import subprocess
+
+DEFAULT_RESOURCE = "USB0::0x2E8A::0x0488::e66038b7138f6535::INSTR"
+
+
+def first_idn(rm, resource, deadline):
+    """ Polls ``*IDN?`` until the device answers
+
+    :param pyvisa.ResourceManager rm:
+    :param str resource: VISA resource name
+    :param float deadline: time.perf_counter() to give up at
+    :return tuple: (answered time, open resource, *IDN? answer) or (None, None, "") on timeout
+    """
+    while time.perf_counter() < deadline:
+        inst = None
+        try:
+            inst = rm.open_resource(resource)
+            inst.timeout = 200
+            inst.write_termination = "\n"
+            inst.read_termination = "\n"
+            idn = inst.query("*IDN?").strip()
+            return time.perf_counter(), inst, idn
+        except pyvisa.errors.VisaIOError:
+            if inst is not None:
+                inst.close()  # a new resource is opened on the next attempt
+            time.sleep(0.01)
+    return None, None, ""
+
+
+if __name__ == '__main__':
+    import pyvisa
+    from halo import Halo
+
+    parser = argparse.ArgumentParser(description="Time from power-on to the first *IDN? answer")
+    parser.add_argument("--resource", default=DEFAULT_RESOURCE, help="VISA resource name")
+    parser.add_argument("--power-cycle", default="", help="shell command which power cycles the device")
+    parser.add_argument("--timeout", type=float, default=10.0, help="seconds to wait for the first answer")
+    args = parser.parse_args()
+
+    rm = pyvisa.ResourceManager()
+    if args.power_cycle:
+        subprocess.run(args.power_cycle, shell=True, check=True)
+    else:
+        input("Press Enter when the device is powered on: ")
+    power_on = time.perf_counter()
+
+    with Halo("Waiting for *IDN?"):
+        answered, inst, idn = first_idn(rm, args.resource, power_on + args.timeout)
+    if answered is None:
+        print(f"No answer in {args.timeout} s")
+    else:
+        print(idn)
+        print(f"power-on to *IDN?: {(answered - power_on) * 1000:.1f} ms")
+        timing = inst.query("SYSTem:BOOT:TIMing?").strip().split(",")
+        for name, us in zip(timing[::2], timing[1::2]):
+            print(f"{name:12s}{int(us) / 1000:10.1f} ms")
+        inst.close()
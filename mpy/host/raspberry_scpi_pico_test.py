@@ -27,7 +27,9 @@ SOFTWARE.
 *ESR? <No Param>
 *IDN? <No Param>
 *OPC/*OPC? <No Param>
+*RCL num
 *RST <No Param>
+*SAV num
 *SRE/*SRE? <No Param>
 *STB? <No Param>
 *TST? <No Param>
@@ -35,18 +37,45 @@ SOFTWARE.
 MACHINE:FREQuency[?] num|DEFault|MINimum|MAXimum
 
 SYSTem:ERRor?
+SYSTem:DUALcore[?] ON|OFF|DEFault
+SYSTem:MEMory?
+SYSTem:BOOT:TIMing?
+SYSTem:TRACe? [first,count]
+SYSTem:TRACe:LEVel[?] OFF|ERRor|INFO|DEBug|DEFault
+SYSTem:TRACe:CLEar
+SYSTem:GC:IDLE[?] ON|OFF|DEFault
+SYSTem:GC:LOCK[?] ON|OFF|DEFault
+SYSTem:GC:THReshold[?] num|DEFault|MINimum|MAXimum
+
+MEMory:STATe:RECall:AUTO[?] num|OFF
 
 PIN?
 PIN[14|15|16|17|18|19|20|21|22|25]:MODE[?] INput|OUTput|ODrain|PWM|DEFault
 PIN[14|15|16|17|18|19|20|21|22|25]:VALue[?] 0|1|OFF|ON|DEFault
 PIN[14|15|16|17|18|19|20|21|22|25]:ON
 PIN[14|15|16|17|18|19|20|21|22|25]:OFF
+PIN[14|15|16|17|18|19|20|21|22|25]:MEASure:GATE[?] num|DEFault|MINimum|MAXimum
+PIN[14|15|16|17|18|19|20|21|22|25]:MEASure:FREQuency?
+PIN[14|15|16|17|18|19|20|21|22|25]:MEASure:PERiod?
+PIN[14|15|16|17|18|19|20|21|22|25]:MEASure:PWIDth?
+PIN[14|15|16|17|18|19|20|21|22|25]:MEASure:DCYCle?
+PIN[14|15|16|17|18|19|20|21|22|25]:EVENt:EDGE[?] RISE|FALL|BOTH|OFF|DEFault
+PIN[14|15|16|17|18|19|20|21|22|25]:EVENt:COUNt?
+PIN[14|15|16|17|18|19|20|21|22|25]:EVENt:DATA?
+PIN[14|15|16|17|18|19|20|21|22|25]:EVENt:CLEar
+
+PORT:VALue[?] mask,value
+PORT:ON mask
+PORT:OFF mask
 
 PWM?
 PWM[14|15|16|17|18|19|20|21|22|25]:ON
 PWM[14|15|16|17|18|19|20|21|22|25]:OFF
 PWM[14|15|16|17|18|19|20|21|22|25]:FREQuency[?] num|DEFault|MINimum|MAXimum
 PWM[14|15|16|17|18|19|20|21|22|25]:DUTY[?] num|DEFault|MINimum|MAXimum
+PWM[14|15|16|17|18|19|20|21|22|25]:SLICe?
+PWM:SYNChronous[?] ON|OFF|DEFault
+PWM:APPLy [ALIGn]
 
 LED?
 LED:ON
@@ -75,7 +104,68 @@ SPI[01]:TRANSfer data,pre_cs,post_cs
 SPI[01]:WRITE data,pre_cs,post_cs
 SPI[01]:READ? length,mask,pre_cs,post_cs
 
+UART?
+UART[01]:BAUDrate[?] num|DEFault|MINimum|MAXimum
+UART[01]:WIDTH[?] 5|6|7|8|DEFault
+UART[01]:PARITY[?] NONE|EVEN|ODD|DEFault
+UART[01]:SBITs[?] 1|2|DEFault
+UART[01]:START
+UART[01]:STOP
+UART[01]:STATe?
+UART[01]:WRITE data
+UART[01]:READ?
+UART[01]:COUNt?
+
 ADC[01234]:READ?
+ADC[01234]:OVERsampling[?] num|DEFault|MINimum|MAXimum
+ADC[01234]:MEASure:STATistics? count
+
+LOGic:CAPTure:RATE[?] num|DEFault|MINimum|MAXimum
+LOGic:CAPTure:DEPTh[?] num|DEFault|MINimum|MAXimum
+LOGic:CAPTure:PRETrigger[?] num|DEFault|MINimum|MAXimum
+LOGic:CAPTure:TRIGger[?] IMMediate|RISE,pin|FALL,pin|PATTern,mask,value
+LOGic:CAPTure:ENCoding[?] RAW|RLE
+LOGic:CAPTure:TIMeout[?] num|DEFault|MINimum|MAXimum
+LOGic:CAPTure:START
+LOGic:CAPTure:STATe?
+LOGic:CAPTure:DATA?
+
+PATTern:DATA[?] sample,sample,...
+PATTern:APPend sample,sample,...
+PATTern:RATE[?] num|DEFault|MINimum|MAXimum
+PATTern:REPeat[?] num|CONTinuous|DEFault|MINimum|MAXimum
+PATTern:START
+PATTern:STOP
+PATTern:STATe?
+
+WATCh:INTerval[?] num|DEFault|MINimum|MAXimum
+WATCh:TIMeout[?] num|DEFault|MINimum|MAXimum
+WATCh:PIN[nn]:VALue? 0|1|OFF|ON
+WATCh:I2C[01]:READ? address,memaddress,mask,target,addrsize
+WATCh:SPI[01]:READ? command,mask,target,pre_cs,post_cs
+
+SEQuence:RECord
+SEQuence:WAIT num
+SEQuence:END
+SEQuence:REPeat[?] num|CONTinuous|DEFault|MINimum|MAXimum
+SEQuence:START
+SEQuence:STOP
+SEQuence:STATe?
+SEQuence:COUNt?
+SEQuence:TIMing?
+
+LOG:INTerval[?] num|DEFault|MINimum|MAXimum
+LOG:ADC[?] mask
+LOG:PORT[?] 0|1|OFF|ON
+LOG:REGister[?] bus,address,memaddress,nbytes|OFF
+LOG:SIZE[?] num|DEFault|MINimum|MAXimum
+LOG:FORMat?
+LOG:START
+LOG:STOP
+LOG:STATe?
+LOG:COUNt?
+LOG:DATA? [first,count]
+LOG:CLEar
 """
 import sys
 import time
@@ -88,6 +178,19 @@ scpi_commands = [
     "MACHINE:FREQuency 250e6",
 
     "SYSTem:ERRor?",
+    "SYSTem:DUALcore?", "SYSTem:DUALcore ON", "SYSTem:DUALcore?",
+    "I2C0:SCAN?", "*IDN?", "ADC0:READ?", "PIN14:VALue?", "SYSTem:ERRor?",
+    "SYSTem:DUALcore OFF", "SYSTem:DUALcore?",
+    "SYSTem:BOOT:TIMing?",
+    "SYSTem:TRACe:LEVel?", "SYSTem:TRACe:LEVel DEBug", "*IDN?", "SYSTem:TRACe?", "SYSTem:TRACe? 0,2",
+    "SYSTem:TRACe:LEVel DEFault", "SYSTem:TRACe:CLEar", "SYSTem:TRACe?",
+    "SYSTem:MEMory?", "SYSTem:GC:IDLE?", "SYSTem:GC:LOCK ON", "SYSTem:GC:LOCK?", "SYSTem:GC:THReshold 8192",
+    "SYSTem:GC:THReshold?", "I2C0:SCAN?", "SYSTem:MEMory?", "SYSTem:GC:THReshold DEFault", "SYSTem:GC:LOCK OFF",
+
+    "PIN25:MODE OUT", "PIN25:ON", "PWM14:FREQ 1000", "PWM14:ON", "I2C0:FREQ 400000", "SPI0:MODE 3", "*SAV 1",
+    "*RST", "*RCL 1", "PIN?", "PWM?", "I2C?", "SPI?", "*RCL 9", "SYSTem:ERRor?",
+    "MEMory:STATe:RECall:AUTO?", "MEMory:STATe:RECall:AUTO 1", "MEMory:STATe:RECall:AUTO?",
+    "MEMory:STATe:RECall:AUTO OFF", "MEMory:STATe:RECall:AUTO?", "*RST",
 
     "PI",
     "PIN?",
@@ -125,6 +228,18 @@ scpi_commands = [
     "PIN22:OFF", "PIN22:ON", "PIN22:OFF",
     "PIN25:OFF", "PIN25:ON", "PIN25:OFF",
 
+    "PIN15:MEASure:GATE?", "PIN15:MEASure:GATE MAXimum", "PIN15:MEASure:GATE?", "PIN15:MEASure:GATE DEFault",
+    "PWM15:FREQ 10000", "PWM15:DUTY 16384", "PWM15:ON",
+    "PIN15:MEASure:FREQuency?", "PIN15:MEASure:PERiod?", "PIN15:MEASure:PWIDth?", "PIN15:MEASure:DCYCle?",
+    "PWM15:OFF", "PIN15:MEASure:FREQuency?", "PIN15:MEASure:DCYCle?",
+
+    "PIN14:EVENt:EDGE?", "PIN14:EVENt:EDGE BOTH", "PIN14:EVENt:EDGE?", "PIN14:EVENt:CLEar",
+    "PIN14:ON", "PIN14:OFF", "PIN14:ON", "PIN14:EVENt:COUNt?", "PIN14:EVENt:DATA?", "PIN14:EVENt:DATA?",
+    "PIN14:EVENt:EDGE RISE", "PIN14:OFF", "PIN14:ON", "PIN14:EVENt:DATA?", "PIN14:EVENt:EDGE OFF",
+
+    "PORT:VALue?", "PORT:VALue? 0000c000", "PORT:VALue 007fc000,00554000", "PORT:VALue?",
+    "PORT:ON 0000c000", "PORT:VALue?", "PORT:OFF 007fc000", "PORT:VALue?", "PORT:VALue 00000001,1", "PIN?",
+
     "PWM?",
 
     "PWM14:FREQuency?", "PWM14:FREQuency 12345", "PWM14:FREQuency?",
@@ -244,11 +359,50 @@ scpi_commands = [
     "PWM22:ON", "PWM22:OFF",
     "PWM25:ON", "PWM25:OFF",
 
+    "PWM14:SLICe?", "PWM15:SLICe?", "PWM25:SLICe?",
+    "PWM14:FREQuency 1000", "PWM15:FREQuency 2000", "PWM14:ON", "PWM15:ON", "SYSTem:ERRor?", "PWM15:OFF",
+    "PWM:SYNChronous?", "PWM:SYNChronous ON", "PWM:SYNChronous?",
+    "PWM14:FREQuency 5000", "PWM15:FREQuency 5000", "PWM14:DUTY 16384", "PWM15:DUTY 49152",
+    "PWM14:ON", "PWM15:ON", "PWM16:ON", "PWM:APPLy", "PWM:APPLy ALIGn",
+    "PWM15:FREQuency 1000", "PWM:APPLy", "SYSTem:ERRor?", "PWM15:FREQuency 5000", "PWM:APPLy",
+    "PWM14:OFF", "PWM15:OFF", "PWM16:OFF", "PWM:APPLy", "PWM:SYNChronous DEFault",
+
     "LED?",
     "LED:VALue OFF", "LED:VALue ON", "LED:OFF", "LED:ON",
     "LED:PWM:FREQuency 12345", "LED:PWM:FREQuency?", "LED:PWM:DUTY?", "LED:PWM:DUTY 12345",
     "LED:PWM:ON", "LED:PWM:OFF",
     "ADC0:READ?", "ADC1:READ?", "ADC2:READ?", "ADC3:READ?", "ADC4:READ?",
+    "ADC0:OVERsampling?", "ADC0:OVERsampling 16", "ADC0:OVERsampling?", "ADC0:READ?", "ADC0:OVERsampling 1000",
+    "ADC0:OVERsampling? MAX", "ADC0:OVERsampling DEFault",
+    "ADC0:MEASure:STATistics? 100", "ADC3:MEASure:STATistics? 1000", "ADC4:MEASure:STATistics? 0",
+
+    "LOGic:CAPTure:RATE?", "LOGic:CAPTure:RATE 10e6", "LOGic:CAPTure:RATE? MAX", "LOGic:CAPTure:RATE 100e6",
+    "LOGic:CAPTure:DEPTh 256", "LOGic:CAPTure:DEPTh?", "LOGic:CAPTure:PRETrigger 64", "LOGic:CAPTure:PRETrigger?",
+    "LOGic:CAPTure:TRIGger?", "LOGic:CAPTure:TIMeout 100", "LOGic:CAPTure:TIMeout?",
+    "LOGic:CAPTure:START", "LOGic:CAPTure:STATe?", "LOGic:CAPTure:DATA?",
+    "LOGic:CAPTure:ENCoding RLE", "LOGic:CAPTure:ENCoding?", "LOGic:CAPTure:DATA?",
+    "LOGic:CAPTure:TRIGger RISE,14", "LOGic:CAPTure:TRIGger?", "LOGic:CAPTure:START", "LOGic:CAPTure:STATe?",
+    "LOGic:CAPTure:TRIGger PATTern,0000c000,00004000", "LOGic:CAPTure:TRIGger?", "LOGic:CAPTure:TRIGger RISE,25",
+    "LOGic:CAPTure:TRIGger IMMediate", "LOGic:CAPTure:ENCoding DEFault",
+
+    "PATTern:START", "PATTern:DATA 000,001,002,004,008,010,020,040,080,100", "PATTern:APPend 1ff,0", "PATTern:DATA?",
+    "PATTern:DATA 200", "PATTern:RATE 1e6", "PATTern:RATE?", "PATTern:REPeat 10", "PATTern:REPeat?",
+    "PATTern:START", "PATTern:STATe?", "PATTern:STOP", "PATTern:REPeat CONTinuous", "PATTern:REPeat?",
+    "PATTern:START", "PATTern:STATe?", "PATTern:STOP", "PATTern:STATe?", "PATTern:REPeat DEFault",
+
+    "WATCh:INTerval 5", "WATCh:INTerval?", "WATCh:TIMeout 200", "WATCh:TIMeout?", "WATCh:TIMeout? MAX",
+    "WATCh:PIN25:VALue? OFF", "SYSTem:ERRor?", "SYSTem:DUALcore ON",
+    "WATCh:PIN25:VALue? OFF", "WATCh:PIN25:VALue? ON", "WATCh:I2C0:READ? 78,00,80,00,1",
+    "WATCh:SPI0:READ? 05,01,00,OFF,ON", "SYSTem:DUALcore OFF", "WATCh:TIMeout DEFault",
+
+    "SEQuence:RECord", "SEQuence:STATe?", "PIN25:ON", "SEQuence:WAIT 500", "PIN25:OFF", "SEQuence:WAIT 1500",
+    "PIN25:VALue?", "SEQuence:END", "SEQuence:COUNt?", "SEQuence:REPeat 3", "SEQuence:REPeat?", "SEQuence:START",
+    "SEQuence:STATe?", "SEQuence:COUNt?", "SEQuence:TIMing?", "SEQuence:REPeat DEFault",
+
+    "LOG:INTerval 100", "LOG:INTerval?", "LOG:ADC 18", "LOG:ADC?", "LOG:PORT ON", "LOG:PORT?",
+    "LOG:REGister 0,78,00,2", "LOG:REGister?", "LOG:SIZE 40000", "LOG:SIZE?", "LOG:FORMat?", "LOG:START",
+    "LOG:STATe?", "LOG:COUNt?", "LOG:STOP", "LOG:COUNt?", "LOG:DATA? 0,4", "LOG:DATA?", "LOG:CLEar",
+    "LOG:COUNt?", "LOG:REGister OFF", "LOG:ADC 0", "LOG:PORT OFF", "LOG:INTerval DEFault", "LOG:SIZE DEFault",
 
     "I2C?",
     "I2C0:SCAN?", "I2C0:FREQuency?", "I2C0:FREQuency 114514",
@@ -298,6 +452,11 @@ scpi_commands = [
     "SPI0:TRANSfer 12345,ON,OFF", "SPI0:TRANSfer 123456,ON,OFF",
     "SPI1:TRANSfer 12345,ON,OFF", "SPI1:TRANSfer 123456,ON,OFF",
 
+    "UART?", "UART0:BAUD 500000", "UART0:BAUD?", "UART0:BAUD? MAX", "UART1:WIDTH 7", "UART1:WIDTH?",
+    "UART1:PARITY EVEN", "UART1:PARITY?", "UART0:SBIT 2", "UART0:SBIT?", "UART0:WRITE 48656c6c6f",
+    "UART0:START", "UART0:STAT?", "UART0:WRITE 48656c6c6f0d0a", "UART0:COUN?", "UART0:READ?", "UART0:STOP",
+    "UART0:STAT?", "UART?",
+
     "I2C0:WRITE 78,0001020f2a7981ff7828,0",
     "I2C0:WRITE 78,403031323334,1",
 
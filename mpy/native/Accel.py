@@ -0,0 +1,41 @@
+"""
+MIT License
+
+Copyright (c) 2023 Kazuki Yamamoto
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+Code emitter selection of the hot paths (lexer, keyword matching and status response formatting).
+
+Native variant: the hot paths are frozen from copies made by ``native/make_native.py``, where ``@native`` is written
+as the literal ``@micropython.native`` so that the compiler emits machine code for them, trading flash and RAM for
+speed. ``@micropython.viper`` is not used since typed viper code does not run anywhere but MicroPython.
+"""
+
+VARIANT = "native"
+
+
+def native(func):
+    """ Decorator marking a hot path function; already replaced in the frozen copies, so it keeps `func` as is
+
+    :param func: function to be compiled
+    :return: `func`
+    """
+    return func
@@ -0,0 +1,61 @@
+"""
+MIT License
+
+Copyright (c) 2023 Kazuki Yamamoto
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+Source transform of the native build variant, run on the build host before freezing.
+
+MicroPython selects the native emitter at compile time only where a function is decorated literally with
+``@micropython.native``; an aliased decorator applied at run time cannot change how it was compiled. The sources keep
+``@native`` from ``Accel`` so that they run unchanged under CPython, and this script writes copies with the literal
+decorator into ``native/build``, which ``manifest.py`` freezes with ``native=True``.
+"""
+import os
+import re
+
+NATIVE_SOURCES = ["MicroScpiDevice.py", "RaspberryScpiPico.py"]
+rdecorator = re.compile(r"^(\s*)@native\s*$", re.MULTILINE)
+
+
+def transform(source):
+    """ Replaces ``@native`` decorators with ``@micropython.native``
+
+    :param str source: module source
+    :return tuple: (transformed source, number of decorators replaced)
+    """
+    return rdecorator.subn(r"\1@micropython.native", source)
+
+
+def main():
+    here = os.path.dirname(os.path.abspath(__file__))
+    build = os.path.join(here, "build")
+    os.makedirs(build, exist_ok=True)
+    for name in NATIVE_SOURCES:
+        with open(os.path.join(here, "..", name)) as f:
+            source, count = transform(f.read())
+        with open(os.path.join(build, name), "w") as f:
+            f.write(source)
+        print(f"{name}: {count} native functions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+MIT License
+
+Copyright (c) 2023 Kazuki Yamamoto
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+Command parser benchmark. Run on the device of either firmware variant i.e. ``mpremote run parser_benchmark.py``
+and compare commands/s; flash cost of the variant is the size difference of the UF2 files.
+"""
+import io
+import gc
+import time
+
+import Accel
+from RaspberryScpiPico import RaspberryScpiPico
+
+ROUNDS = 20
+BENCH_COMMANDS = [
+    "*IDN?",
+    "SYSTem:ERRor?",
+    "MACHINE:FREQuency?",
+    "PIN?",
+    "PIN14:MODE?",
+    "PIN25:VALue?",
+    "PWM?",
+    "PWM14:FREQuency?",
+    "I2C?",
+    "I2C0:FREQuency?",
+    "SPI?",
+    "SPI0:MODE?",
+    "ADC0:OVERsampling?",
+    "PIN14:MODE INput",
+    "PIN14:MODE DEFault",
+    "KEYWord:NONE",
+]
+
+
+def bench(pico, rounds):
+    """ Runs `BENCH_COMMANDS` `rounds` times
+
+    :param RaspberryScpiPico pico:
+    :param int rounds:
+    :return int: elapsed time in us
+    """
+    parse = pico.parse_and_process
+    start = time.ticks_us()
+    for _ in range(rounds):
+        for command in BENCH_COMMANDS:
+            parse(command)
+    return time.ticks_diff(time.ticks_us(), start)
+
+
+def main():
+    pico = RaspberryScpiPico()
+    sink = io.StringIO()
+    pico.stdout = sink
+    bench(pico, 1)  # warm up status caches
+
+    count = ROUNDS * len(BENCH_COMMANDS)
+    gc.collect()
+    elapsed = bench(pico, ROUNDS)
+    print("variant:", Accel.VARIANT)
+    print("commands:", count)
+    print("elapsed_us:", elapsed)
+    print("commands/s: {:.1f}".format(count * 1_000_000 / elapsed))
+    print("mem_free:", gc.mem_free())
+
+
+main()
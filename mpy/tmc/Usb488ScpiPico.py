@@ -1,21 +1,67 @@
 import io
 import sys
 import struct
+from micropython import const, schedule
+from collections import namedtuple, deque
 from MicroScpiDevice import MicroScpiDevice
 from MicroScpiDevice import MicroScpiDevice, ScpiErrorNumber
 from usb.device.core import Descriptor
 from tmc import TmcBulkInOutMessage
 from usb488 import Usb488Interface
+from BootTiming import mark
+from Trace import trace, TRACE_ERROR, TRACE_DEBUG, EV_REQUEST_IN, EV_RESPONSE, EV_PARSE_FAIL, EV_NO_RESPONSE, \
+    EV_OUT_OF_STOCK, EV_QUEUE_OVERFLOW
 
 E_PARSE = ScpiErrorNumber(-481, "Parse failed")
 E_NO_RESP_LAST_BULKOUT = ScpiErrorNumber(-482, "No response on last bulkout")
 E_RESP_OUT_OF_STOCK = ScpiErrorNumber(-483, "No response stock left")
+E_QUEUE_OVERFLOW = ScpiErrorNumber(-350, "Queue overflow")
+E_DATA_OVERFLOW = ScpiErrorNumber(-223, "Too much data")
+
+DEFAULT_RESPONSE_DEPTH = const(16)
+
+
+class PendingResponse(namedtuple("PendingResponse", [
+    "ticket",  # parser ticket to wait for
+    "stream"  # response stream still being written
+])):
+    """
+    * ``ticket``: parser ticket to wait for
+    * ``stream``: response stream still being written
+    """
 
 
 class Usb488ScpiPico(Usb488Interface):
-    def __init__(self, parser: MicroScpiDevice):
+    """ USB488 interface running SCPI commands with ``parser``.
+
+    Commands run in the order they arrive. Each query takes a response slot, which is freed when the host reads
+    the response; messages without a query take none. Up to ``depth`` responses wait to be read. A query arriving
+    with every slot taken is held, and so is everything after it to keep the order, until a slot is freed.
+    Up to ``depth`` messages are held; a message beyond that is dropped with a queue overflow error.
+    Bulk-OUT itself is never held back, since REQUEST_DEV_DEP_MSG_IN which frees a slot comes in on it too.
+
+    A response still being made on core 1 is not waited for; the Bulk-IN request is retried via ``schedule`` so that
+    INITIATE_ABORT_BULK_IN and INITIATE_CLEAR get through meanwhile and cancel the commands.
+    """
+
+    def __init__(self, parser: MicroScpiDevice, depth=DEFAULT_RESPONSE_DEPTH):
+        """
+        :param parser: SCPI parser
+        :param int depth: number of response slots and of held messages
+        """
         super().__init__()
         self.parser = parser
+        self.first_command = True
+        self.depth = depth
+        self.dev_dep_out_messages = deque([], depth)  # responses of queries which ran, in order
+        self.held_messages = []  # (TmcBulkInOutMessage, str, bool) waiting for a response slot, in order
+        self.vendor_responses = deque([], depth)  # binary replies of VENDOR_SPECIFIC_OUT transfers, in order
+        self.bulkin_request = None  # REQUEST_DEV_DEP_MSG_IN waiting for its response
+        self.bulkin_response = None  # TmcBulkInOutMessage taken out for bulkin_request
+
+    def on_open(self):
+        super().on_open()
+        mark("usb_open")
 
     def on_device_dependent_out(self) -> None:
         """ Action on Bulk out transfer with megID==DEV_DEP_MSG_OUT.
@@ -54,31 +100,139 @@ class Usb488ScpiPico(Usb488Interface):
     
         """
         self._bulkout_header_processed = False
+        if self.first_command:
+            mark("command")
+            self.first_command = False
         transfer_size, attribute = struct.unpack_from("<IB3x", self.last_bulkout_msg.tmc_specific, 0)
 
-        message: bytes = self.last_bulkout_msg.message.split(b"\n")[0]
+        message: bytes = bytes(self.last_bulkout_msg.message).split(b"\n")[0]
         try:
-            if isinstance(message, bytes):
-                message: str = message.decode("utf-8")
-            response = b""
-            with io.StringIO() as sio:
-                self.parser.stdout = sio
-                for line in message.split(";"):
-                    self.parser.parse_and_process(line)
+            message: str = message.decode("utf-8")
+        except Exception:
+            self.parser.error_push(E_PARSE)
+            if __debug__:
+                trace(TRACE_ERROR, EV_PARSE_FAIL)
+            return
+
+        query = self.is_query(message)
+        if len(self.held_messages) > 0 or (query and len(self.dev_dep_out_messages) >= self.depth):
+            if len(self.held_messages) >= self.depth:
+                self.parser.error_push(E_QUEUE_OVERFLOW)
+                if __debug__:
+                    trace(TRACE_ERROR, EV_QUEUE_OVERFLOW, self.last_bulkout_msg.msg_id, len(self.held_messages))
+                return
+            self.held_messages.append((self.last_bulkout_msg, message, query))
+        else:
+            self.run_message(self.last_bulkout_msg, message, query)
+
+    @staticmethod
+    def is_query(message):
+        """ Tests if any command in ``message`` is a query
+
+        :param str message: commands separated by ";"
+        :return bool:
+        """
+        for line in message.split(";"):
+            if line.strip().split(" ")[0].endswith("?"):
+                return True
+        return False
+
+    def run_message(self, bulkout_msg, message, query):
+        """ Runs commands in ``message``; response of a query goes into a response slot
+
+        :param TmcBulkInOutMessage bulkout_msg: Bulk-OUT transfer which brought ``message``
+        :param str message: commands separated by ";"
+        :param bool query: ``message`` has a query
+        """
+        try:
+            sio = io.StringIO()
+            self.parser.stdout = sio
+            for line in message.split(";"):
+                self.parser.parse_and_process(line)
+            self.parser.stdout = sys.stdout
+            if not query:
+                return
+            ticket = self.parser.ticket()
+            if ticket > 0:
+                # Commands are still running on core 1; the response is completed on Bulk-IN request
+                response = PendingResponse(ticket, sio)
+            else:
                 response = sio.getvalue().encode("utf8")
-                sio.flush()
+
+            if __debug__:
+                if ticket > 0:
+                    trace(TRACE_DEBUG, EV_RESPONSE, 1, ticket)
+                else:
+                    trace(TRACE_DEBUG, EV_RESPONSE, 0, len(response))
+
+            self.dev_dep_out_messages.append(TmcBulkInOutMessage(bulkout_msg.msg_id, bulkout_msg.b_tag,
+                                                                 bulkout_msg.tmc_specific, bulkout_msg.message,
+                                                                 response))
+        except Exception:
             self.parser.stdout = sys.stdout
-            response.replace(b"\n", b";")
+            self.parser.error_push(E_PARSE)
+            if __debug__:
+                trace(TRACE_ERROR, EV_PARSE_FAIL)
 
-            self.last_bulkout_msg = TmcBulkInOutMessage(self.last_bulkout_msg.msg_id, self.last_bulkout_msg.b_tag,
-                                                        self.last_bulkout_msg.tmc_specific,
-                                                        self.last_bulkout_msg.message, response)
-            print(response)
+    def run_held(self, _=None):
+        """ Runs held messages in order while response slots are free
 
-            self.dev_dep_out_messages.append(self.last_bulkout_msg)
-        except Exception as e:
+        :param _: dummy argument for mpy.schedule()
+        """
+        held = self.held_messages
+        while len(held) > 0:
+            bulkout_msg, message, query = held[0]
+            if query and len(self.dev_dep_out_messages) >= self.depth:
+                break
+            held.pop(0)
+            self.run_message(bulkout_msg, message, query)
+
+    def on_vendor_specific_out(self) -> None:
+        """ Runs binary command frames of VENDOR_SPECIFIC_OUT with ``parser``; see ``BinaryProtocol``.
+        Replies are kept for REQUEST_VENDOR_SPECIFIC_IN; frames are not run while ``depth`` replies wait already.
+        """
+        self._bulkout_header_processed = False
+        if self.first_command:
+            mark("command")
+            self.first_command = False
+        transfer_size, = struct.unpack_from("<I4x", self.last_bulkout_msg.tmc_specific, 0)
+        if len(self.vendor_responses) >= self.depth:
+            # a full deque would drop its oldest reply; leave the frames unrun instead
+            self.parser.error_push(E_QUEUE_OVERFLOW)
+            if __debug__:
+                trace(TRACE_ERROR, EV_QUEUE_OVERFLOW, self.last_bulkout_msg.msg_id, len(self.vendor_responses))
+            return
+        frames = memoryview(self.last_bulkout_msg.message)[:transfer_size]
+        try:
+            response = self.parser.process_binary(frames)
+        except Exception:
             self.parser.error_push(E_PARSE)
-            print(e)
+            if __debug__:
+                trace(TRACE_ERROR, EV_PARSE_FAIL)
+            return
+        if __debug__:
+            trace(TRACE_DEBUG, EV_RESPONSE, 0, len(response))
+        if len(response) > 0:
+            self.vendor_responses.append(response)
+
+    def on_request_vendor_specific_in(self) -> None:
+        """ Sends binary replies of the oldest VENDOR_SPECIFIC_OUT, or the rest of the previous ones
+        """
+        self._bulkout_header_processed = False
+        transfer_size, = struct.unpack_from("<I4x", self.last_bulkout_msg.tmc_specific, 0)
+        if __debug__:
+            trace(TRACE_DEBUG, EV_REQUEST_IN, 0, transfer_size)
+
+        header: Descriptor = self.draft_vendor_specific_in_header(self.last_bulkout_msg.b_tag, transfer_size)
+        if self._vendor_in_rest is not None:
+            self.send_vendor_specific_in(header, self._vendor_in_rest)
+        elif len(self.vendor_responses) > 0:
+            self.send_vendor_specific_in(header, self.vendor_responses.popleft())
+        else:
+            self.parser.error_push(E_RESP_OUT_OF_STOCK)
+            if __debug__:
+                trace(TRACE_ERROR, EV_OUT_OF_STOCK)
+        self.parser.idle()
 
     def on_request_device_dependent_in(self) -> None:
         """ Action on Bulk out transfer with megID==DEV_DEP_MSG_IN.
@@ -131,19 +285,88 @@ class Usb488ScpiPico(Usb488Interface):
         """
         self._bulkout_header_processed = False
         transfer_size, attribute, termchar = struct.unpack_from("<IBB2x", self.last_bulkout_msg.tmc_specific, 0)
-        print("on_request_device_dependent_in")
+        if __debug__:
+            trace(TRACE_DEBUG, EV_REQUEST_IN, attribute, transfer_size)
+
+        self.bulkin_request = self.last_bulkout_msg
+        self.bulkin_response = None
+        if self._bulkin_rest is None and len(self.dev_dep_out_messages) > 0:
+            self.bulkin_response = self.dev_dep_out_messages.popleft()
+        self.answer_bulk_in()
+
+    def answer_bulk_in(self, _=None):
+        """ Answers ``bulkin_request`` once its response is complete; schedules itself again while commands are
+        still running on core 1
 
-        header: Descriptor = self.draft_device_dependent_in_header(self.last_bulkout_msg.b_tag, transfer_size)
-        if len(self.dev_dep_out_messages) > 0:
-            message: TmcBulkInOutMessage = self.dev_dep_out_messages.popleft()
-            print(message)
-            print("response message:", message.response)
+        :param _: dummy argument for mpy.schedule()
+        """
+        request = self.bulkin_request
+        if request is None:
+            return  # aborted or cleared meanwhile
+        message = self.bulkin_response
+        if message is not None and isinstance(message.response, PendingResponse):
+            ticket = message.response.ticket
+            if not self.parser.finished(ticket):
+                try:
+                    schedule(self.answer_bulk_in, None)
+                    return
+                except RuntimeError:
+                    self.parser.wait(ticket)  # schedule queue is full
+            message = TmcBulkInOutMessage(message.msg_id, message.b_tag, message.tmc_specific, message.message,
+                                          message.response.stream.getvalue().encode("utf8"))
+        self.bulkin_request = None
+        self.bulkin_response = None
+
+        transfer_size, = struct.unpack_from("<I4x", request.tmc_specific, 0)
+        header: Descriptor = self.draft_device_dependent_in_header(request.b_tag, transfer_size)
+        if self._bulkin_rest is not None:
+            # Rest of a response longer than the previous TransferSize
+            self.send_device_dependent_in(header, self._bulkin_rest, request)
+        elif message is not None:
             if len(message.response) > 0:
                 # There is query response
-                self.send_device_dependent_in(header, message.response)
+                self.send_device_dependent_in(header, message.response, request)
             else:
                 self.parser.error_push(E_NO_RESP_LAST_BULKOUT)
-                print(E_NO_RESP_LAST_BULKOUT.message)
+                if __debug__:
+                    trace(TRACE_ERROR, EV_NO_RESPONSE)
         else:
             self.parser.error_push(E_RESP_OUT_OF_STOCK)
-            print(E_RESP_OUT_OF_STOCK.message)
+            if __debug__:
+                trace(TRACE_ERROR, EV_OUT_OF_STOCK)
+        self.run_held()
+        self.parser.idle()  # the host is reading the response; next command comes after it
+
+    def on_abort_bulk_in(self):
+        """ Drops the response the host gave up on and cancels commands still making it
+        """
+        message = self.bulkin_response
+        self.bulkin_request = None
+        self.bulkin_response = None
+        if message is not None and isinstance(message.response, PendingResponse):
+            self.parser.cancel(message.response.ticket)
+        try:
+            schedule(self.run_held, None)  # not from the control transfer callback; the host waits for its answer
+        except RuntimeError:
+            pass  # schedule queue is full; held messages run on the next Bulk-IN request
+
+    def bulk_in_pending(self) -> bool:
+        """
+        :return bool: True while ``bulkin_request`` waits for a response being made on core 1
+        """
+        return self.bulkin_request is not None
+
+    def on_bulk_out_dropped(self):
+        """ Tells the host by SYSTem:ERRor? that the commands of a dropped transfer did not run
+        """
+        self.parser.error_push(E_DATA_OVERFLOW)
+
+    def on_clear(self):
+        """ Drops held messages and every response, and cancels commands still running
+        """
+        self.bulkin_request = None
+        self.bulkin_response = None
+        self.held_messages = []
+        self.dev_dep_out_messages = deque([], self.depth)
+        self.vendor_responses = deque([], self.depth)
+        self.parser.cancel(self.parser.ticket())
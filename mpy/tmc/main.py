@@ -21,10 +21,16 @@ LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
+from BootTiming import mark
+
+mark("main")
+
 import usb.device
 from Usb488ScpiPico import Usb488ScpiPico
 from RaspberryScpiPico import RaspberryScpiPico
 
+mark("imports")
+
 pico = RaspberryScpiPico()
 usb488if = Usb488ScpiPico(pico)
 
@@ -35,6 +41,7 @@ usb.device.get().init(usb488if,
                       manufacturer_str="MicroPython",
                       product_str="MicroPython USB488 device",
                       )
+mark("usb_init")
 
 from machine import UART
 import os
@@ -42,3 +49,4 @@ import os
 uart = UART(0)
 os.dupterm(uart, 0)
 uart.irq(os.dupterm_notify, UART.IRQ_RXIDLE)
+pico.repl_uart = 0
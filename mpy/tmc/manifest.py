@@ -1,9 +1,27 @@
 include("$(MPY_DIR)/ports/rp2/boards/manifest.py")
 require("usb-device")
 
-module("MicroScpiDevice.py", base_path="../")
-module("RaspberryScpiPico.py", base_path="../")
-module("tmc.py")
-module("usb488.py")
-module("Usb488ScpiPico.py")
+# Native build variant freezes copies with literal @micropython.native, written by native/make_native.py
+module("MicroScpiDevice.py", base_path="../native/build" if options.native else "../")
+module("RaspberryScpiPico.py", base_path="../native/build" if options.native else "../")
+module("LogicCapture.py", base_path="../")
+module("PatternGenerator.py", base_path="../")
+module("PulseMeter.py", base_path="../")
+module("EdgeLogger.py", base_path="../")
+module("PwmEngine.py", base_path="../")
+module("BusWorker.py", base_path="../")
+module("UartBridge.py", base_path="../")
+module("Sequencer.py", base_path="../")
+module("DataLogger.py", base_path="../")
+module("HexCodec.py", base_path="../")
+module("GcPolicy.py", base_path="../")
+module("Accel.py", base_path="../native" if options.native else "../")
+module("BootTiming.py", base_path="../")
+module("Trace.py", base_path="../")
+module("BinaryProtocol.py", base_path="../")
+# Trace events are compiled in unless included with trace=False; opt=1 removes `if __debug__:` blocks
+trace_opt = 1 if options.trace is False else 0
+module("tmc.py", opt=trace_opt)
+module("usb488.py", opt=trace_opt)
+module("Usb488ScpiPico.py", opt=trace_opt)
 module("main.py")
@@ -0,0 +1,2 @@
+# Native build variant: same as manifest.py but hot paths are compiled with @micropython.native
+include("manifest.py", native=True)
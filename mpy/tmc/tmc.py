@@ -6,12 +6,14 @@
 
 from micropython import const, schedule
 import io
-import machine
 from collections import deque, namedtuple
 import struct
 import time
 
 from usb.device.core import Interface, Descriptor, split_bmRequestType, Buffer
+from Trace import TRACE, trace, TRACE_ERROR, TRACE_INFO, TRACE_DEBUG, TRACE_RECORD_SIZE, EV_BULK_OUT, \
+    EV_SHORT_HEADER, EV_BTAG_MISMATCH, EV_UNKNOWN_MSGID, EV_DEV_DEP_OUT, EV_BULK_IN, EV_VENDOR_OUT, EV_VENDOR_IN, \
+    EV_TOO_LARGE
 
 _EP_IN_FLAG = const(1 << 7)
 
@@ -151,6 +153,8 @@ _REQ_INITIATE_CLEAR = const(5)  # 0xA1 (Dir = IN, Type = Class, Recipient = Inte
 _REQ_CHECK_CLEAR_STATUS = const(6)  # 0xA1 (Dir = IN, Type = Class, Recipient = Interface)
 _REQ_GET_CAPABILITIES = const(7)  # 0xA1 (Dir = IN, Type = Class, Recipient = Interface)
 _REQ_INDICATOR_PULSE = const(64)  # 0xA1 (Dir = IN, Type = Class, Recipient = Interface)
+# Vendor bRequest values
+_REQ_VENDOR_TRACE = const(1)  # 0xC1 (Dir = IN, Type = Vendor, Recipient = Interface)
 
 """
 Table 16 -- USBTMC_status values
@@ -299,7 +303,10 @@ _MSGID_REQUEST_VENDOR_SPECIFIC_IN = const(127)
 _MSGID_VENDOR_SPECIFIC_IN = const(127)
 
 _wMaxPacketSize = const(64)
+_EOM = const(0x01)  # bmTransferAttributes D0
+_TERMCHAR_ENABLED = const(0x02)  # bmTransferAttributes D1
 _BULK_IN_HEADER_SIZE = const(12)
+_MAX_TRANSFER_SIZE = const(16384)  # longer Bulk-OUT messages are received but dropped
 _HEADERS_BASE_SIZE = const(4)
 
 
@@ -350,6 +357,16 @@ class TMCInterface(Interface):
 
         self.dev_dep_out_messages = deque([], 16)
         self._bulkout_header_processed = False
+        self._bulkout_fill = 0  # message data bytes written into last_bulkout_msg.message
+        self._bulkout_remaining = 0  # bytes of current Bulk-OUT transfer still to receive, alignment included
+        self._bulkout_dropped = False  # current Bulk-OUT transfer is skipped, not stored
+        self._bulkin_rest = None  # memoryview of response message left for following REQUEST_DEV_DEP_MSG_IN
+        self._vendor_in_rest = None  # memoryview of vendor response left for following REQUEST_VENDOR_SPECIFIC_IN
+        self._nbytes_rxd = 0  # message data bytes of the last aborted Bulk-OUT transfer
+        self._nbytes_txd = 0  # message data bytes of the last Bulk-IN transfer
+        self._tx_zlp = False  # last Bulk-IN transfer ends on a packet boundary and needs a zero length packet
+        self._bulkout_btag = 0  # bTag of the most recent Bulk-OUT transfer
+        self._bulkin_btag = 0  # bTag of the most recent REQUEST_DEV_DEP_MSG_IN or REQUEST_VENDOR_SPECIFIC_IN
 
     def desc_cfg(self, desc, itf_num, ep_num, strs):
         # Function to build configuration descriptor contents for this interface
@@ -498,6 +515,10 @@ class TMCInterface(Interface):
                     ------------------------------------------------------------------------------------------------------------------------
                     0       |USBTMC_status  |1      |Value  |Status indication for this request. See Table 32.
                     """
+                    self.drop_bulk_out()
+                    self._bulkin_rest = None
+                    self._vendor_in_rest = None
+                    self.on_clear()
                     return resp.b
                 elif bRequest == _REQ_CHECK_CLEAR_STATUS:
                     """ Table 33 -- CHECK_CLEAR_STATUS Setup packet
@@ -523,7 +544,10 @@ class TMCInterface(Interface):
                             |               |       |       |           |FIFO is empty.
                     """
                     resp = Descriptor(bytearray(2))
-                    resp.pack("BB", _TMC_STATUS_SUCCESS, 0)
+                    if self._tx.readable() or self._tx_zlp:
+                        resp.pack("BB", _TMC_STATUS_PENDING, 1)
+                    else:
+                        resp.pack("BB", _TMC_STATUS_SUCCESS, 0)
                     return resp.b
                 elif bRequest == _REQ_GET_CAPABILITIES:
                     # _REQ_GET_CAPABILITIES = const(7)  # 0xA1 (Dir = IN, Type = Class, Recipient = Interface)
@@ -547,6 +571,18 @@ class TMCInterface(Interface):
                         return False
                 else:
                     return False  # Unsupported request
+            elif req_type == _REQ_TYPE_VENDOR:
+                if bRequest == _REQ_VENDOR_TRACE:
+                    """ Trace dump Setup packet
+                    bmRequestType   |0xC1 (Dir = IN, Type = Vendor, Recipient = Interface)
+                    bRequest        |1
+                    wValue          |First record to read; 0 is the oldest record held.
+                    wIndex          |Must specify interface number per the USB 2.0 specification, section 9.3.4.
+                    wLength         |Bytes to read; whole records of TRACE_RECORD_SIZE bytes are returned.
+                    """
+                    return TRACE.read(wValue, wLength // TRACE_RECORD_SIZE)
+                else:
+                    return False  # Unsupported request
             else:
                 return False  # Unsupported request
         return True  # Unsupported request
@@ -582,25 +618,6 @@ class TMCInterface(Interface):
                     """ Table 18 -- INITIATE_ABORT_BULK_OUT Setup packet
                     bmRequestType   |0xA2 (Dir = IN, Type = Class, Recipient = Endpoint)
                     bRequest        |INITIATE_ABORT_BULK_OUT (1), see Table 15.
-                    wValue          |D7...D0    |The bTag value associated with the transfer to abort.
-                                    |D15...D8   |Reserved. Must be 0x00.
-                    """
-                    """ Table 19 -- INITIATE_ABORT_BULK_OUT response packet
-                    Offset  |Field          |Size   |Value  |Description
-                    ------------------------------------------------------------------------------------------------------------------------
-                    0       |USBTMC_status  |1      |Value  |Status indication for this request. See Table 20.
-                    1       |bTag           |1      |Value  |The bTag for the the current Bulk-OUT transfer. If there is no current
-                            |               |       |       |Bulk-OUT transfer, bTag must be set to the bTag for the most recent
-                            |               |       |       |bulk-OUT transfer. If no Bulk-OUT transfer has ever been started, bTag
-                            |               |       |       |must be 0x00.
-                    """
-                    resp = Descriptor(bytearray(2))
-                    resp.pack("BB", _TMC_STATUS_SUCCESS, wValue & 0xff)
-                    return resp.b
-                elif bRequest == _REQ_CHECK_ABORT_BULK_OUT_STATUS:
-                    """Table 18 -- INITIATE_ABORT_BULK_OUT Setup packet
-                    bmRequestType   |0xA2 (Dir = IN, Type = Class, Recipient = Endpoint)
-                    bRequest        |INITIATE_ABORT_BULK_OUT, see Table 15.
                     wValue          |D7...D0    |The bTag value associated with the transfer to abort.
                                     |D15...D8   |Reserved. Must be 0x00.
                     wIndex          |Must specify direction and endpoint number per the USB 2.0 specification, section 9.3.4.
@@ -616,9 +633,14 @@ class TMCInterface(Interface):
                             |               |       |       |must be 0x00.
                     """
                     resp = Descriptor(bytearray(2))
-                    resp.pack("BB", _TMC_STATUS_SUCCESS, wValue & 0xff)
+                    if self._bulkout_header_processed and (wValue & 0xff) == self._bulkout_btag:
+                        self._nbytes_rxd = self._bulkout_fill
+                        self.drop_bulk_out()
+                        resp.pack("BB", _TMC_STATUS_SUCCESS, self._bulkout_btag)
+                    else:
+                        resp.pack("BB", _TMC_STATUS_TRANSFER_NOT_IN_PROGRESS, self._bulkout_btag)
                     return resp.b
-                elif bRequest == _REQ_INITIATE_ABORT_BULK_IN:
+                elif bRequest == _REQ_CHECK_ABORT_BULK_OUT_STATUS:
                     """ Table 21 -- CHECK_ABORT_BULK_OUT_STATUS Setup packet
                     bmRequestType   |0xA2 (Dir = IN, Type = Class, Recipient = Endpoint)
                     bRequest        |CHECK_ABORT_BULK_OUT_STATUS, see Table 15.
@@ -638,9 +660,9 @@ class TMCInterface(Interface):
                             |               |       |           |byte first, most significant byte last.
                     """
                     resp = Descriptor(bytearray(8))
-                    resp.pack("<B3xI", _TMC_STATUS_SUCCESS, 0x00)
+                    resp.pack("<B3xI", _TMC_STATUS_SUCCESS, self._nbytes_rxd)
                     return resp.b
-                elif bRequest == _REQ_CHECK_ABORT_BULK_IN_STATUS:
+                elif bRequest == _REQ_INITIATE_ABORT_BULK_IN:
                     """ Table 24 -- INITIATE_ABORT_BULK_IN Setup packet
                     bmRequestType   |0xA2 (Dir = IN, Type = Class, Recipient = Endpoint)
                     bRequest        |INITIATE_ABORT_BULK_IN, see Table 15.
@@ -658,8 +680,42 @@ class TMCInterface(Interface):
                             |               |       |       |bulk-IN transfer. If no Bulk-IN transfer has ever been started, bTag
                             |               |       |       |must be 0x00.
                     """
+                    self._bulkin_rest = None  # a split response is not continued after an abort either way
+                    self._vendor_in_rest = None
                     resp = Descriptor(bytearray(2))
-                    resp.pack("BB", _TMC_STATUS_SUCCESS, wValue & 0xff)
+                    if (wValue & 0xff) == self._bulkin_btag and (self.bulk_in_pending() or self._tx.readable() or self._tx_zlp):
+                        self.on_abort_bulk_in()
+                        resp.pack("BB", _TMC_STATUS_SUCCESS, self._bulkin_btag)
+                    else:
+                        resp.pack("BB", _TMC_STATUS_TRANSFER_NOT_IN_PROGRESS, self._bulkin_btag)
+                    return resp.b
+                elif bRequest == _REQ_CHECK_ABORT_BULK_IN_STATUS:
+                    """ Table 27 -- CHECK_ABORT_BULK_IN_STATUS Setup packet
+                    bmRequestType   |0xA2 (Dir = IN, Type = Class, Recipient = Endpoint)
+                    bRequest        |CHECK_ABORT_BULK_IN_STATUS, see Table 15.
+                    wValue          |Reserved. Must be 0x0000.
+                    wIndex          |Must specify direction and endpoint number per the USB 2.0 specification, section 9.3.4.
+                    wLength         |0x0008. Number of bytes to transfer per the USB 2.0 specification, section 9.3.5.
+                    """
+                    """ Table 28 -- CHECK_ABORT_BULK_IN_STATUS response format
+                    Offset  |Field          |Size   |Value      |Description
+                    ------------------------------------------------------------------------------------------------------------------------
+                    0       |USBTMC_status  |1      |Value      |Status indication for this request. See Table 29.
+                    1       |bmAbortBulkIn  |1      |Bitmap     |D7...D1    |Reserved. All bits must be 0.
+                            |               |       |           |D0         |BulkInFifoBytes
+                            |               |       |           |           |1 - The device has queued DATA bytes in the
+                            |               |       |           |           |Bulk-IN FIFO. USBTMC_status must be
+                            |               |       |           |           |STATUS_PENDING.
+                            |               |       |           |           |0 - The Bulk-IN FIFO is empty.
+                    2-3     |Reserved       |2      |0x0000     |Reserved. Must be 0x0000.
+                    4       |NBYTES_TXD     |4      |Number     |The total number of USBTMC message data bytes (not including
+                            |               |       |           |Bulk-IN Header or alignment bytes) sent in the transfer.
+                    """
+                    resp = Descriptor(bytearray(8))
+                    if self._tx.readable() or self._tx_zlp:
+                        resp.pack("<BB2xI", _TMC_STATUS_PENDING, 1, self._nbytes_txd)
+                    else:
+                        resp.pack("<BB2xI", _TMC_STATUS_SUCCESS, 0, self._nbytes_txd)
                     return resp.b
                 else:
                     return False  # Unsupported request
@@ -667,6 +723,42 @@ class TMCInterface(Interface):
                 return False  # Unsupported request
         return False  # Unsupported request
 
+    def drop_bulk_out(self):
+        """ Discards the Bulk-OUT transfer being reassembled; following bytes are parsed as a new header
+        """
+        self._bulkout_header_processed = False
+        self._bulkout_fill = 0
+        self._bulkout_remaining = 0
+        self._bulkout_dropped = False
+
+    def bulk_in_pending(self) -> bool:
+        """ Tells if a REQUEST_DEV_DEP_MSG_IN is waiting for its response; such a Bulk-IN transfer is in progress
+        for INITIATE_ABORT_BULK_IN. Subclasses answering requests later may override this method.
+
+        :return bool:
+        """
+        return False
+
+    def on_abort_bulk_in(self):
+        """ Action on INITIATE_ABORT_BULK_IN of the Bulk-IN transfer in progress, after the rest of a split response
+        is dropped. Runs in the control transfer callback; keep it short.
+        Subclasses may override this to cancel the command whose response the host gave up on.
+        """
+        pass
+
+    def on_bulk_out_dropped(self):
+        """ Action on a DEV_DEP_MSG_OUT or VENDOR_SPECIFIC_OUT transfer skipped for being larger than
+        ``_MAX_TRANSFER_SIZE`` or than free heap; ``last_bulkout_msg`` holds its header only.
+        Subclasses may override this to report the loss to the host.
+        """
+        pass
+
+    def on_clear(self):
+        """ Action on INITIATE_CLEAR, after partial Bulk-OUT and Bulk-IN transfers are dropped.
+        Subclasses may override this to drop queued messages and cancel running commands.
+        """
+        pass
+
     def get_capabilities(self):
         interface_capability = ((1 if self.indicator_pulse else 0) << 2) | ((1 if self.talk_only else 0) << 1) | \
                                ((1 if self.listen_only else 0) << 0)
@@ -685,8 +777,12 @@ class TMCInterface(Interface):
     def _tx_xfer(self):
         # Keep an active IN transfer to send data to the host, whenever
         # there is data to send.
-        if self.is_open() and not self.xfer_pending(self.ep_in) and self._tx.readable():
-            self.submit_xfer(self.ep_in, self._tx.pend_read(), self._tx_cb)
+        if self.is_open() and not self.xfer_pending(self.ep_in):
+            if self._tx.readable():
+                self.submit_xfer(self.ep_in, self._tx.pend_read(), self._tx_cb)
+            elif self._tx_zlp:
+                self._tx_zlp = False
+                self.submit_xfer(self.ep_in, b"", self._tx_cb)  # ends a transfer of whole packets
 
     def _tx_cb(self, ep, res, num_bytes):
         if res == 0:
@@ -716,63 +812,96 @@ class TMCInterface(Interface):
         :param _: dummy argument for mpy.schedule()
         """
         message: memoryview = self._rx.pend_read()
-        self.on_bulk_out(message)
-        self._rx.finish_read(len(message))
+        try:
+            self.on_bulk_out(message)
+        finally:
+            self._rx.finish_read(len(message))
 
     def on_bulk_out(self, new_message: memoryview):
-        """ Selects callbacks by given megID
-        :param new_message:
+        """ Reassembles Bulk-OUT transfers and selects callbacks by given msgID.
+        The header is parsed once per transfer; message data bytes of DEV_DEP_MSG_OUT and VENDOR_SPECIFIC_OUT are
+        written into a bytearray allocated from TransferSize, packet by packet through memoryview slices.
+        Alignment bytes are skipped and ``new_message`` may hold the start of the next transfer.
+        A message longer than ``_MAX_TRANSFER_SIZE``, or one the heap cannot hold, is received and dropped.
+
+        :param new_message: received bytes
         :return:
         """
-        print("vvvvv\n")
-        if not self._bulkout_header_processed:
-            print("process header\n")
-            msg_id, b_tag, b_tag_inverse, tmc_specific = struct.unpack_from("BBBx8s", new_message, 0)
-            if (b_tag ^ b_tag_inverse) == 0xff:
-                if msg_id in (_MSGID_DEV_DEP_MSG_OUT, _MSGID_VENDOR_SPECIFIC_OUT,
-                              _MSGID_REQUEST_DEV_DEP_MSG_IN, _MSGID_REQUEST_VENDOR_SPECIFIC_IN):
-                    self.last_bulkout_msg = TmcBulkInOutMessage(msg_id=msg_id, b_tag=b_tag, tmc_specific=tmc_specific,
-                                                                message=bytes(new_message[_BULK_OUT_HEADER_SIZE:]),
-                                                                response=b"")
-                    self._bulkout_header_processed = True
-                    self.on_bulk_out(new_message)
+        offset = 0
+        length = len(new_message)
+        while offset < length:
+            if not self._bulkout_header_processed:
+                if length - offset < _BULK_OUT_HEADER_SIZE:
+                    if __debug__:
+                        trace(TRACE_ERROR, EV_SHORT_HEADER, length - offset)
+                    return
+                msg_id, b_tag, b_tag_inverse, tmc_specific = struct.unpack_from("BBBx8s", new_message, offset)
+                offset += _BULK_OUT_HEADER_SIZE
+                if (b_tag ^ b_tag_inverse) != 0xff:
+                    if __debug__:
+                        trace(TRACE_ERROR, EV_BTAG_MISMATCH, b_tag, b_tag_inverse)
+                    return
+                transfer_size, = struct.unpack_from("<I", tmc_specific, 0)
+                if __debug__:
+                    trace(TRACE_DEBUG, EV_BULK_OUT, msg_id, transfer_size)
+                self._bulkout_btag = b_tag
+                self._bulkout_dropped = False
+                if msg_id in (_MSGID_DEV_DEP_MSG_OUT, _MSGID_VENDOR_SPECIFIC_OUT):
+                    payload = b""
+                    if transfer_size <= _MAX_TRANSFER_SIZE:
+                        try:
+                            payload = bytearray(transfer_size)
+                        except MemoryError:
+                            self._bulkout_dropped = True
+                    else:
+                        self._bulkout_dropped = True
+                    if __debug__:
+                        if self._bulkout_dropped:
+                            trace(TRACE_ERROR, EV_TOO_LARGE, msg_id, transfer_size)
+                    self._bulkout_remaining = (transfer_size + 3) & ~3  # message data and alignment bytes
+                elif msg_id in (_MSGID_REQUEST_DEV_DEP_MSG_IN, _MSGID_REQUEST_VENDOR_SPECIFIC_IN):
+                    payload = b""
+                    self._bulkin_btag = b_tag
+                    self._nbytes_txd = 0
+                    self._bulkout_remaining = 0
                 else:
-                    print("Unknown message ID:", msg_id)
+                    if __debug__:
+                        trace(TRACE_ERROR, EV_UNKNOWN_MSGID, msg_id)
+                    return
+                self._bulkout_fill = 0
+                self.last_bulkout_msg = TmcBulkInOutMessage(msg_id=msg_id, b_tag=b_tag, tmc_specific=tmc_specific,
+                                                            message=payload, response=b"")
+                self._bulkout_header_processed = True
             else:
-                print("bTag mismatch", hex(b_tag), hex(b_tag_inverse))
-        else:
-            print("process rest of message\n")
-            msg_id, b_tag, tmc_specific, last_bulkout_msg, _ = self.last_bulkout_msg
-            transfer_size, _ = struct.unpack_from("<IB3x", tmc_specific, 0)
-            print("on_bulk_out Transfer size:", transfer_size)
-
-            if msg_id in (_MSGID_DEV_DEP_MSG_OUT, _MSGID_VENDOR_SPECIFIC_OUT):
-                # last_bulkout_msg: bytes = self.last_bulkout_msg.message
-                if transfer_size > len(last_bulkout_msg):  # need to receive more
-                    print("need to get more\n")
-                    message = last_bulkout_msg + bytes(new_message)  # concat message
-                    self.last_bulkout_msg = TmcBulkInOutMessage(msg_id=msg_id, b_tag=b_tag, tmc_specific=tmc_specific,
-                                                                message=message,
-                                                                response=b"")
-                    self._rx_xfer()  # receive more
-                else:
-                    if msg_id == _MSGID_DEV_DEP_MSG_OUT:
-                        print("_MSGID_DEV_DEP_MSG_OUT\n")
-                        self.on_device_dependent_out()
-                        self._bulkout_header_processed = False
-                    elif msg_id == _MSGID_VENDOR_SPECIFIC_OUT:  # Unlikely the case
-                        self.on_vendor_specific_out()
-                        self._bulkout_header_processed = False
-            elif msg_id == _MSGID_REQUEST_DEV_DEP_MSG_IN:
-                print("_MSGID_REQUEST_DEV_DEP_MSG_IN\n")
-                self.on_request_device_dependent_in()
-                self._bulkout_header_processed = False
-            elif msg_id == _MSGID_REQUEST_VENDOR_SPECIFIC_IN:  # Unlikely the case
-                self.on_request_vendor_specific_in()
-                self._bulkout_header_processed = False
-        print("self._bulkout_header_processed:", self._bulkout_header_processed)
-        print(self.last_bulkout_msg)
-        print("^^^^^\n")
+                payload = self.last_bulkout_msg.message
+                fill = self._bulkout_fill
+                count = min(length - offset, self._bulkout_remaining)
+                size = min(count, len(payload) - fill)
+                if size > 0:
+                    memoryview(payload)[fill:fill + size] = new_message[offset:offset + size]
+                    self._bulkout_fill = fill + size
+                self._bulkout_remaining -= count
+                offset += count
+
+            if self._bulkout_remaining == 0:
+                self.on_bulk_out_complete()
+
+    def on_bulk_out_complete(self):
+        """ Selects callbacks by msgID of the completely received Bulk-OUT transfer
+        """
+        msg_id = self.last_bulkout_msg.msg_id
+        self._bulkout_header_processed = False
+        if self._bulkout_dropped:
+            self._bulkout_dropped = False
+            self.on_bulk_out_dropped()
+        elif msg_id == _MSGID_DEV_DEP_MSG_OUT:
+            self.on_device_dependent_out()
+        elif msg_id == _MSGID_VENDOR_SPECIFIC_OUT:  # Unlikely the case
+            self.on_vendor_specific_out()
+        elif msg_id == _MSGID_REQUEST_DEV_DEP_MSG_IN:
+            self.on_request_device_dependent_in()
+        elif msg_id == _MSGID_REQUEST_VENDOR_SPECIFIC_IN:  # Unlikely the case
+            self.on_request_vendor_specific_in()
 
     def on_device_dependent_out(self) -> None:
         """ Action on Bulk out transfer with megID==DEV_DEP_MSG_OUT.
@@ -801,9 +930,8 @@ class TMCInterface(Interface):
         """
         self._bulkout_header_processed = False
         transfer_size, attribute = struct.unpack_from("<IB3x", self.last_bulkout_msg.tmc_specific, 0)
-        print("Transfer size:", transfer_size)
-        print("Attribute:", attribute)
-        print("Message:", bytes(self.last_bulkout_msg.message))
+        if __debug__:
+            trace(TRACE_INFO, EV_DEV_DEP_OUT, attribute, transfer_size)
 
     def draft_bulk_in_header(self, msg_id: int, b_tag: int, transfer_size: int) -> Descriptor:
         """ Draft a bulk in header. Subclasses may override this method.
@@ -829,7 +957,7 @@ class TMCInterface(Interface):
                 |                                   |       |specific   |
         """
         assert msg_id in (_MSGID_DEV_DEP_MSG_IN, _MSGID_VENDOR_SPECIFIC_IN)
-        resp = Descriptor(bytearray(transfer_size))
+        resp = Descriptor(bytearray(_BULK_IN_HEADER_SIZE))
         resp.pack_into("BBB",
                        0,
                        msg_id,
@@ -875,7 +1003,10 @@ class TMCInterface(Interface):
         transfer_size, attribute, termchar = struct.unpack_from("<IBB2x", self.last_bulkout_msg.tmc_specific, 0)
 
         header: Descriptor = self.draft_device_dependent_in_header(self.last_bulkout_msg.b_tag, transfer_size)
-        message: bytes = self.prepare_dev_dep_msg_in()
+        if self._bulkin_rest is not None:
+            message = self._bulkin_rest
+        else:
+            message: bytes = self.prepare_dev_dep_msg_in()
 
         self.send_device_dependent_in(header, message)
 
@@ -923,9 +1054,8 @@ class TMCInterface(Interface):
                     |       |                                   |       |               |           |   USBTMC message.
                     |9-11   |Reserved                           |3      |0x000000       |Reserved. Must be 0x000000.
         """
-        attr = (1 if self.termchar else 0) << 1 | 1
         header: Descriptor = self.draft_bulk_in_header(_MSGID_DEV_DEP_MSG_IN, b_tag, transfer_size)
-        header.pack_into("B", 8, attr)
+        header.pack_into("B", 8, _EOM)  # send_device_dependent_in() sets attributes of the actual transfer
 
         return header
 
@@ -947,8 +1077,9 @@ class TMCInterface(Interface):
                     |8-11   |Reserved       |4      |0x00000000     |Reserved. Must be 0x0000000.
         """
         self._bulkout_header_processed = False
-        transfer_size = struct.unpack_from("<I4x", self.last_bulkout_msg.tmc_specific, 0)
-        print("Transfer size:", transfer_size)
+        transfer_size, = struct.unpack_from("<I4x", self.last_bulkout_msg.tmc_specific, 0)
+        if __debug__:
+            trace(TRACE_INFO, EV_VENDOR_OUT, 0, transfer_size)
 
     def on_request_vendor_specific_in(self) -> None:
         """ Action on Bulk out transfer with megID==REQUEST_VENDOR_SPECIFIC_IN
@@ -968,9 +1099,12 @@ class TMCInterface(Interface):
                     |8-11   |Reserved       |4      |0x00000000     |Reserved. Must be 0x00000000.
         """
         self._bulkout_header_processed = False
-        transfer_size = struct.unpack_from("<I4x", self.last_bulkout_msg.tmc_specific, 0)
+        transfer_size, = struct.unpack_from("<I4x", self.last_bulkout_msg.tmc_specific, 0)
         header: Descriptor = self.draft_vendor_specific_in_header(self.last_bulkout_msg.b_tag, transfer_size)
-        print("Transfer size:", transfer_size)
+        if __debug__:
+            trace(TRACE_INFO, EV_VENDOR_IN, 0, transfer_size)
+        if self._vendor_in_rest is not None:
+            self.send_vendor_specific_in(header, self._vendor_in_rest)
 
     def draft_vendor_specific_in_header(self, b_tag, transfer_size):
         """ Draft a bulk in header for DEV_DEP_MSG_IN message
@@ -993,31 +1127,79 @@ class TMCInterface(Interface):
 
         return header
 
-    def send_device_dependent_in(self, header: Descriptor, message=b""):
+    def send_device_dependent_in(self, header: Descriptor, message=b"", request=None):
+        """ Writes Bulk-IN header and ``message`` into the ``_tx`` Buffer as one DEV_DEP_MSG_IN transfer.
+        The transfer carries at most TransferSize of the REQUEST_DEV_DEP_MSG_IN and what the ``_tx`` Buffer can hold,
+        and ends after the first TermChar if the request has TermCharEnabled set;
+        the rest of ``message`` is kept for following requests and EOM is set on the last transfer only.
+        A transfer shorter than TransferSize which fills its last packet is ended by a zero length packet.
+
+        :param header: Bulk-IN header
+        :param message: whole response message or its rest
+        :param TmcBulkInOutMessage request: REQUEST_DEV_DEP_MSG_IN to answer; the last Bulk-OUT transfer if None
+        :return bool: True if the transfer is queued
         """
-        :param header:
-        :param message:
-        :return bool:
+        if request is None:
+            request = self.last_bulkout_msg
+        if request.msg_id != _MSGID_REQUEST_DEV_DEP_MSG_IN:
+            return False
+
+        requested, attribute, termchar = struct.unpack_from("<IBB2x", request.tmc_specific, 0)
+        termchar_enabled = self.termchar and (attribute & _TERMCHAR_ENABLED) != 0
+        message = memoryview(message)
+        mes_len = len(message)
+        room = self._tx.writable() - _BULK_IN_HEADER_SIZE
+        if room <= 0:
+            return False
+        size = min(mes_len, requested, room)
+        if termchar_enabled:
+            found = bytes(message[:size]).find(bytes((termchar,)))
+            if found >= 0:
+                size = found + 1
+        eom = size == mes_len
+        termchar_matched = termchar_enabled and size > 0 and message[size - 1] == termchar
+
+        attr = (_TERMCHAR_ENABLED if termchar_matched else 0) | (_EOM if eom else 0)
+        header.pack_into("<IB", 4, size, attr)
+        self._tx.write(header.b)
+        self._tx.write(message[:size])
+        # the host expects more data after a full packet unless TransferSize is reached
+        self._tx_zlp = size < requested and (_BULK_IN_HEADER_SIZE + size) % _wMaxPacketSize == 0
+        self._tx_xfer()
+        self._nbytes_txd = size
+        self._bulkin_rest = None if eom else message[size:]
+        if __debug__:
+            trace(TRACE_DEBUG, EV_BULK_IN, 1 if eom else 0, size)
+        return True
+
+    def send_vendor_specific_in(self, header: Descriptor, message=b""):
+        """ Writes Bulk-IN header and ``message`` into the ``_tx`` Buffer as one VENDOR_SPECIFIC_IN transfer.
+        The transfer carries at most TransferSize of the REQUEST_VENDOR_SPECIFIC_IN and what the ``_tx`` Buffer can
+        hold; the rest of ``message`` is kept for following requests.
+
+        :param header: Bulk-IN header
+        :param message: whole vendor response or its rest
+        :return bool: True if the transfer is queued
         """
-        if self.last_bulkout_msg.msg_id == _MSGID_REQUEST_DEV_DEP_MSG_IN:
-            mes_len = len(message)
-            header.pack_into("<I", 4, mes_len)
-            # padding_len = _HEADERS_BASE_SIZE - (len(message) % _HEADERS_BASE_SIZE)
-            end_pos = _BULK_IN_HEADER_SIZE + mes_len  # + padding_len # seems not needed on sending
-
-            header.pack_into(f"{mes_len}B", 12, *list(message))
-            p = 0
-            attempt = 0
-            while p < end_pos:
-                if attempt > 500:
-                    return False
-                e = min(end_pos - p, _wMaxPacketSize)
-                e = self._tx.write(header.b[p:p + e])  # get actual written bytes
-                print(e)
-                self._tx_xfer()
-                p += e
-                machine.idle()
-                attempt += 1
-            return True
-
-        return False
+        if self.last_bulkout_msg.msg_id != _MSGID_REQUEST_VENDOR_SPECIFIC_IN:
+            return False
+
+        requested, = struct.unpack_from("<I4x", self.last_bulkout_msg.tmc_specific, 0)
+        message = memoryview(message)
+        mes_len = len(message)
+        room = self._tx.writable() - _BULK_IN_HEADER_SIZE
+        if room <= 0:
+            return False
+        size = min(mes_len, requested, room)
+        if size < requested and size > 1 and (_BULK_IN_HEADER_SIZE + size) % _wMaxPacketSize == 0:
+            size -= 1  # end the transfer with a short packet; the host expects more otherwise
+
+        header.pack_into("<I", 4, size)
+        self._tx.write(header.b)
+        self._tx.write(message[:size])
+        self._tx_xfer()
+        self._nbytes_txd = size
+        self._vendor_in_rest = message[size:] if size < mes_len else None
+        if __debug__:
+            trace(TRACE_DEBUG, EV_BULK_IN, 0 if size < mes_len else 1, size)
+        return True
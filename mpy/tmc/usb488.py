@@ -10,6 +10,7 @@ import struct
 import usb.device
 from usb.device.core import Interface, Descriptor, split_bmRequestType, Buffer
 from tmc import TMCInterface, TmcBulkInOutMessage
+from Trace import trace, TRACE_ERROR, TRACE_INFO, TRACE_DEBUG, EV_DEV_DEP_OUT, EV_REQUEST_IN, EV_OUT_OF_STOCK
 
 _PROTOCOL_488 = const(0x01)
 
@@ -116,7 +117,8 @@ class Usb488Interface(TMCInterface):
             protocol=_PROTOCOL_488,
             interface_str="MicroPython USB488 device",
             indicator_pulse=True,
-            interrupt_ep=True
+            interrupt_ep=True,
+            termchar=True
         )
 
     def get_capabilities(self):
@@ -168,12 +170,8 @@ class Usb488Interface(TMCInterface):
         """
         self._bulkout_header_processed = False
         transfer_size, attribute = struct.unpack_from("<IB3x", self.last_bulkout_msg.tmc_specific, 0)
-        print("Transfer size:", transfer_size)
-        print("Attribute:", attribute)
-        message = self.last_bulkout_msg.message
-        print("Message:", bytes(message))
-        p = len(message)
-        print("Actual message size:", p)
+        if __debug__:
+            trace(TRACE_INFO, EV_DEV_DEP_OUT, attribute, transfer_size)
 
     def on_request_device_dependent_in(self) -> None:
         """ Action on Bulk out transfer with megID==DEV_DEP_MSG_IN.
@@ -210,14 +208,17 @@ class Usb488Interface(TMCInterface):
         """
         self._bulkout_header_processed = False
         transfer_size, attribute, termchar = struct.unpack_from("<IBB2x", self.last_bulkout_msg.tmc_specific, 0)
-        print("on_request_device_dependent_in")
+        if __debug__:
+            trace(TRACE_DEBUG, EV_REQUEST_IN, attribute, transfer_size)
 
         header: Descriptor = self.draft_device_dependent_in_header(self.last_bulkout_msg.b_tag, transfer_size)
-        if len(self.dev_dep_out_messages) > 0:
+        if self._bulkin_rest is not None:
+            self.send_device_dependent_in(header, self._bulkin_rest)
+        elif len(self.dev_dep_out_messages) > 0:
             message: TmcBulkInOutMessage = self.dev_dep_out_messages.popleft()
-            print("response message:", message.response)
             if len(message.response) > 0:
                 # There is query response
                 self.send_device_dependent_in(header, message.response)
         else:
-            print("No response stack left")
+            if __debug__:
+                trace(TRACE_ERROR, EV_OUT_OF_STOCK)